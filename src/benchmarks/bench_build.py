@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from generate_raw import TABLES, generate, make_pools, output_dir
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+BUILD_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph", "build_graph.py")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REPORT_PATH = "data/manifests/bench_build.json"
+
+# Stufen aus profiling.py, nach Präfix zusammengefasst
+STAGE_GROUPS = ["load", "nodes", "edges", "features", "serialize"]
+# Tabelle, die für den inkrementellen Fall geändert wird, und Anteil neuer Zeilen
+INCREMENTAL_TABLE = "disease_variant.csv"
+INCREMENTAL_FRACTION = 0.01
+
+# Regression = langsamer/größer als Baseline * (1 + Toleranz) UND mehr als
+# das absolute Minimum (kurze Stufen schwanken sonst zu stark)
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.15
+MIN_SECONDS = 0.05
+MIN_MB = 32.0
+
+
+# -----------------------------------------
+# Messen
+# -----------------------------------------
+def run_build(root: str, args: list[str]) -> dict:
+    """
+    Ein Build in einem eigenen Prozess (saubere Spitzen-RSS), im
+    Projekt-artigen Verzeichnis `root`. Gibt den Profil-Bericht zurück.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        profile = f.name
+    try:
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(BUILD_SCRIPT), *args, "--profile", profile],
+            cwd=root, capture_output=True, text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if proc.returncode != 0:
+            print(proc.stdout[-2000:], proc.stderr[-2000:], sep="\n")
+            raise RuntimeError(f"build_graph.py {' '.join(args)} failed in {root}")
+        with open(profile) as f:
+            report = json.load(f)
+    finally:
+        if os.path.exists(profile):
+            os.remove(profile)
+    report["process_s"] = elapsed
+    return report
+
+
+def clean_build(root: str) -> None:
+    """
+    Kalter Build: Graph, Build-Zustand und Feature-Cache entfernen.
+    """
+    for path in ("data/processed", "data/cache"):
+        shutil.rmtree(os.path.join(root, path), ignore_errors=True)
+
+
+def metrics(report: dict) -> dict[str, float]:
+    """
+    Kennzahlen eines Laufs: Zeit je Stufengruppe (Summe der Stufen), Gesamtzeit,
+    Spitzen-RSS über dem Stand nach den Imports und Durchsatz (Zeilen/s beim
+    Laden, Kanten/s beim Kantenbau).
+    """
+    stages = report["stages"]
+    peak = max(report["peak_rss_mb"] - report["base_rss_mb"], 0.0)
+    out = {"total_s": report["wall_s"], "peak_mb": round(peak, 1)}
+    for group in STAGE_GROUPS:
+        out[f"{group}_s"] = sum(s["wall_s"] for s in stages if s["stage"].split(" ")[0] == group)
+    rows = sum(s.get("rows", 0) for s in stages if s["stage"].startswith("load"))
+    edges = sum(s.get("edges", 0) for s in stages if s["stage"].startswith("edges"))
+    out["rows_per_s"] = rows / out["load_s"] if out["load_s"] else 0.0
+    out["edges_per_s"] = edges / out["edges_s"] if out["edges_s"] else 0.0
+    return out
+
+
+def median_metrics(runs: list[dict]) -> dict[str, float]:
+    return {key: round(statistics.median(r[key] for r in runs), 4) for key in runs[0]}
+
+
+def touch_table(root: str, scale: float, seed: int) -> int:
+    """
+    Hängt INCREMENTAL_FRACTION neue Zeilen an INCREMENTAL_TABLE an (wie ein
+    neuer Export). Gibt die alte Dateigröße zurück, zum Zurücksetzen.
+    """
+    path = os.path.join(root, "data", "raw", INCREMENTAL_TABLE)
+    size = os.path.getsize(path)
+    base_rows, make = TABLES[INCREMENTAL_TABLE]
+    rng = np.random.default_rng([seed, 999])
+    rows = max(int(base_rows * scale * INCREMENTAL_FRACTION), 1)
+    make(make_pools(scale, seed), rng, rows, 2.5).to_csv(path, mode="a", header=False, index=False)
+    return size
+
+
+def bench_scale(scale: float, repeat: int, seed: int, build_args: list[str]) -> dict[str, dict]:
+    root = output_dir(scale)
+    generate(scale, root, seed)
+    results = {}
+
+    runs = []
+    for i in range(repeat):
+        clean_build(root)
+        runs.append(metrics(run_build(root, build_args)))
+        print(f"[INFO] x{scale:g}/full run {i + 1}/{repeat}: {runs[-1]['total_s']:.2f} s")
+    results[f"x{scale:g}/full"] = median_metrics(runs)
+
+    # inkrementell: dieselbe Änderung auf einem frischen Build, danach zurück
+    runs = []
+    path = os.path.join(root, "data", "raw", INCREMENTAL_TABLE)
+    for i in range(repeat):
+        clean_build(root)
+        run_build(root, build_args)
+        size = touch_table(root, scale, seed)
+        try:
+            runs.append(metrics(run_build(root, [*build_args, "--incremental"])))
+        finally:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+        print(f"[INFO] x{scale:g}/incremental run {i + 1}/{repeat}: {runs[-1]['total_s']:.2f} s")
+    results[f"x{scale:g}/incremental"] = median_metrics(runs)
+    return results
+
+
+# -----------------------------------------
+# Vergleich mit der Baseline
+# -----------------------------------------
+def machine() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(cases: dict, baseline: dict, time_tol: float, mem_tol: float) -> list[dict]:
+    """
+    Eine Zeile pro Fall und Kennzahl; status "regression", wenn Zeit oder
+    Speicher über der Toleranz liegen (Durchsatz folgt aus den Zeiten).
+    """
+    rows = []
+    for case, current in cases.items():
+        base = baseline.get("cases", {}).get(case)
+        for key, value in current.items():
+            if key.endswith("_per_s"):
+                continue
+            if base is None or key not in base:
+                rows.append({"case": case, "metric": key, "baseline": None, "current": value, "status": "new"})
+                continue
+            old = base[key]
+            tol, floor = (mem_tol, MIN_MB) if key.endswith("_mb") else (time_tol, MIN_SECONDS)
+            regressed = value > old * (1 + tol) and value - old > floor
+            improved = value < old * (1 - tol) and old - value > floor
+            rows.append({
+                "case": case, "metric": key, "baseline": old, "current": value,
+                "ratio": round(value / old, 3) if old else None,
+                "status": "regression" if regressed else "improved" if improved else "ok",
+            })
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> None:
+    print(f"{'case':<18} {'metric':<14} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for r in rows:
+        base = "-" if r["baseline"] is None else f"{r['baseline']:.3f}"
+        ratio = "-" if r.get("ratio") is None else f"{r['ratio']:.2f}"
+        print(f"{r['case']:<18} {r['metric']:<14} {base:>10} {r['current']:>10.3f} {ratio:>7}  {r['status']}")
+
+
+def print_throughput(cases: dict) -> None:
+    for case, m in cases.items():
+        print(
+            f"[INFO] {case}: {m['total_s']:.2f} s, peak +{m['peak_mb']:.0f} MB, "
+            f"load {m['rows_per_s']:,.0f} rows/s, edges {m['edges_per_s']:,.0f} edges/s"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the graph build on synthetic data")
+    parser.add_argument("--scales", nargs="+", type=float, default=[1, 10, 100],
+                        help="scale factors of the synthetic data (default: 1 10 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the median counts (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reverse", action="store_true", help="build with --reverse")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run as the new baseline instead of comparing")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--out", default=REPORT_PATH, help=f"JSON report (default: {REPORT_PATH})")
+    args = parser.parse_args(argv)
+
+    build_args = ["--reverse"] if args.reverse else []
+    cases = {}
+    for scale in args.scales:
+        cases.update(bench_scale(scale, args.repeat, args.seed, build_args))
+    print_throughput(cases)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine(),
+        "build_args": build_args,
+        "repeat": args.repeat,
+        "cases": cases,
+    }
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Wrote baseline to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        print(f"[WARN] No baseline at {args.baseline}, run with --update-baseline first")
+    if baseline and baseline.get("machine", {}).get("cpu_count") != os.cpu_count():
+        print(f"[WARN] Baseline was recorded on a different machine: {baseline['machine']}")
+    if baseline and baseline.get("build_args") != build_args:
+        print(f"[WARN] Baseline was recorded with build args {baseline.get('build_args')}")
+
+    rows = compare(cases, baseline, args.time_tolerance, args.memory_tolerance)
+    print_comparison(rows)
+    report["comparison"] = rows
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    regressions = [r for r in rows if r["status"] == "regression"]
+    if regressions:
+        for r in regressions:
+            print(f"[FAIL] {r['case']} {r['metric']}: {r['current']:.3f} vs baseline {r['baseline']:.3f} "
+                  f"({r['ratio']:.2f}x)")
+        sys.exit(1)
+    print(f"[INFO] No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
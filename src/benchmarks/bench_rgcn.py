@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models"))
+from graph_store import GRAPH_DIR, load_graph  # noqa: E402
+from profiling import Profiler  # noqa: E402
+from rgcn import FusedRGCNLayer, RGCNLayer  # noqa: E402
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+REPORT_PATH = "data/manifests/bench_rgcn.json"
+# RSS-Abtastung für die Layer: Schritte dauern nur Millisekunden
+SAMPLE_INTERVAL = 0.001
+# kleinere Speicherwerte sind Rauschen (Seiten, Allokator-Caches)
+MIN_MB = 1.0
+
+# Varianten: Layer-Klasse und Gewichts-Zerlegung
+VARIANTS = {
+    "loop": (RGCNLayer, {}),
+    "fused": (FusedRGCNLayer, {}),
+    "basis": (FusedRGCNLayer, {"num_bases": 4}),
+    "block": (FusedRGCNLayer, {"num_blocks": 8}),
+}
+
+
+# -----------------------------------------
+# Batches
+# -----------------------------------------
+def random_batch(node_types: int, relations: int, nodes: int, edges: int, seed: int) -> dict:
+    """
+    Zufälliger heterogener Teilgraph: `nodes` Knoten je Typ, `edges` Kanten
+    je Relation zwischen zufälligen Typen, Quellknoten schief verteilt (Hubs).
+    """
+    rng = np.random.default_rng(seed)
+    types = [f"type{i}" for i in range(node_types)]
+    rels, edge_index = [], {}
+    for i in range(relations):
+        src, dst = rng.choice(types, 2)
+        name = f"rel{i}"
+        rels.append({"name": name, "src": str(src), "dst": str(dst)})
+        edge_index[name] = torch.from_numpy(np.stack([
+            (nodes * rng.random(edges) ** 2).astype(np.int64),
+            rng.integers(0, nodes, edges),
+        ]))
+    return {"num_nodes": dict.fromkeys(types, nodes), "edge_index": edge_index, "relations": rels}
+
+
+def sampled_batch(graph: str, batch_size: int, fanout: list[int], seed: int) -> dict:
+    """
+    Ein echter Mini-Batch aus train_rgcn.py (Neighbor Sampling auf `graph`).
+    """
+    from sampler import TRAIN, LinkBatches, NeighborSampler, edge_splits, message_relations, target_relations
+
+    data = load_graph(graph)
+    targets = target_relations(data)
+    splits = edge_splits(data, targets)
+    sampler = NeighborSampler(data, {"default": fanout}, splits)
+    batch = LinkBatches(data, sampler, targets, splits, TRAIN, batch_size, 1, seed)[0]
+    relations = [{k: r[k] for k in ("name", "src", "dst")} for r in message_relations(data)]
+    return {
+        "num_nodes": {t: len(ids) for t, ids in batch["n_id"].items()},
+        "edge_index": batch["edge_index"],
+        "relations": relations,
+    }
+
+
+# -----------------------------------------
+# Messen (je Variante ein eigener Prozess)
+# -----------------------------------------
+def run_variant(name: str, batch_path: str, dim: int, layers: int, steps: int) -> dict:
+    """
+    Vorwärts + Rückwärts über `layers` Layer, inklusive Aufbau der Adjazenz
+    (fällt pro Batch an). Speicher = Spitzen-RSS über dem Stand nach dem
+    Aufwärmschritt; Werte unter der Auflösung werden auf 0 begrenzt.
+    """
+    torch.manual_seed(0)
+    batch = torch.load(batch_path, weights_only=False)
+    layer_cls, kwargs = VARIANTS[name]
+    stack = torch.nn.ModuleList([layer_cls(dim, dim, batch["relations"], **kwargs) for _ in range(layers)])
+    h0 = {t: torch.randn(n, dim, requires_grad=True) for t, n in batch["num_nodes"].items()}
+
+    def step():
+        graph = stack[0].prepare(batch["num_nodes"], batch["edge_index"], batch["relations"])
+        h = h0
+        for layer in stack:
+            h = {t: torch.relu(v) for t, v in layer(h, graph).items()}
+        loss = sum(v.square().mean() for v in h.values())
+        loss.backward()
+
+    step()  # Aufwärmen
+    profiler = Profiler(SAMPLE_INTERVAL).start()
+    rss_before = profiler.rss()
+    with profiler.stage(name):
+        for _ in range(steps):
+            step()
+    profiler.stop()
+    record = profiler.records[0]
+    peak_mb = record["peak_rss_mb"] - rss_before / (1024 * 1024)
+    return {
+        "variant": name,
+        "cpu_ms": round(1000 * record["cpu_s"] / steps, 2),
+        "wall_ms": round(1000 * record["wall_s"] / steps, 2),
+        "peak_mb": round(max(peak_mb, 0.0), 1),
+        "weights": sum(p.numel() for p in stack.parameters()),
+    }
+
+
+def bench(batch: dict, variants: list[str], dim: int, layers: int, steps: int) -> list[dict]:
+    with tempfile.NamedTemporaryFile(suffix=".pt", delete=False) as f:
+        batch_path = f.name
+    try:
+        torch.save(batch, batch_path)
+        results = []
+        for name in variants:
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-variant", name, "--batch", batch_path,
+                 "--dim", str(dim), "--layers", str(layers), "--steps", str(steps)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(proc.stderr[-2000:])
+                raise RuntimeError(f"variant {name} failed")
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    finally:
+        os.remove(batch_path)
+    return results
+
+
+def print_results(results: list[dict]) -> None:
+    """
+    Speicher unter MIN_MB ist nicht messbar und wird als "<1.0" ohne
+    Verhältnis ausgegeben.
+    """
+    base = next((r for r in results if r["variant"] == "loop"), results[0])
+    print(f"{'variant':<8} {'cpu ms':>9} {'wall ms':>9} {'peak MB':>9} {'weights':>10}  vs {base['variant']}")
+    for r in results:
+        peak = f"{r['peak_mb']:.1f}" if r["peak_mb"] >= MIN_MB else f"<{MIN_MB:.1f}"
+        if r["peak_mb"] >= MIN_MB and base["peak_mb"] >= MIN_MB:
+            mem = f"{r['peak_mb'] / base['peak_mb']:.2f}x mem"
+        else:
+            mem = "mem below resolution"
+        print(
+            f"{r['variant']:<8} {r['cpu_ms']:>9.1f} {r['wall_ms']:>9.1f} {peak:>9} {r['weights']:>10,}"
+            f"  {r['cpu_ms'] / base['cpu_ms']:.2f}x cpu, {mem}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark R-GCN layer variants (CPU time and peak memory)")
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--graph", nargs="?", const=GRAPH_DIR,
+                        help=f"sample a real mini-batch from this graph instead of a random one (default: {GRAPH_DIR})")
+    parser.add_argument("--batch-size", type=int, default=1024, help="positive edges of the sampled batch")
+    parser.add_argument("--fanout", nargs="+", type=int, default=[10, 5])
+    parser.add_argument("--node-types", type=int, default=8)
+    parser.add_argument("--relations", type=int, default=32)
+    parser.add_argument("--nodes", type=int, default=20_000, help="nodes per type of the random batch")
+    parser.add_argument("--edges", type=int, default=100_000, help="edges per relation of the random batch")
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--steps", type=int, default=5, help="measured steps per variant (default: 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=REPORT_PATH, help=f"JSON report (default: {REPORT_PATH})")
+    parser.add_argument("--run-variant", help=argparse.SUPPRESS)
+    parser.add_argument("--batch", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_variant:
+        print(json.dumps(run_variant(args.run_variant, args.batch, args.dim, args.layers, args.steps)))
+        return
+
+    if args.graph:
+        batch = sampled_batch(args.graph, args.batch_size, args.fanout, args.seed)
+        args.layers = len(args.fanout)
+    else:
+        batch = random_batch(args.node_types, args.relations, args.nodes, args.edges, args.seed)
+    num_edges = sum(ei.shape[1] for ei in batch["edge_index"].values())
+    print(f"[INFO] batch: {sum(batch['num_nodes'].values()):,} nodes, {num_edges:,} edges, "
+          f"{len(batch['relations'])} relations")
+
+    results = bench(batch, args.variants, args.dim, args.layers, args.steps)
+    print_results(results)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "cpu_count": os.cpu_count(),
+            "graph": args.graph,
+            "nodes": sum(batch["num_nodes"].values()),
+            "edges": num_edges,
+            "dim": args.dim,
+            "layers": args.layers,
+            "results": results,
+        }, f, indent=2)
+    print(f"[INFO] Wrote report to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,128 +1,386 @@
+import argparse
+import csv
+import hashlib
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import torch
 from torch_geometric.data import HeteroData
 
+from features import FEATURE_DTYPES, add_features, feature_columns
+from graph_store import load_graph, load_node_maps, save_graph, update_graph
+from id_map import IdMap, lookup_ids
+from profiling import PROFILE_PATH, Profiler, profiling, stage
+
 RAW_DIR = "data/raw"
-OUT_PATH = "data/processed/hetero_graph.pt"
+# Verzeichnis im Format von graph_store.py (meta.json + rohe Tensor-Dateien)
+OUT_PATH = "data/processed/hetero_graph"
+# Hashes der Rohtabellen für den inkrementellen Build
+STATE_PATH = "data/processed/build_state.json"
+
+# -----------------------------------------
+# Schema: (src_type, rel, dst_type) -> (Datei, Quellspalte, Zielspalte)
+# Eine neue Relation = ein neuer Eintrag.
+# -----------------------------------------
+RELATIONS: dict[tuple[str, str, str], tuple[str, str, str]] = {
+    ("disease", "assoc_gene", "gene"): ("disease_gene.csv", "DiseaseCui", "GeneId"),
+    ("disease", "assoc_gene_fusion", "gene_fusion"): ("disease_gene_fusion.csv", "DiseaseCui", "GeneFusion"),
+    ("disease", "assoc_chrom_rearr", "chrom_rearr"): ("disease_chromosomal_rearrangement.csv", "DiseaseCui", "ChromosomalRearrengementName"),
+    ("disease", "assoc_variant", "variant"): ("disease_variant.csv", "DiseaseCui", "VariantId"),
+    ("disease", "assoc_pathway", "pathway"): ("pathway_disease_association.csv", "DiseaseCui", "PathwayId"),
+    ("gene", "participates_in", "pathway"): ("disease_gene_pathway.csv", "GeneId", "PathwayId"),
+    ("disease", "assoc_biomarker", "biomarker"): ("disease_biomarker.csv", "DiseaseCui", "BiomarkerId"),
+    ("chemical", "has_evidence", "evidence"): ("chemical_evidence.csv", "ChemicalId", "EvidenceId"),
+    ("chemical", "measured_in", "city"): ("chemical_location.csv", "ChemicalId", "CityId"),
+    ("disease", "has_demographic_stats", "demographic_group"): ("disease_demographics.csv", "DiseaseCui", "DemographicGroup"),
+}
+
+# Präfix der optionalen Rückwärts-Relationen: (gene, rev_assoc_gene, disease)
+REVERSE_PREFIX = "rev_"
+
+# Spalten, die nur Knoten beitragen (keine eigene Kante): (Datei, Spalte, Node-Typ)
+EXTRA_NODES: list[tuple[str, str, str]] = [
+    ("disease_variant.csv", "GeneId", "gene"),
+    ("disease_gene_pathway.csv", "DiseaseCui", "disease"),
+]
+
+NODE_TYPES = [
+    "disease",
+    "gene",
+    "variant",
+    "gene_fusion",
+    "chrom_rearr",
+    "pathway",
+    "biomarker",
+    "chemical",
+    "evidence",
+    "city",
+    "demographic_group",
+]
+
+
+def node_columns() -> dict[str, list[tuple[str, str]]]:
+    """
+    Node-Typ -> alle (Datei, Spalte), die IDs dieses Typs enthalten.
+    """
+    cols: dict[str, list[tuple[str, str]]] = {ntype: [] for ntype in NODE_TYPES}
+    for (src_type, _, dst_type), (fname, src_col, dst_col) in RELATIONS.items():
+        cols[src_type].append((fname, src_col))
+        cols[dst_type].append((fname, dst_col))
+    for fname, col, ntype in EXTRA_NODES:
+        cols[ntype].append((fname, col))
+    return {ntype: list(dict.fromkeys(c)) for ntype, c in cols.items()}
+
+
+def raw_columns() -> dict[str, list[str]]:
+    """
+    Spalten, die der Graph pro Rohtabelle tatsächlich braucht (IDs und
+    Feature-Spalten aus features.py).
+    """
+    cols: dict[str, list[str]] = {}
+    pairs = [p for ps in node_columns().values() for p in ps]
+    pairs += [(fname, col) for fname, kinds in feature_columns().items() for col in kinds]
+    for fname, col in pairs:
+        cols.setdefault(fname, [])
+        if col not in cols[fname]:
+            cols[fname].append(col)
+    return cols
+
+
+RAW_COLUMNS = raw_columns()
+RAW_FILES = list(dict.fromkeys(fname for fname, _, _ in RELATIONS.values()))
+# Tabellen, die gleichzeitig gelesen werden (jede zusätzlich mit Arrow-Threads)
+LOAD_WORKERS = min(len(RAW_FILES), os.cpu_count() or 1)
+
+
+def column_types(name: str) -> dict[str, pa.DataType]:
+    """
+    Explizite Typen der benötigten Spalten: IDs (und Chromosomen) als String,
+    auch wenn sie wie Zahlen aussehen (GeneId), Feature-Spalten als float64.
+    """
+    kinds = feature_columns().get(name, {})
+    return {
+        col: pa.string() if kinds.get(col, "chromosome") == "chromosome" else pa.float64()
+        for col in RAW_COLUMNS.get(name, [])
+    }
 
 
 def load_csv(name: str) -> pd.DataFrame:
+    """
+    Liest nur die Spalten aus RAW_COLUMNS, mit festen Typen und dem
+    multithreaded CSV-Reader von Arrow; leere Zellen werden zu NaN. Strings
+    bleiben Arrow-Strings (pandas "string[pyarrow]"), ohne ein Python-Objekt
+    pro Zelle.
+    """
     path = os.path.join(RAW_DIR, name)
     if not os.path.exists(path):
         print(f"[WARN] {path} not found, skipping.")
         return None
-    df = pd.read_csv(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    types = {col: t for col, t in column_types(name).items() if col in header}
+    missing = [col for col in RAW_COLUMNS.get(name, []) if col not in header]
+    if missing:
+        print(f"[WARN] {name}: columns {missing} not found")
+
+    table = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(types),
+            column_types=types,
+            null_values=[""],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=True,
+        ),
+    )
+    df = table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
     print(f"[INFO] Loaded {name} -> {len(df)} rows")
     return df
 
 
-def build_node_mappings(
-    df_dict: dict[str, pd.DataFrame]
-) -> dict[str, dict[str, int]]:
-    """
-    Baut für jeden Node-Typ ein Mapping: externe ID (String) -> interner Index (int)
-    """
-    node_keys: dict[str, set[str]] = {
-        "disease": set(),
-        "gene": set(),
-        "variant": set(),
-        "gene_fusion": set(),
-        "chrom_rearr": set(),
-        "pathway": set(),
-        "biomarker": set(),
-        "chemical": set(),
-        "evidence": set(),
-        "city": set(),
-        "demographic_group": set(),
-    }
+def load_parquet(name: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Liest die Parquet-Version einer Rohtabelle (siehe src/sparql/raw_store.py):
+    nur die benötigten Spalten, memory-mapped. String-Spalten sind
+    dictionary-kodiert und kommen als pandas Categorical zurück.
+    """
+    path = os.path.join(RAW_DIR, os.path.splitext(name)[0] + ".parquet")
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    df = table.to_pandas()
+    print(f"[INFO] Loaded {os.path.basename(path)} -> {len(df)} rows")
+    return df
 
-    # disease_gene.csv
-    if (df := df_dict.get("disease_gene.csv")) is not None:
-        node_keys["disease"].update(df["DiseaseCui"].dropna().astype(str))
-        node_keys["gene"].update(df["GeneId"].dropna().astype(str))
-
-    # disease_gene_fusion.csv
-    if (df := df_dict.get("disease_gene_fusion.csv")) is not None:
-        node_keys["disease"].update(df["DiseaseCui"].dropna().astype(str))
-        node_keys["gene_fusion"].update(df["GeneFusion"].dropna().astype(str))
-
-    # disease_chromosomal_rearrangement.csv
-    if (df := df_dict.get("disease_chromosomal_rearrangement.csv")) is not None:
-        node_keys["disease"].update(df["DiseaseCui"].dropna().astype(str))
-        node_keys["chrom_rearr"].update(
-            df["ChromosomalRearrengementName"].dropna().astype(str)
-        )
 
-    # disease_variant.csv
-    if (df := df_dict.get("disease_variant.csv")) is not None:
-        node_keys["disease"].update(df["DiseaseCui"].dropna().astype(str))
-        node_keys["gene"].update(df["GeneId"].dropna().astype(str))
-        node_keys["variant"].update(df["VariantId"].dropna().astype(str))
-
-    # pathway_disease_association.csv
-    if (df := df_dict.get("pathway_disease_association.csv")) is not None:
-        node_keys["disease"].update(df["DiseaseCui"].dropna().astype(str))
-        node_keys["pathway"].update(df["PathwayId"].dropna().astype(str))
-
-    # disease_gene_pathway.csv
-    if (df := df_dict.get("disease_gene_pathway.csv")) is not None:
-        node_keys["disease"].update(df["DiseaseCui"].dropna().astype(str))
-        node_keys["gene"].update(df["GeneId"].dropna().astype(str))
-        node_keys["pathway"].update(df["PathwayId"].dropna().astype(str))
-
-    # disease_biomarker.csv
-    if (df := df_dict.get("disease_biomarker.csv")) is not None:
-        node_keys["disease"].update(df["DiseaseCui"].dropna().astype(str))
-        node_keys["biomarker"].update(df["BiomarkerId"].dropna().astype(str))
-
-    # chemical_evidence.csv
-    if (df := df_dict.get("chemical_evidence.csv")) is not None:
-        node_keys["chemical"].update(df["ChemicalId"].dropna().astype(str))
-        node_keys["evidence"].update(df["EvidenceId"].dropna().astype(str))
-
-    # chemical_location.csv
-    if (df := df_dict.get("chemical_location.csv")) is not None:
-        node_keys["chemical"].update(df["ChemicalId"].dropna().astype(str))
-        node_keys["city"].update(df["CityId"].dropna().astype(str))
-
-    # disease_demographics.csv
-    if (df := df_dict.get("disease_demographics.csv")) is not None:
-        node_keys["disease"].update(df["DiseaseCui"].dropna().astype(str))
-        node_keys["demographic_group"].update(
-            df["DemographicGroup"].dropna().astype(str)
-        )
+def source_path(name: str) -> str | None:
+    """
+    Datei, aus der eine Rohtabelle gelesen wird: data/raw/<name>.parquet,
+    außer die CSV ist neuer. None, wenn es keine von beiden gibt.
+    """
+    parquet = os.path.join(RAW_DIR, os.path.splitext(name)[0] + ".parquet")
+    csv = os.path.join(RAW_DIR, name)
+    if os.path.exists(parquet) and (
+        not os.path.exists(csv) or os.path.getmtime(parquet) >= os.path.getmtime(csv)
+    ):
+        return parquet
+    return csv if os.path.exists(csv) else None
+
+
+def load_table(name: str) -> pd.DataFrame:
+    with stage(f"load {name}") as info:
+        path = source_path(name)
+        if path is not None and path.endswith(".parquet"):
+            df = load_parquet(name, RAW_COLUMNS.get(name))
+        else:
+            df = load_csv(name)
+        info["rows"] = 0 if df is None else len(df)
+    return df
 
-    # Mapping bauen
-    node_maps: dict[str, dict[str, int]] = {}
-    for ntype, keys in node_keys.items():
-        keys = sorted(k for k in keys if k)  # filter leere Strings
-        node_maps[ntype] = {k: i for i, k in enumerate(keys)}
-        print(f"[INFO] Node type '{ntype}': {len(keys)} nodes")
 
-    return node_maps
+def load_tables(names: list[str]) -> dict[str, pd.DataFrame]:
+    """
+    Lädt mehrere Rohtabellen parallel (Arrow gibt den GIL beim Parsen frei).
+    """
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+        frames = dict(zip(names, pool.map(load_table, names)))
+    return {name: df for name, df in frames.items() if df is not None}
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def table_hashes() -> dict[str, str]:
+    """
+    Inhalts-Hash jeder vorhandenen Rohtabelle (der Datei, die geladen würde).
+    """
+    hashes = {}
+    with stage("hash tables"):
+        for fname in RAW_FILES:
+            path = source_path(fname)
+            if path is not None:
+                hashes[fname] = file_hash(path)
+    return hashes
+
+
+def index_nodes(
+    df_dict: dict[str, pd.DataFrame]
+) -> tuple[dict[str, IdMap], dict[tuple[str, str], np.ndarray]]:
+    """
+    Faktorisiert pro Node-Typ alle beitragenden Spalten auf einmal (sortiert).
+    Gibt das Mapping externe ID <-> Index und die Codes jeder (Datei, Spalte)
+    zurück (-1 = fehlende ID), jede Spalte wird dabei nur einmal angefasst.
+    """
+    node_maps: dict[str, IdMap] = {}
+    codes: dict[tuple[str, str], np.ndarray] = {}
+    for ntype, pairs in node_columns().items():
+        with stage(f"nodes {ntype}") as info:
+            pairs = [(f, c) for f, c in pairs if f in df_dict]
+            parts = []
+            for fname, col in pairs:
+                series = df_dict[fname][col]
+                if not isinstance(series.dtype, pd.StringDtype):
+                    series = series.astype(str).where(series.notna())
+                parts.append(series.mask((series == "").fillna(False)))  # leere Strings zählen nicht
+            if parts:
+                col_codes, uniques = pd.factorize(pd.concat(parts, ignore_index=True), sort=True)
+            else:
+                col_codes, uniques = np.empty(0, dtype=np.int64), []
+
+            bounds = np.cumsum([len(p) for p in parts])[:-1]
+            for pair, part_codes in zip(pairs, np.split(col_codes.astype(np.int64), bounds)):
+                codes[pair] = part_codes
+            node_maps[ntype] = IdMap.from_ids(uniques)
+            info["nodes"] = len(uniques)
+        print(f"[INFO] Node type '{ntype}': {len(uniques)} nodes")
+
+    return node_maps, codes
+
+
+def build_node_mappings(
+    df_dict: dict[str, pd.DataFrame]
+) -> dict[str, IdMap]:
+    """
+    Baut für jeden Node-Typ ein Mapping: externe ID (String) <-> interner Index (int)
+    """
+    return index_nodes(df_dict)[0]
 
 
 def edges_from_df(
     src_series: pd.Series,
     dst_series: pd.Series,
-    src_map: dict[str, int],
-    dst_map: dict[str, int],
-) -> torch.Tensor:
-    src_idx = []
-    dst_idx = []
-    for s, d in zip(src_series.astype(str), dst_series.astype(str)):
-        if s not in src_map or d not in dst_map:
+    src_map: IdMap,
+    dst_map: IdMap,
+) -> tuple[torch.Tensor, int]:
+    """
+    Vektorisiert: Zeilen mit unbekannter Quell- oder Ziel-ID werden per
+    NumPy-Maske entfernt. Gibt (edge_index, Anzahl verworfener Zeilen) zurück;
+    edge_index teilt sich den Speicher mit dem NumPy-Array.
+    """
+    src = lookup_ids(src_series, src_map)
+    dst = lookup_ids(dst_series, dst_map)
+    keep = (src >= 0) & (dst >= 0)
+    dropped = int(len(keep) - keep.sum())
+    edge_index = torch.from_numpy(np.stack([src[keep], dst[keep]]))
+    return edge_index, dropped
+
+
+def report_edges(label: str, edge_index: torch.Tensor, dropped: int, duplicates: int = 0) -> None:
+    print(f"[INFO] edges: {label} {edge_index.shape[1]}")
+    if duplicates:
+        print(f"[INFO] edges: {label} removed {duplicates} duplicate edges")
+    if dropped:
+        print(f"[WARN] edges: {label} dropped {dropped} rows with missing/unknown IDs")
+
+
+# -----------------------------------------
+# Kanten: Deduplikation, Rückwärts-Relationen, CSR/CSC
+# -----------------------------------------
+def reverse_type(edge_type: tuple[str, str, str]) -> tuple[str, str, str]:
+    src_type, rel, dst_type = edge_type
+    return dst_type, REVERSE_PREFIX + rel, src_type
+
+
+def dedup_edges(edge_index: torch.Tensor, num_dst: int) -> tuple[torch.Tensor, int]:
+    """
+    Entfernt doppelte (src, dst)-Paare (die Exporte sind nur über alle
+    Spalten DISTINCT, z.B. ein Gen-Pathway-Paar pro Krankheit) per Sort-Unique
+    auf einem int64-Schlüssel. Das Ergebnis ist nach (src, dst) sortiert.
+    """
+    src, dst = edge_index.numpy()
+    keys = np.unique(src * max(num_dst, 1) + dst)
+    deduped = np.stack([keys // max(num_dst, 1), keys % max(num_dst, 1)])
+    return torch.from_numpy(deduped), len(src) - len(keys)
+
+
+def pointers(index: np.ndarray, num: int) -> np.ndarray:
+    """
+    Zeiger einer komprimierten Adjazenz: Knoten i hat die Kanten
+    ptr[i]:ptr[i + 1] (index muss dafür sortiert sein).
+    """
+    ptr = np.zeros(num + 1, dtype=np.int64)
+    np.cumsum(np.bincount(index, minlength=num), out=ptr[1:])
+    return ptr
+
+
+def add_adjacency(store, num_src: int, num_dst: int) -> None:
+    """
+    CSR (`rowptr`, Kanten sind nach src sortiert) und CSC (`colptr` und
+    `csc_perm`, die Kanten-Reihenfolge nach dst) einer Relation.
+    Grad eines Knotens: ptr[i + 1] - ptr[i].
+    """
+    src, dst = store.edge_index.numpy()
+    perm = np.argsort(dst, kind="stable")
+    store.rowptr = torch.from_numpy(pointers(src, num_src))
+    store.colptr = torch.from_numpy(pointers(dst, num_dst))
+    store.csc_perm = torch.from_numpy(perm)
+
+
+def finish_relation(
+    data: HeteroData,
+    edge_type: tuple[str, str, str],
+    num_src: int,
+    num_dst: int,
+    reverse: bool,
+) -> int:
+    """
+    Dedupliziert eine Relation, legt CSR/CSC an und optional die
+    Rückwärts-Relation (schon in CSR-Reihenfolge aus der CSC-Permutation).
+    Gibt die Anzahl entfernter Duplikate zurück.
+    """
+    store = data[edge_type]
+    store.edge_index, duplicates = dedup_edges(store.edge_index, num_dst)
+    add_adjacency(store, num_src, num_dst)
+    if reverse:
+        src, dst = store.edge_index.numpy()
+        perm = store.csc_perm.numpy()
+        rev = data[reverse_type(edge_type)]
+        rev.edge_index = torch.from_numpy(np.stack([dst[perm], src[perm]]))
+        add_adjacency(rev, num_dst, num_src)
+    return duplicates
+
+
+def pad_pointers(store, num_src: int, num_dst: int) -> None:
+    """
+    Neue Knoten (inkrementeller Build) haben noch keine Kanten: die Zeiger
+    werden nur mit dem letzten Wert verlängert.
+    """
+    for key, num in (("rowptr", num_src), ("colptr", num_dst)):
+        ptr = getattr(store, key)
+        if len(ptr) < num + 1:
+            pad = ptr[-1:].expand(num + 1 - len(ptr))
+            setattr(store, key, torch.cat([ptr, pad]))
+
+
+def mirror_edge_features(data: HeteroData, edge_types: list[tuple[str, str, str]]) -> list:
+    """
+    Kanten-Features auf die Rückwärts-Relationen übertragen (in deren
+    Reihenfolge, d.h. per CSC-Permutation).
+    """
+    mirrored = []
+    for edge_type in edge_types:
+        rev = reverse_type(edge_type)
+        if rev not in data.edge_types or "edge_attr" not in data[edge_type]:
             continue
-        src_idx.append(src_map[s])
-        dst_idx.append(dst_map[d])
-    if not src_idx:
-        return torch.empty((2, 0), dtype=torch.long)
-    return torch.tensor([src_idx, dst_idx], dtype=torch.long)
+        store = data[edge_type]
+        data[rev].edge_attr = store.edge_attr[store.csc_perm]
+        data[rev].edge_attr_mean = store.edge_attr_mean
+        data[rev].edge_attr_std = store.edge_attr_std
+        mirrored.append(rev)
+    return mirrored
 
 
-def build_hetero_graph(df_dict: dict[str, pd.DataFrame]) -> HeteroData:
-    node_maps = build_node_mappings(df_dict)
+def build_hetero_graph(df_dict: dict[str, pd.DataFrame], reverse: bool = False) -> HeteroData:
+    node_maps, codes = index_nodes(df_dict)
     data = HeteroData()
 
     # Node counts
@@ -131,156 +389,252 @@ def build_hetero_graph(df_dict: dict[str, pd.DataFrame]) -> HeteroData:
         if num_nodes == 0:
             continue
         data[ntype].num_nodes = num_nodes
-        # optional: Dummy-Features (1-dim)
+        # Dummy-Features (1-dim); features.py ersetzt sie, wo die Rohdaten Zahlen haben
         data[ntype].x = torch.ones((num_nodes, 1), dtype=torch.float32)
 
-    # disease ↔ gene
-    if (df := df_dict.get("disease_gene.csv")) is not None:
-        edge_index = edges_from_df(
-            df["DiseaseCui"],
-            df["GeneId"],
-            node_maps["disease"],
-            node_maps["gene"],
-        )
-        data["disease", "assoc_gene", "gene"].edge_index = edge_index
-        print("[INFO] edges: disease–gene", edge_index.shape[1])
-
-    # disease ↔ gene_fusion
-    if (df := df_dict.get("disease_gene_fusion.csv")) is not None:
-        edge_index = edges_from_df(
-            df["DiseaseCui"],
-            df["GeneFusion"],
-            node_maps["disease"],
-            node_maps["gene_fusion"],
-        )
-        data["disease", "assoc_gene_fusion", "gene_fusion"].edge_index = edge_index
-        print("[INFO] edges: disease–gene_fusion", edge_index.shape[1])
-
-    # disease ↔ chrom_rearr
-    if (df := df_dict.get("disease_chromosomal_rearrangement.csv")) is not None:
-        edge_index = edges_from_df(
-            df["DiseaseCui"],
-            df["ChromosomalRearrengementName"],
-            node_maps["disease"],
-            node_maps["chrom_rearr"],
-        )
-        data["disease", "assoc_chrom_rearr", "chrom_rearr"].edge_index = edge_index
-        print("[INFO] edges: disease–chrom_rearr", edge_index.shape[1])
-
-    # disease ↔ variant
-    if (df := df_dict.get("disease_variant.csv")) is not None:
-        edge_index = edges_from_df(
-            df["DiseaseCui"],
-            df["VariantId"],
-            node_maps["disease"],
-            node_maps["variant"],
-        )
-        data["disease", "assoc_variant", "variant"].edge_index = edge_index
-        print("[INFO] edges: disease–variant", edge_index.shape[1])
-        # Beispiel: einige Variant-Attribute als Edge-Features könnten später genutzt werden
-
-    # disease ↔ pathway (pathway_disease_association)
-    if (df := df_dict.get("pathway_disease_association.csv")) is not None:
-        edge_index = edges_from_df(
-            df["DiseaseCui"],
-            df["PathwayId"],
-            node_maps["disease"],
-            node_maps["pathway"],
-        )
-        data["disease", "assoc_pathway", "pathway"].edge_index = edge_index
-        print("[INFO] edges: disease–pathway", edge_index.shape[1])
-
-    # gene ↔ pathway (aus disease_gene_pathway.csv)
-    if (df := df_dict.get("disease_gene_pathway.csv")) is not None:
-        edge_index = edges_from_df(
-            df["GeneId"],
-            df["PathwayId"],
-            node_maps["gene"],
-            node_maps["pathway"],
-        )
-        data["gene", "participates_in", "pathway"].edge_index = edge_index
-        print("[INFO] edges: gene–pathway", edge_index.shape[1])
-
-    # disease ↔ biomarker
-    if (df := df_dict.get("disease_biomarker.csv")) is not None:
-        edge_index = edges_from_df(
-            df["DiseaseCui"],
-            df["BiomarkerId"],
-            node_maps["disease"],
-            node_maps["biomarker"],
-        )
-        data["disease", "assoc_biomarker", "biomarker"].edge_index = edge_index
-        print("[INFO] edges: disease–biomarker", edge_index.shape[1])
-
-    # chemical ↔ evidence
-    if (df := df_dict.get("chemical_evidence.csv")) is not None:
-        edge_index = edges_from_df(
-            df["ChemicalId"],
-            df["EvidenceId"],
-            node_maps["chemical"],
-            node_maps["evidence"],
-        )
-        data["chemical", "has_evidence", "evidence"].edge_index = edge_index
-        print("[INFO] edges: chemical–evidence", edge_index.shape[1])
-
-    # chemical ↔ city
-    if (df := df_dict.get("chemical_location.csv")) is not None:
-        edge_index = edges_from_df(
-            df["ChemicalId"],
-            df["CityId"],
-            node_maps["chemical"],
-            node_maps["city"],
-        )
-        data["chemical", "measured_in", "city"].edge_index = edge_index
-        print("[INFO] edges: chemical–city", edge_index.shape[1])
-        # Hier könntest du später 'Value', 'Units', 'Population' als Edge-/Node-Features nutzen
-
-    # disease ↔ demographic_group (optional)
-    if (df := df_dict.get("disease_demographics.csv")) is not None:
-        edge_index = edges_from_df(
-            df["DiseaseCui"],
-            df["DemographicGroup"],
-            node_maps["disease"],
-            node_maps["demographic_group"],
+    # Kanten direkt aus den Codes der Faktorisierung
+    for (src_type, rel, dst_type), (fname, src_col, dst_col) in RELATIONS.items():
+        if fname not in df_dict:
+            continue
+        with stage(f"edges {rel}") as info:
+            src = codes[(fname, src_col)]
+            dst = codes[(fname, dst_col)]
+            keep = (src >= 0) & (dst >= 0)
+            data[src_type, rel, dst_type].edge_index = torch.from_numpy(np.stack([src[keep], dst[keep]]))
+            duplicates = finish_relation(
+                data, (src_type, rel, dst_type),
+                len(node_maps[src_type]), len(node_maps[dst_type]), reverse,
+            )
+            info["edges"] = data[src_type, rel, dst_type].num_edges
+        report_edges(
+            f"{src_type}–{dst_type}", data[src_type, rel, dst_type].edge_index,
+            int(len(keep) - keep.sum()), duplicates,
         )
-        data["disease", "has_demographic_stats", "demographic_group"].edge_index = edge_index
-        print("[INFO] edges: disease–demographic_group", edge_index.shape[1])
-        # Optional: Statistiken als Features
-        # Hier nur Beispiel: mittlere Werte pro DemographicGroup aggregieren wäre möglich
 
     return data, node_maps
 
 
-def main():
+# -----------------------------------------
+# Inkrementeller Build
+# -----------------------------------------
+def save_state(hashes: dict[str, str], options: dict, features: dict[str, str]) -> None:
+    """
+    Speichert die Tabellen-Hashes, die Build-Optionen und die Cache-Schlüssel
+    der Features; die Node-IDs liegen im Graph-Verzeichnis.
+    """
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"tables": hashes, "options": options, "features": features}, f)
+    os.replace(tmp, STATE_PATH)
+
+
+def load_state() -> dict | None:
+    if not os.path.exists(STATE_PATH):
+        return None
+    with open(STATE_PATH) as f:
+        return json.load(f)
+
+
+def extend_node_maps(
+    node_maps: dict[str, IdMap], df_dict: dict[str, pd.DataFrame]
+) -> None:
+    """
+    Hängt neue IDs (sortiert) ans Ende der bestehenden Mappings an. Bereits
+    vergebene Indizes ändern sich nie, verschwundene IDs behalten ihren Index.
+    """
+    for ntype, pairs in node_columns().items():
+        id_map = node_maps.setdefault(ntype, IdMap.from_ids([]))
+        values = [
+            df_dict[fname][col].dropna().astype(str).unique()
+            for fname, col in pairs
+            if fname in df_dict
+        ]
+        if not values:
+            continue
+        added = id_map.append(np.concatenate(values))
+        if added:
+            print(f"[INFO] Node type '{ntype}': +{added} new nodes ({len(id_map)} total)")
+
+
+def update_hetero_graph(
+    data: HeteroData,
+    node_maps: dict[str, IdMap],
+    df_dict: dict[str, pd.DataFrame],
+    changed: set[str],
+    reverse: bool = False,
+) -> tuple[list[str], list[tuple[str, str, str]]]:
+    """
+    Patcht einen gespeicherten Graphen: Node-Anzahlen wachsen mit den
+    angehängten IDs, nur Relationen aus geänderten Tabellen werden neu
+    gebaut (bzw. entfernt, wenn die Tabelle fehlt); bei den übrigen
+    Relationen neuer Knoten werden nur die CSR/CSC-Zeiger verlängert.
+    Gibt die geänderten Node- und Edge-Typen zurück.
+    """
+    with stage("nodes (append)"):
+        extend_node_maps(node_maps, df_dict)
+
+    grown = []
+    for ntype, id_map in node_maps.items():
+        num_nodes = len(id_map)
+        if num_nodes == 0:
+            continue
+        old = data[ntype].num_nodes if ntype in data.node_types else 0
+        if num_nodes != old:
+            data[ntype].num_nodes = num_nodes
+            data[ntype].x = torch.ones((num_nodes, 1), dtype=torch.float32)
+            grown.append(ntype)
+
+    touched = []
+    for edge_type, (fname, src_col, dst_col) in RELATIONS.items():
+        src_type, _, dst_type = edge_type
+        num_src, num_dst = len(node_maps[src_type]), len(node_maps[dst_type])
+        pair = [edge_type, reverse_type(edge_type)] if reverse else [edge_type]
+
+        if fname not in changed:
+            if (src_type in grown or dst_type in grown) and edge_type in data.edge_types:
+                pad_pointers(data[edge_type], num_src, num_dst)
+                if reverse:
+                    pad_pointers(data[reverse_type(edge_type)], num_dst, num_src)
+                touched += pair
+            continue
+
+        touched += pair
+        if fname not in df_dict:
+            for et in pair:
+                if et in data.edge_types:
+                    del data[et]
+            continue
+        with stage(f"edges {edge_type[1]}") as info:
+            df = df_dict[fname]
+            edge_index, dropped = edges_from_df(
+                df[src_col], df[dst_col], node_maps[src_type], node_maps[dst_type]
+            )
+            data[edge_type].edge_index = edge_index
+            duplicates = finish_relation(data, edge_type, num_src, num_dst, reverse)
+            info["edges"] = data[edge_type].num_edges
+        report_edges(f"{src_type}–{dst_type}", data[edge_type].edge_index, dropped, duplicates)
+    return grown, touched
+
+
+def incremental_build(options: dict) -> bool:
+    """
+    Baut nur die Relationen (und Features) neu, deren Rohtabelle sich (laut
+    Inhalts-Hash) geändert hat. False, wenn es noch keinen passenden
+    Build-Zustand gibt.
+    """
+    state = load_state()
+    if state is None or not os.path.exists(OUT_PATH):
+        print("[INFO] No previous build state, running a full build.")
+        return False
+    if state.get("options") != options:
+        print("[INFO] Build options changed, running a full build.")
+        return False
+
+    hashes = table_hashes()
+    changed = {
+        fname for fname in RAW_FILES
+        if hashes.get(fname) != state["tables"].get(fname)
+    }
+    if not changed:
+        print("[INFO] Graph is up to date.")
+        return True
+    print(f"[INFO] Changed tables: {', '.join(sorted(changed))}")
+
+    df_dict = load_tables([fname for fname in sorted(changed) if fname in hashes])
+
+    def load(fname: str) -> pd.DataFrame | None:
+        # Features unveränderter Tabellen, deren Knoten gewachsen sind
+        if fname not in df_dict:
+            df_dict[fname] = load_table(fname)
+        return df_dict[fname]
+
+    with stage("load graph"):
+        data = load_graph(OUT_PATH)  # memory-mapped, unveränderte Teile werden nicht gelesen
+        node_maps = load_node_maps(OUT_PATH)
+    grown, touched = update_hetero_graph(
+        data, node_maps, {f: df_dict[f] for f in changed if f in df_dict}, changed, options["reverse"]
+    )
+    features, feature_nodes, feature_edges = add_features(
+        data, node_maps, hashes, load, RELATIONS, options["feature_dtype"], state.get("features")
+    )
+    feature_edges += mirror_edge_features(data, feature_edges)
+    grown = list(dict.fromkeys(grown + feature_nodes))
+    touched = list(dict.fromkeys(touched + feature_edges))
+
+    with stage("serialize (patch)", node_types=len(grown), edge_types=len(touched)):
+        update_graph(OUT_PATH, data, node_maps, grown, touched)
+    save_state(hashes, options, features)
+    print(f"[INFO] Updated {len(touched)} edge type(s), patched hetero graph in {OUT_PATH}")
+    return True
+
+
+def build(options: dict, incremental: bool = False) -> None:
     os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
+    if incremental and incremental_build(options):
+        return
 
     # Alle relevanten CSVs laden
-    df_files = [
-        "disease_gene.csv",
-        "disease_gene_fusion.csv",
-        "disease_chromosomal_rearrangement.csv",
-        "disease_variant.csv",
-        "pathway_disease_association.csv",
-        "disease_gene_pathway.csv",
-        "disease_biomarker.csv",
-        "chemical_evidence.csv",
-        "chemical_location.csv",
-        "disease_demographics.csv",
-    ]
-    df_dict: dict[str, pd.DataFrame] = {}
-    for fname in df_files:
-        df = load_csv(fname)
-        if df is not None:
-            df_dict[fname] = df
-
-    data, node_maps = build_hetero_graph(df_dict)
-
-    torch.save(
-        {"data": data, "node_maps": node_maps},
-        OUT_PATH,
+    df_dict = load_tables(RAW_FILES)
+
+    data, node_maps = build_hetero_graph(df_dict, reverse=options["reverse"])
+    hashes = table_hashes()
+    features, _, feature_edges = add_features(
+        data, node_maps, hashes, df_dict.get, RELATIONS, options["feature_dtype"]
     )
+    mirror_edge_features(data, feature_edges)
+
+    with stage("serialize", node_types=len(data.node_types), edge_types=len(data.edge_types)):
+        save_graph(data, node_maps, OUT_PATH)
+    save_state(hashes, options, features)
     print(f"[INFO] Saved hetero graph to {OUT_PATH}")
 
 
+def main(argv=None, profiler: Profiler | None = None):
+    """
+    Kommandozeile; `profiler` (siehe profiling.py) misst die Stufen auch
+    ohne --profile, z.B. für Benchmarks.
+    """
+    parser = argparse.ArgumentParser(description="Build the heterogeneous graph from data/raw")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="keep existing node IDs (new ones are appended) and rebuild only "
+             "the relations whose raw table changed",
+    )
+    parser.add_argument(
+        "--reverse",
+        action="store_true",
+        help=f"add a reverse relation ({REVERSE_PREFIX}<rel>) for every relation",
+    )
+    parser.add_argument(
+        "--feature-dtype",
+        choices=list(FEATURE_DTYPES),
+        default="float32",
+        help="dtype of the node/edge feature tensors (default: float32)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_PATH,
+        metavar="PATH",
+        help="record wall time, CPU time and peak memory per build stage, print "
+             f"a table and write a JSON report (default: {PROFILE_PATH})",
+    )
+    args = parser.parse_args(argv)
+    options = {"reverse": args.reverse, "feature_dtype": args.feature_dtype}
+
+    if profiler is None and args.profile is None:
+        build(options, args.incremental)
+        return
+
+    profiler = profiler or Profiler()
+    with profiling(profiler):
+        build(options, args.incremental)
+    if args.profile is not None:
+        profiler.write_report(args.profile)
+        print(profiler.table())
+        print(f"[INFO] Wrote build profile to {args.profile}")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import torch
+from torch_geometric.data import HeteroData
+
+from id_map import IdMap, lookup_ids
+from profiling import stage
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+FEATURE_CACHE = "data/cache/features"
+FEATURE_DTYPES = {"float32": torch.float32, "float16": torch.float16}
+
+# Node-Typ -> (Datei, ID-Spalte, [(Spalte, Transformation)])
+NODE_FEATURES: dict[str, tuple[str, str, list[tuple[str, str]]]] = {
+    "city": ("chemical_location.csv", "CityId", [("Population", "log1p")]),
+    "variant": ("disease_variant.csv", "VariantId", [
+        ("Chromosome", "chromosome"),
+        ("ChromosomeStartPosition", "none"),
+        ("ChromosomeEndPosition", "none"),
+    ]),
+}
+
+# (src_type, rel, dst_type) -> (Datei, [(Spalte, Transformation)]);
+# Quell- und Zielspalte kommen aus RELATIONS in build_graph.py
+EDGE_FEATURES: dict[tuple[str, str, str], tuple[str, list[tuple[str, str]]]] = {
+    ("chemical", "measured_in", "city"): ("chemical_location.csv", [("Value", "log1p")]),
+    ("disease", "has_demographic_stats", "demographic_group"): ("disease_demographics.csv", [
+        ("Incidence", "log1p"),
+        ("MortalityRate", "log1p"),
+    ]),
+    ("disease", "assoc_variant", "variant"): ("disease_variant.csv", [
+        ("DiseaseSpecificity", "none"),
+        ("DiseasePleiotropy", "none"),
+    ]),
+}
+
+CHROMOSOMES = {str(i): i for i in range(1, 23)} | {"X": 23, "Y": 24, "MT": 25, "M": 25}
+
+
+def feature_columns() -> dict[str, dict[str, str]]:
+    """
+    Spalten (mit Transformation), die die Features pro Rohtabelle brauchen.
+    """
+    cols: dict[str, dict[str, str]] = {}
+    specs = [(f, c) for f, _, c in NODE_FEATURES.values()] + list(EDGE_FEATURES.values())
+    for fname, columns in specs:
+        cols.setdefault(fname, {}).update(columns)
+    return cols
+
+
+# -----------------------------------------
+# Helper
+# -----------------------------------------
+def transform(series: pd.Series, kind: str) -> np.ndarray:
+    """
+    Spalte -> float64 (NaN = fehlt). log1p für schiefe Zählwerte
+    (Einwohner, Inzidenz, Konzentration), Chromosomen als Nummer 1-25.
+    """
+    if kind == "chromosome":
+        names = series.astype(str).str.upper().str.removeprefix("CHR")
+        return names.map(CHROMOSOMES).to_numpy(dtype=np.float64, na_value=np.nan)
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    if kind == "log1p":
+        with np.errstate(invalid="ignore"):
+            return np.log1p(np.where(values >= 0, values, np.nan))
+    return values
+
+
+def group_mean(index: np.ndarray, values: np.ndarray, num: int) -> np.ndarray:
+    """
+    Mittelwert je Gruppe und Spalte, NaN-Werte werden ignoriert; Gruppen ohne
+    Wert bleiben NaN.
+    """
+    out = np.full((num, values.shape[1]), np.nan)
+    for j in range(values.shape[1]):
+        valid = ~np.isnan(values[:, j])
+        sums = np.bincount(index[valid], weights=values[valid, j], minlength=num)
+        counts = np.bincount(index[valid], minlength=num)
+        np.divide(sums, counts, out=out[:, j], where=counts > 0)
+    return out
+
+
+def normalize(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Standardisiert jede Spalte (z-Score über die vorhandenen Werte), fehlende
+    Werte werden 0 (= Mittelwert). Gibt (Werte, mean, std) zurück.
+    """
+    mean = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(values.shape[1])
+    std = np.nan_to_num(np.nanstd(values, axis=0)) if len(values) else np.ones(values.shape[1])
+    std[std == 0] = 1.0
+    return np.nan_to_num((values - mean) / std), mean, std
+
+
+def feature_matrix(df: pd.DataFrame, columns: list[tuple[str, str]]) -> np.ndarray:
+    return np.stack([transform(df[col], kind) for col, kind in columns], axis=1)
+
+
+def cache_key(*parts) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def tensor_digest(tensor: torch.Tensor) -> str:
+    return hashlib.blake2b(tensor.contiguous().numpy().tobytes(), digest_size=16).hexdigest()
+
+
+def cache_path(name: str, key: str) -> str:
+    return os.path.join(FEATURE_CACHE, f"{name}-{key[:16]}.npz")
+
+
+def cached(name: str, key: str, compute: Callable[[], tuple]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (Werte, mean, std) aus data/cache/features, sonst berechnen und ablegen.
+    Ältere Einträge desselben Features werden ersetzt.
+    """
+    path = cache_path(name, key)
+    if os.path.exists(path):
+        with np.load(path) as f:
+            return f["values"], f["mean"], f["std"]
+
+    values, mean, std = compute()
+    os.makedirs(FEATURE_CACHE, exist_ok=True)
+    for old in os.listdir(FEATURE_CACHE):
+        if old.startswith(f"{name}-"):
+            os.remove(os.path.join(FEATURE_CACHE, old))
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, values=values, mean=mean, std=std)
+    os.replace(tmp, path)
+    print(f"[INFO] features: computed {name} {values.shape}")
+    return values, mean, std
+
+
+# -----------------------------------------
+# Features
+# -----------------------------------------
+def node_features(df: pd.DataFrame, id_col: str, columns: list[tuple[str, str]], id_map: IdMap):
+    """
+    Mittelwert über alle Zeilen eines Knotens (eine Stadt steht z.B. einmal
+    pro Chemikalie in chemical_location.csv), dann standardisiert.
+    """
+    index = lookup_ids(df[id_col], id_map)
+    keep = index >= 0
+    values = group_mean(index[keep], feature_matrix(df[keep], columns), len(id_map))
+    return normalize(values)
+
+
+def edge_features(
+    df: pd.DataFrame,
+    src_col: str,
+    dst_col: str,
+    columns: list[tuple[str, str]],
+    src_map: IdMap,
+    dst_map: IdMap,
+    edge_index: torch.Tensor,
+):
+    """
+    Mittelwert über alle Zeilen einer (deduplizierten) Kante, z.B. eine
+    Variante aus mehreren Datenquellen. edge_index ist nach (src, dst)
+    sortiert, die Zeilen werden per searchsorted zugeordnet.
+    """
+    num_dst = max(len(dst_map), 1)
+    src, dst = lookup_ids(df[src_col], src_map), lookup_ids(df[dst_col], dst_map)
+    keep = (src >= 0) & (dst >= 0)
+    edge_keys = edge_index[0].numpy() * num_dst + edge_index[1].numpy()
+    row_keys = src[keep] * num_dst + dst[keep]
+    pos = np.minimum(np.searchsorted(edge_keys, row_keys), max(len(edge_keys) - 1, 0))
+    rows = df[keep]
+    if len(edge_keys):
+        match = edge_keys[pos] == row_keys
+        pos, rows = pos[match], rows[match]
+    values = group_mean(pos, feature_matrix(rows, columns), len(edge_keys))
+    return normalize(values)
+
+
+def add_features(
+    data: HeteroData,
+    node_maps: dict[str, IdMap],
+    hashes: dict[str, str],
+    load: Callable[[str], pd.DataFrame | None],
+    relations: dict[tuple[str, str, str], tuple[str, str, str]],
+    dtype: str = "float32",
+    previous: dict[str, str] | None = None,
+) -> tuple[dict[str, str], list[str], list[tuple[str, str, str]]]:
+    """
+    Setzt x (Node-Typen) bzw. edge_attr (Relationen) aus NODE_FEATURES /
+    EDGE_FEATURES, jeweils mit den Normalisierungs-Statistiken
+    (x_mean/x_std bzw. edge_attr_mean/edge_attr_std, vor der Standardisierung).
+
+    Jedes Feature wird unter einem Hash seiner Eingaben gecacht (Rohtabelle,
+    IDs, Kanten, Spezifikation); `load(datei)` wird nur bei einem Cache-Miss
+    aufgerufen. Gibt die Schlüssel und die Node-/Edge-Typen zurück, deren
+    Schlüssel sich gegenüber `previous` geändert hat.
+    """
+    previous = previous or {}
+    torch_dtype = FEATURE_DTYPES[dtype]
+    keys: dict[str, str] = {}
+    node_types, edge_types = [], []
+
+    for ntype, (fname, id_col, columns) in NODE_FEATURES.items():
+        if fname not in hashes or ntype not in data.node_types:
+            continue
+        name = f"node-{ntype}"
+        keys[name] = cache_key(name, fname, hashes[fname], id_col, columns, node_maps[ntype].digest())
+        with stage(f"features {name}"):
+            values, mean, std = cached(
+                name, keys[name], lambda: node_features(load(fname), id_col, columns, node_maps[ntype])
+            )
+        store = data[ntype]
+        store.x = torch.from_numpy(values).to(torch_dtype)
+        store.x_mean = torch.from_numpy(mean).float()
+        store.x_std = torch.from_numpy(std).float()
+        if keys[name] != previous.get(name):
+            node_types.append(ntype)
+
+    for edge_type, (fname, columns) in EDGE_FEATURES.items():
+        if fname not in hashes or edge_type not in data.edge_types:
+            continue
+        src_type, _, dst_type = edge_type
+        _, src_col, dst_col = relations[edge_type]
+        edge_index = data[edge_type].edge_index
+        name = "edge-" + "__".join(edge_type)
+        keys[name] = cache_key(
+            name, fname, hashes[fname], columns, tensor_digest(edge_index),
+            node_maps[src_type].digest(), node_maps[dst_type].digest(),
+        )
+        with stage(f"features {name}"):
+            values, mean, std = cached(name, keys[name], lambda: edge_features(
+                load(fname), src_col, dst_col, columns,
+                node_maps[src_type], node_maps[dst_type], edge_index,
+            ))
+        store = data[edge_type]
+        store.edge_attr = torch.from_numpy(values).to(torch_dtype)
+        store.edge_attr_mean = torch.from_numpy(mean).float()
+        store.edge_attr_std = torch.from_numpy(std).float()
+        if keys[name] != previous.get(name):
+            edge_types.append(edge_type)
+
+    return keys, node_types, edge_types
@@ -0,0 +1,236 @@
+import json
+import os
+import shutil
+
+import torch
+from torch_geometric.data import HeteroData
+
+from id_map import IdMap
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+GRAPH_DIR = "data/processed/hetero_graph"
+META_FILE = "meta.json"
+FORMAT_VERSION = 3
+
+# Layout eines Graph-Verzeichnisses:
+#   meta.json                      Node-/Edge-Typen, Anzahlen, Dateien, dtypes, Shapes
+#   nodes/<type>.<attr>.bin        Node-Tensoren (x, x_mean, x_std, ...), roh (C-order)
+#   nodes/<type>.ids.bin           externe IDs, UTF-8 hintereinander (IdMap.buffer)
+#   nodes/<type>.offsets.bin       Start jeder ID im Puffer (IdMap.offsets)
+#   nodes/<type>.order.bin         sortierende Permutation (IdMap.order)
+#   edges/<src>__<rel>__<dst>.bin  edge_index [2, E], roh (C-order)
+#   edges/<src>__<rel>__<dst>.<attr>.bin
+#                                  weitere Kanten-Tensoren (rowptr, colptr, csc_perm, ...)
+
+
+# -----------------------------------------
+# Helper
+# -----------------------------------------
+def edge_file(edge_type: tuple[str, str, str], attr: str | None = None) -> str:
+    name = "__".join(edge_type) + (f".{attr}" if attr else "")
+    return os.path.join("edges", name + ".bin")
+
+
+def write_tensor(root: str, rel_path: str, tensor: torch.Tensor) -> dict:
+    """
+    Schreibt einen Tensor als rohe Bytes und gibt seinen Meta-Eintrag zurück.
+    """
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    tensor.contiguous().numpy().tofile(tmp)
+    os.replace(tmp, path)
+    return {
+        "file": rel_path,
+        "dtype": str(tensor.dtype).removeprefix("torch."),
+        "shape": list(tensor.shape),
+    }
+
+
+def read_tensor(root: str, entry: dict) -> torch.Tensor:
+    """
+    Memory-mapped (copy-on-write): Seiten werden erst beim Zugriff gelesen.
+    """
+    dtype = getattr(torch, entry["dtype"])
+    shape = entry["shape"]
+    numel = 1
+    for dim in shape:
+        numel *= dim
+    if numel == 0:
+        return torch.empty(shape, dtype=dtype)
+    path = os.path.join(root, entry["file"])
+    return torch.from_file(path, shared=False, size=numel, dtype=dtype).view(shape)
+
+
+def write_json(path: str, obj) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def write_node_type(root: str, data: HeteroData, ntype: str, id_map: IdMap) -> dict:
+    entry = {"num_nodes": data[ntype].num_nodes}
+    entry["attrs"] = {
+        key: write_tensor(root, os.path.join("nodes", f"{ntype}.{key}.bin"), value)
+        for key, value in data[ntype].items()
+        if isinstance(value, torch.Tensor)
+    }
+    entry["ids"] = {
+        part: write_tensor(root, os.path.join("nodes", f"{ntype}.{name}.bin"),
+                           torch.from_numpy(getattr(id_map, part)))
+        for part, name in (("buffer", "ids"), ("offsets", "offsets"), ("order", "order"))
+    }
+    return entry
+
+
+def write_edge_type(root: str, data: HeteroData, edge_type: tuple[str, str, str]) -> dict:
+    store = data[edge_type]
+    entry = {"type": list(edge_type), **write_tensor(root, edge_file(edge_type), store.edge_index)}
+    entry["attrs"] = {
+        key: write_tensor(root, edge_file(edge_type, key), value)
+        for key, value in store.items()
+        if key != "edge_index" and isinstance(value, torch.Tensor)
+    }
+    return entry
+
+
+def replace_dir(tmp: str, root: str) -> None:
+    """
+    Tauscht das fertig geschriebene Verzeichnis `tmp` gegen `root`.
+    """
+    old = root + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(root):
+        os.replace(root, old)
+    os.replace(tmp, root)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def remove_edge_type(root: str, entry: dict) -> None:
+    for part in [entry, *entry.get("attrs", {}).values()]:
+        path = os.path.join(root, part["file"])
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# -----------------------------------------
+# Schreiben
+# -----------------------------------------
+def save_graph(data: HeteroData, node_maps: dict[str, IdMap], root: str = GRAPH_DIR) -> None:
+    """
+    Schreibt den ganzen Graphen neu. Es wird in <root>.tmp geschrieben und
+    erst am Ende getauscht, ein abgebrochener Build lässt den alten Graphen
+    also unverändert.
+    """
+    tmp = root + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    meta = {"format": FORMAT_VERSION, "node_types": {}, "edge_types": []}
+    for ntype in data.node_types:
+        meta["node_types"][ntype] = write_node_type(tmp, data, ntype, node_maps[ntype])
+    for edge_type in data.edge_types:
+        meta["edge_types"].append(write_edge_type(tmp, data, edge_type))
+    write_json(os.path.join(tmp, META_FILE), meta)
+    replace_dir(tmp, root)
+
+
+def update_graph(
+    root: str,
+    data: HeteroData,
+    node_maps: dict[str, IdMap],
+    node_types: list[str],
+    edge_types: list[tuple[str, str, str]],
+) -> None:
+    """
+    Patcht ein bestehendes Graph-Verzeichnis: schreibt nur die genannten
+    Node- und Edge-Typen neu (Edge-Typen, die nicht mehr in `data` sind,
+    werden gelöscht). Wie bei save_graph wird in <root>.tmp geschrieben, die
+    unveränderten Dateien sind dort nur Hardlinks; neue Tensoren und
+    meta.json werden am Ende zusammen getauscht, ein Abbruch lässt also nie
+    neue Tensoren mit alter meta.json zurück.
+    """
+    meta = load_meta(root)
+    tmp = root + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(root, tmp, copy_function=os.link)
+    for ntype in node_types:
+        meta["node_types"][ntype] = write_node_type(tmp, data, ntype, node_maps[ntype])
+
+    entries = {tuple(e["type"]): e for e in meta["edge_types"]}
+    for edge_type in edge_types:
+        if edge_type in data.edge_types:
+            entries[edge_type] = write_edge_type(tmp, data, edge_type)
+        elif edge_type in entries:
+            remove_edge_type(tmp, entries.pop(edge_type))
+    meta["edge_types"] = list(entries.values())
+    write_json(os.path.join(tmp, META_FILE), meta)
+    replace_dir(tmp, root)
+
+
+# -----------------------------------------
+# Lesen
+# -----------------------------------------
+def load_meta(root: str = GRAPH_DIR) -> dict:
+    with open(os.path.join(root, META_FILE)) as f:
+        return json.load(f)
+
+
+def select_edge_types(meta: dict, edge_types=None) -> list[dict]:
+    """
+    Edge-Typen als Tripel oder nur per Relationsname (z.B. "assoc_gene").
+    """
+    if edge_types is None:
+        return meta["edge_types"]
+    wanted = {tuple(e) if not isinstance(e, str) else e for e in edge_types}
+    selected = [e for e in meta["edge_types"] if tuple(e["type"]) in wanted or e["type"][1] in wanted]
+    known = {tuple(e["type"]) for e in selected} | {e["type"][1] for e in selected}
+    missing = wanted - known
+    if missing:
+        raise KeyError(f"Unknown edge types: {sorted(map(str, missing))}")
+    return selected
+
+
+def load_graph(root: str = GRAPH_DIR, edge_types=None, features: bool = True) -> HeteroData:
+    """
+    Baut ein HeteroData aus dem Graph-Verzeichnis. Mit `edge_types` werden nur
+    diese Relationen (und ihre Node-Typen) geladen; alle Tensoren sind
+    memory-mapped, Startzeit und RSS hängen also nicht von der Graphgröße ab.
+    """
+    meta = load_meta(root)
+    selected = select_edge_types(meta, edge_types)
+    if edge_types is None:
+        ntypes = list(meta["node_types"])
+    else:
+        ntypes = list(dict.fromkeys(t for e in selected for t in (e["type"][0], e["type"][2])))
+
+    data = HeteroData()
+    for ntype in ntypes:
+        entry = meta["node_types"][ntype]
+        data[ntype].num_nodes = entry["num_nodes"]
+        if features:
+            for key, attr in entry["attrs"].items():
+                data[ntype][key] = read_tensor(root, attr)
+    for entry in selected:
+        store = data[tuple(entry["type"])]
+        store.edge_index = read_tensor(root, entry)
+        for key, attr in entry["attrs"].items():
+            if features or not key.startswith("edge_attr"):
+                store[key] = read_tensor(root, attr)
+    return data
+
+
+def load_node_maps(root: str = GRAPH_DIR, node_types=None) -> dict[str, IdMap]:
+    """
+    Externe ID <-> Index für alle oder die angegebenen Node-Typen, die
+    Arrays sind memory-mapped.
+    """
+    meta = load_meta(root)
+    node_maps = {}
+    for ntype in node_types or meta["node_types"]:
+        parts = meta["node_types"][ntype]["ids"]
+        node_maps[ntype] = IdMap(**{part: read_tensor(root, entry).numpy() for part, entry in parts.items()})
+    return node_maps
@@ -0,0 +1,300 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+# Anfragen pro Block bei der Batch-Suche (begrenzt die Byte-Matrizen)
+LOOKUP_CHUNK = 1 << 18
+# Länge des Präfix-Schlüssels (Bytes) für die Vorauswahl per searchsorted
+PREFIX_BYTES = 8
+
+
+def prefix_keys(rows: np.ndarray) -> np.ndarray:
+    """
+    Die ersten PREFIX_BYTES Bytes jeder Zeile als big-endian uint64:
+    sortiert wie die IDs selbst (bis auf gleiche Präfixe).
+    """
+    rows = rows[:, :PREFIX_BYTES]
+    rows = np.pad(rows, ((0, 0), (0, PREFIX_BYTES - rows.shape[1])))
+    return np.ascontiguousarray(rows).view(">u8").reshape(-1).astype(np.uint64)
+
+
+def encode(keys) -> np.ndarray:
+    """
+    IDs als UTF-8 in einem Fixed-Width-Bytes-Array (numpy "S").
+    """
+    keys = np.asarray(keys)
+    if keys.dtype.kind == "S":
+        return keys
+    keys = keys.astype(str)
+    try:
+        return keys.astype("S")  # reines ASCII, deutlich schneller
+    except UnicodeEncodeError:
+        return np.char.encode(keys, "utf-8")
+
+
+class IdMap:
+    """
+    Bidirektionales Mapping externe ID <-> Node-Index für einen Node-Typ.
+
+    Die IDs liegen UTF-8-kodiert hintereinander in `buffer`, `offsets[i]` bis
+    `offsets[i + 1]` ist die ID mit Index i (nach einem vollen Build ist der
+    Puffer sortiert). `order` ist die Permutation, die die IDs sortiert; da
+    neue IDs nur angehängt werden (inkrementeller Build), ist sie nach dem
+    ersten Anhängen nicht mehr die Identität.
+
+    Index -> ID ist O(1), ID -> Index eine binäre Suche über `order`;
+    `lookup` sucht ganze Arrays vektorisiert. Speicher: Länge der IDs plus
+    16 Byte pro Knoten statt eines Python-Dicts (plus 8 Byte für die
+    Präfix-Schlüssel, sobald gesucht wird).
+    """
+
+    def __init__(self, buffer: np.ndarray, offsets: np.ndarray, order: np.ndarray):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.order = order
+        self._prefix = None
+        self._common = b""
+
+    @classmethod
+    def from_ids(cls, ids) -> "IdMap":
+        """
+        IDs in Index-Reihenfolge (ohne Duplikate).
+        """
+        encoded = [str(k).encode("utf-8") for k in ids]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+        # bytes sortieren wie die UTF-8-Puffer (= Codepoint-Reihenfolge)
+        keys = np.array(encoded, dtype=object)
+        if len(keys) < 2 or (keys[1:] > keys[:-1]).all():
+            order = np.arange(len(keys), dtype=np.int64)  # schon sortiert (voller Build)
+        else:
+            order = np.argsort(keys, kind="stable").astype(np.int64)
+        return cls(buffer, offsets, order)
+
+    # -------------------------------------
+    # Index -> ID
+    # -------------------------------------
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def id_of(self, index: int) -> str:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+    def ids_of(self, indices) -> np.ndarray:
+        """
+        IDs zu einem Array von Indizes (object-Array von Strings).
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        data = self.buffer.tobytes()
+        starts, ends = self.offsets[indices], self.offsets[indices + 1]
+        return np.array([data[s:e].decode("utf-8") for s, e in zip(starts, ends)], dtype=object)
+
+    def __iter__(self):
+        return iter(self.ids_of(np.arange(len(self))))
+
+    def digest(self) -> str:
+        """
+        Hash über IDs und Indizes (z.B. als Cache-Schlüssel).
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.ascontiguousarray(self.offsets).tobytes())
+        h.update(np.ascontiguousarray(self.buffer).tobytes())
+        return h.hexdigest()
+
+    # -------------------------------------
+    # ID -> Index
+    # -------------------------------------
+    def search(self, keys) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vektorisierte binäre Suche: (Position in `order`, gefunden) je Anfrage.
+        Alle Anfragen eines Blocks gehen gleichzeitig durch die log2(n)
+        Halbierungen; verglichen werden die Bytes als uint8-Matrix.
+        """
+        encoded = encode(keys)
+        pos = np.empty(len(encoded), dtype=np.int64)
+        found = np.zeros(len(encoded), dtype=bool)
+        for start in range(0, len(encoded), LOOKUP_CHUNK):
+            chunk = slice(start, start + LOOKUP_CHUNK)
+            pos[chunk], found[chunk] = self.search_chunk(encoded[chunk])
+        return pos, found
+
+    def sorted_prefixes(self) -> np.ndarray:
+        """
+        Präfix-Schlüssel der IDs in sortierter Reihenfolge (einmal berechnet).
+        Der gemeinsame Anfang aller IDs (z.B. "C" bei CUIs) wird übersprungen,
+        damit die 8 Bytes möglichst viel unterscheiden.
+        """
+        if self._prefix is None:
+            first, last = self.id_of(int(self.order[0])), self.id_of(int(self.order[-1]))
+            common = os.path.commonprefix([first.encode("utf-8"), last.encode("utf-8")])
+            self._common = common
+            self._prefix = np.empty(len(self), dtype=np.uint64)
+            for start in range(0, len(self), LOOKUP_CHUNK):
+                indices = self.order[start:start + LOOKUP_CHUNK]
+                rows = self.gather(indices, PREFIX_BYTES, len(common))[0]
+                self._prefix[start:start + len(indices)] = prefix_keys(rows)
+        return self._prefix
+
+    def search_chunk(self, encoded: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        m, n = len(encoded), len(self)
+        width = max(encoded.dtype.itemsize, 1)
+        query = np.ascontiguousarray(encoded).view(np.uint8).reshape(m, encoded.dtype.itemsize)
+        query = np.pad(query, ((0, 0), (0, width - query.shape[1])))
+        query_len = np.char.str_len(encoded).astype(np.int64)
+
+        # Vorauswahl über die Präfixe, die binäre Suche läuft nur noch über
+        # IDs mit gleichem Präfix (meist keine oder eine)
+        prefixes = self.sorted_prefixes()
+        skip = len(self._common)
+        query = np.pad(query, ((0, 0), (0, max(skip + PREFIX_BYTES - width, 0))))
+        query_prefix = prefix_keys(query[:, skip:])
+        # sortierte Anfragen: searchsorted läuft dann fast linear durch
+        sort = np.argsort(query_prefix)
+        lo, hi = np.empty(m, dtype=np.int64), np.empty(m, dtype=np.int64)
+        lo[sort] = np.searchsorted(prefixes, query_prefix[sort], side="left")
+        hi[sort] = np.searchsorted(prefixes, query_prefix[sort], side="right")
+        # Anfragen ohne den gemeinsamen Anfang liegen vor oder hinter allen IDs
+        head = np.frombuffer(self._common, dtype=np.uint8)
+        head_cmp = self.compare_rows(query[:, :skip], head[None, :].repeat(m, 0))
+        lo[head_cmp < 0], hi[head_cmp < 0] = 0, 0
+        lo[head_cmp > 0], hi[head_cmp > 0] = n, n
+        query = query[:, :width]
+        # untere Schranke; ein Treffer unterwegs ist (IDs sind eindeutig) genau lo
+        found = np.zeros(m, dtype=bool)
+        while True:
+            active = np.flatnonzero(lo < hi)
+            if len(active) == 0:
+                break
+            mid = (lo[active] + hi[active]) // 2
+            cmp = self.compare(self.order[mid], query[active], query_len[active], skip)
+            found[active[cmp == 0]] = True
+            lo[active] = np.where(cmp < 0, mid + 1, lo[active])
+            hi[active] = np.where(cmp < 0, hi[active], mid)
+        return lo, found
+
+    def gather(self, indices: np.ndarray, width: int, start: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Die Bytes start:start + width der IDs als uint8-Matrix (mit Nullen
+        aufgefüllt) und ihre Längen.
+        """
+        starts = self.offsets[indices]
+        lengths = self.offsets[indices + 1] - starts
+        cols = np.arange(start, start + width)
+        if not len(self.buffer):
+            return np.zeros((len(indices), width), dtype=np.uint8), lengths
+        gather = np.minimum(starts[:, None] + cols, len(self.buffer) - 1)
+        return np.where(cols < lengths[:, None], self.buffer[gather], 0).astype(np.uint8), lengths
+
+    def compare(
+        self, indices: np.ndarray, query: np.ndarray, query_len: np.ndarray, skip: int = 0
+    ) -> np.ndarray:
+        """
+        -1/0/1 je Zeile: gespeicherte ID `indices[i]` gegen Anfrage i (beide
+        beginnen mit denselben `skip` Bytes). Verglichen wird wortweise (8
+        Bytes als uint64), jeweils nur für die Zeilen, die bis dahin gleich
+        sind; die Kosten hängen also vom gemeinsamen Anfang ab, nicht von
+        der längsten Anfrage. Bei gleichem Präfix entscheidet die Länge.
+        """
+        cmp = np.zeros(len(indices), dtype=np.int64)
+        lengths = self.offsets[indices + 1] - self.offsets[indices]
+        tied = np.arange(len(indices))
+        for start in range(skip, query.shape[1], PREFIX_BYTES):
+            stored = prefix_keys(self.gather(indices[tied], PREFIX_BYTES, start)[0])
+            wanted = prefix_keys(query[tied, start:start + PREFIX_BYTES])
+            word_cmp = (stored > wanted).astype(np.int64) - (stored < wanted)
+            cmp[tied] = word_cmp
+            tied = tied[word_cmp == 0]
+            if len(tied) == 0:
+                return cmp
+        cmp[tied] = np.sign(lengths[tied] - query_len[tied])
+        return cmp
+
+    @staticmethod
+    def compare_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Lexikographischer Vergleich zweier uint8-Matrizen, -1/0/1 je Zeile.
+        """
+        if a.shape[1] == 0:
+            return np.zeros(len(a), dtype=np.int64)
+        differs = a != b
+        first = differs.argmax(axis=1)
+        rows = np.arange(len(a))
+        return np.sign(a[rows, first].astype(np.int16) - b[rows, first].astype(np.int16))
+
+    def lookup(self, keys) -> np.ndarray:
+        """
+        Indizes zu einem Array von IDs (-1 = unbekannt).
+        """
+        encoded = encode(keys)
+        if len(encoded) == 0 or len(self) == 0:
+            return np.full(len(encoded), -1, dtype=np.int64)
+        pos, found = self.search(encoded)
+        return np.where(found, self.order[np.minimum(pos, len(self) - 1)], -1)
+
+    def __getitem__(self, key: str) -> int:
+        index = self.get(key)
+        if index is None:
+            raise KeyError(key)
+        return index
+
+    def get(self, key: str, default=None):
+        index = int(self.lookup([key])[0])
+        return default if index < 0 else index
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    # -------------------------------------
+    # Anhängen
+    # -------------------------------------
+    def append(self, keys) -> int:
+        """
+        Hängt die noch unbekannten IDs (sortiert) ans Ende an; bestehende
+        Indizes bleiben unverändert. Gibt die Anzahl neuer IDs zurück.
+        """
+        encoded = np.unique(encode(keys))
+        encoded = encoded[np.char.str_len(encoded) > 0]
+        if len(self):
+            pos, found = self.search(encoded)
+            encoded, pos = encoded[~found], pos[~found]
+        else:
+            pos = np.zeros(len(encoded), dtype=np.int64)
+        if len(encoded) == 0:
+            return 0
+
+        added = IdMap.from_ids([k.decode("utf-8") for k in encoded])
+        first = len(self)
+        self.buffer = np.concatenate([self.buffer, added.buffer])
+        self.offsets = np.concatenate([self.offsets, added.offsets[1:] + self.offsets[-1]])
+        # neue IDs sind untereinander sortiert: an ihren Suchpositionen einfügen
+        self.order = np.insert(self.order, pos, np.arange(first, first + len(encoded)))
+        self._prefix, self._common = None, b""
+        return len(encoded)
+
+
+def lookup_ids(series: pd.Series, id_map: IdMap) -> np.ndarray:
+    """
+    Bildet eine ganze Spalte externer IDs auf Indizes ab (-1 = unbekannt),
+    ohne Python-Schleife über die Zeilen. Bei Categoricals (Parquet) werden
+    nur die Kategorien nachgeschlagen und dann per Code verteilt.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        found = id_map.lookup(series.cat.categories.astype(str).to_numpy())
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, found[codes], -1)
+
+    # jede ID nur einmal suchen (z.B. eine CUI in tausenden Zeilen)
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return np.full(len(series), -1, dtype=np.int64)
+    found = id_map.lookup(pd.Index(uniques).astype(str).to_numpy())
+    return np.where(codes >= 0, found[codes], -1)
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+import psutil
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+PROFILE_PATH = "data/manifests/build_profile.json"
+# Abtastintervall des RSS-Samplers (Sekunden)
+SAMPLE_INTERVAL = 0.005
+
+MB = 1024 * 1024
+
+
+class Profiler:
+    """
+    Misst Wall-Zeit, CPU-Zeit und Spitzen-RSS je Build-Stufe.
+
+    Die CPU-Zeit ist die des ganzen Prozesses (Arrow/NumPy rechnen in eigenen
+    Threads); laufen Stufen parallel (CSV-Laden), zählt sie in jeder davon.
+    Der Spitzenwert kommt von einem Thread, der die RSS alle SAMPLE_INTERVAL
+    Sekunden abfragt; `base_rss_mb` ist die RSS bei start(), also nach den
+    Imports (torch allein belegt mehrere hundert MB). `on_stage(record)` wird
+    nach jeder Stufe aufgerufen.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, on_stage: Callable[[dict], None] | None = None):
+        self.interval = interval
+        self.on_stage = on_stage
+        self.records: list[dict] = []
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+        self._peaks: dict[object, int] = {}  # laufende Stufe -> höchste RSS bisher
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started = time.perf_counter()
+        self._base_rss = self.rss()
+
+    def rss(self) -> int:
+        return self._process.memory_info().rss
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = self.rss()
+            with self._lock:
+                for key, peak in self._peaks.items():
+                    if rss > peak:
+                        self._peaks[key] = rss
+
+    def start(self) -> "Profiler":
+        if self._thread is None:
+            self._stop.clear()
+            self._started = time.perf_counter()
+            self._base_rss = self.rss()
+            self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    @contextmanager
+    def stage(self, name: str, **info):
+        """
+        Misst den Block als Stufe `name`; `info` (z.B. Zeilen, Kanten) kommt
+        mit in den Bericht und kann im Block noch ergänzt werden.
+        """
+        key = object()
+        rss_start = self.rss()
+        with self._lock:
+            self._peaks[key] = rss_start
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield info
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            rss_end = self.rss()
+            with self._lock:
+                peak = max(self._peaks.pop(key), rss_end)
+            record = {
+                "stage": name,
+                "wall_s": round(wall, 4),
+                "cpu_s": round(cpu, 4),
+                "peak_rss_mb": round(peak / MB, 1),
+                "rss_delta_mb": round((rss_end - rss_start) / MB, 1),
+                **info,
+            }
+            with self._lock:
+                self.records.append(record)
+            if self.on_stage is not None:
+                self.on_stage(record)
+
+    def report(self) -> dict:
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "wall_s": round(time.perf_counter() - self._started, 4),
+            "peak_rss_mb": max((r["peak_rss_mb"] for r in self.records), default=0.0),
+            "base_rss_mb": round(self._base_rss / MB, 1),
+            "cpu_count": os.cpu_count(),
+            "stages": self.records,
+        }
+
+    def write_report(self, path: str = PROFILE_PATH) -> dict:
+        report = self.report()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, path)
+        return report
+
+    def table(self) -> str:
+        """
+        Lesbare Tabelle, Stufen in der Reihenfolge, in der sie fertig wurden.
+        """
+        rows = [("stage", "wall s", "cpu s", "peak MB", "Δ MB", "")]
+        for r in self.records:
+            extra = ", ".join(
+                f"{k}={v}" for k, v in r.items()
+                if k not in ("stage", "wall_s", "cpu_s", "peak_rss_mb", "rss_delta_mb")
+            )
+            rows.append((
+                r["stage"], f"{r['wall_s']:.3f}", f"{r['cpu_s']:.3f}",
+                f"{r['peak_rss_mb']:.1f}", f"{r['rss_delta_mb']:+.1f}", extra,
+            ))
+        widths = [max(len(row[i]) for row in rows) for i in range(5)]
+        lines = []
+        for row in rows:
+            cells = [row[0].ljust(widths[0])] + [c.rjust(w) for c, w in zip(row[1:5], widths[1:])]
+            lines.append("  ".join(cells + [row[5]]).rstrip())
+        lines.insert(1, "-" * len(lines[0]))
+        return "\n".join(lines)
+
+
+# -----------------------------------------
+# Hook für build_graph.py
+# -----------------------------------------
+_active: Profiler | None = None
+
+
+@contextmanager
+def profiling(profiler: Profiler):
+    """
+    Aktiviert `profiler` für alle stage()-Blöcke im Build (auch in den
+    Lade-Threads) und startet/stoppt den RSS-Sampler.
+    """
+    global _active
+    previous, _active = _active, profiler.start()
+    try:
+        yield profiler
+    finally:
+        _active = previous
+        profiler.stop()
+
+
+@contextmanager
+def stage(name: str, **info):
+    """
+    Stufe des aktiven Profilers; ohne Profiler kostet der Block nichts.
+    """
+    if _active is None:
+        yield info
+        return
+    with _active.stage(name, **info) as info:
+        yield info
@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import sys
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph"))
+from graph_store import GRAPH_DIR, load_graph  # noqa: E402
+from rgcn import RGCN, node_features  # noqa: E402
+from sampler import TEST, VAL, NeighborSampler, edge_splits, message_relations  # noqa: E402
+from train_rgcn import MODEL_PATH, layer_options, parse_fanouts  # noqa: E402
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+REPORT_PATH = "data/manifests/eval_rgcn.json"
+# Speicher für einen Block Scores (Anfragen x Kandidaten) samt Temporärem
+MEMORY_BUDGET_MB = 256
+# Bytes pro Score im Block: float32-Scores + float32-Vergleichspuffer
+# (Vergleichen in float und Summieren ist auf der CPU viel schneller als bool)
+BYTES_PER_SCORE = 8
+# float32 zählt bis 2^24 exakt
+MAX_BLOCK_COLS = 1 << 24
+HITS_AT = (1, 3, 10)
+EMBED_BATCH = 4096
+
+
+# -----------------------------------------
+# Modell und Einbettungen
+# -----------------------------------------
+def load_model(path: str, data) -> tuple[RGCN, dict, list[tuple[str, str, str]]]:
+    """
+    Checkpoint aus train_rgcn.py; ältere Checkpoints ohne --layer nutzen den
+    Schleifen-Layer, ohne num_layers zählen die Hops aller Fan-outs
+    (--fanout-rel kann mehr Hops haben als --fanout).
+    """
+    checkpoint = torch.load(path, weights_only=False)
+    config = {"layer": "loop", "num_bases": None, "num_blocks": None, "fanout_rel": [], **checkpoint["config"]}
+    if "num_layers" not in config:
+        config["num_layers"] = max(len(f) for f in parse_fanouts(config["fanout"], config["fanout_rel"]).values())
+    targets = [tuple(t) for t in checkpoint["targets"]]
+    model = RGCN(data, message_relations(data), targets, dim=config["dim"], num_layers=config["num_layers"],
+                 dropout=config["dropout"], **layer_options(Namespace(**config)))
+    model.load_state_dict(checkpoint["model"])
+    model.eval()
+    return model, config, targets
+
+
+@torch.no_grad()
+def embed_nodes(model: RGCN, data, sampler: NeighborSampler, ntypes: set[str], batch_size: int,
+                seed: int) -> dict[str, torch.Tensor]:
+    """
+    Ausgabe des Encoders für alle Knoten der Typen `ntypes`, in Blöcken von
+    `batch_size` Seeds mit demselben Neighbor Sampling wie im Training
+    (nur Trainingskanten, kein Leck der Testkanten).
+    """
+    rng = np.random.default_rng(seed)
+    out = {}
+    for ntype in sorted(ntypes):
+        num_nodes = data[ntype].num_nodes
+        emb = torch.empty(num_nodes, model.relation.shape[1])
+        for start in range(0, num_nodes, batch_size):
+            seeds = np.arange(start, min(start + batch_size, num_nodes))
+            batch = sampler.sample({ntype: seeds}, rng)
+            h = model.encode(batch["n_id"], batch["edge_index"], node_features(data, batch["n_id"], model))
+            emb[start:start + len(seeds)] = h[ntype][batch["seed_local"][ntype]]
+        out[ntype] = emb
+    return out
+
+
+# -----------------------------------------
+# Gefilterte Ränge
+# -----------------------------------------
+def known_pairs(ptr: np.ndarray, nbr: np.ndarray, queries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Alle bekannten Partner der Anfrageknoten als (Zeile in queries, Partner)
+    aus der komprimierten Adjazenz (alle Splits).
+    """
+    start = ptr[queries]
+    deg = ptr[queries + 1] - start
+    owner = np.repeat(np.arange(len(queries)), deg)
+    pos = np.arange(len(owner)) - np.repeat(np.cumsum(deg) - deg, deg) + start[owner]
+    return owner, nbr[pos]
+
+
+def filtered_ranks(
+    query: torch.Tensor,
+    answer: np.ndarray,
+    candidates: torch.Tensor,
+    known: tuple[np.ndarray, np.ndarray],
+    budget: int,
+) -> np.ndarray:
+    """
+    Rang der richtigen Antwort unter allen Kandidaten, je Anfrage.
+
+    query[i] (= e_kopf * r) wird blockweise gegen alle Kandidaten gerechnet
+    (torch.mm), ein Block (Anfragen x Kandidaten) bleibt unter `budget`
+    Bytes. Auch der Score der Antwort stammt aus diesen Blöcken: float32 aus
+    einem anderen Kernel weicht in den letzten Bits ab, und die Antwort
+    schlüge sich sonst selbst. Gefiltert wird im Block: bekannte Partner
+    und die Antwort selbst werden NaN (vergleicht nie wahr), gezählt werden
+    höhere und gleiche Scores der übrigen Kandidaten. Gleichstände zählen
+    mit dem mittleren Rang.
+    """
+    num_queries, num_candidates = len(answer), candidates.shape[0]
+    answer_t = torch.from_numpy(answer)
+    owner, partner = known  # nach Anfrage sortiert (known_pairs)
+    ranks = np.empty(num_queries)
+
+    rows = max(min(budget // (BYTES_PER_SCORE * num_candidates), num_queries), 1)
+    cols = max(min(budget // (BYTES_PER_SCORE * rows), num_candidates, MAX_BLOCK_COLS), 1)
+    col_blocks = range(0, num_candidates, cols)
+    # Puffer einmal anlegen: neue Blöcke je Schritt kosten vor allem Page Faults
+    scores_buf, cmp_buf = torch.empty(rows, cols), torch.empty(rows, cols)
+
+    def block(q: torch.Tensor, c0: int) -> torch.Tensor:
+        c = candidates[c0:c0 + cols]
+        return torch.mm(q, c.T, out=scores_buf[:len(q), :len(c)])
+
+    for q0 in range(0, num_queries, rows):
+        q = query[q0:q0 + rows]
+        a = answer_t[q0:q0 + len(q)]
+        lo, hi = np.searchsorted(owner, [q0, q0 + len(q)])
+        o, p = torch.from_numpy(owner[lo:hi] - q0), torch.from_numpy(partner[lo:hi])
+        s = torch.empty(len(q), 1)
+        if len(col_blocks) > 1:
+            # Score der Antwort vorab aus ihrem Block (gleiche Form, gleiches Ergebnis)
+            for c0 in col_blocks:
+                hit = ((a >= c0) & (a < c0 + cols)).nonzero().squeeze(1)
+                if len(hit):
+                    s[hit, 0] = block(q, c0)[hit, a[hit] - c0]
+        higher = torch.zeros(len(q), dtype=torch.long)
+        equal = torch.zeros(len(q), dtype=torch.long)
+        for c0 in col_blocks:
+            scores = block(q, c0)
+            if len(col_blocks) == 1:
+                s[:, 0] = scores[torch.arange(len(q)), a]
+            hit = ((a >= c0) & (a < c0 + cols)).nonzero().squeeze(1)
+            scores[hit, a[hit] - c0] = float("nan")
+            inside = (p >= c0) & (p < c0 + cols)
+            scores[o[inside], p[inside] - c0] = float("nan")
+            cmp = cmp_buf[:scores.shape[0], :scores.shape[1]]
+            higher += torch.gt(scores, s, out=cmp).sum(1).long()
+            equal += torch.eq(scores, s, out=cmp).sum(1).long()
+        ranks[q0:q0 + len(q)] = (1 + higher + equal / 2).numpy()
+    return ranks
+
+
+def rank_metrics(ranks: np.ndarray) -> dict[str, float]:
+    out = {"count": int(len(ranks)), "mrr": float(np.mean(1.0 / ranks)) if len(ranks) else 0.0}
+    for k in HITS_AT:
+        out[f"hits@{k}"] = float(np.mean(ranks <= k)) if len(ranks) else 0.0
+    return out
+
+
+def evaluate_relation(
+    model: RGCN, data, emb: dict[str, torch.Tensor], r: int, edge_type: tuple[str, str, str],
+    split: np.ndarray, which: int, sides: list[str], budget: int,
+) -> dict:
+    """
+    Ränge der Kanten eines Splits einer Relation: "tail" = (kopf, r, ?)
+    gegen alle Knoten des Zieltyps, "head" = (?, r, ziel) gegen alle Köpfe.
+    """
+    src_type, _, dst_type = edge_type
+    store = data[edge_type]
+    src, dst = store.edge_index.numpy()
+    edges = np.flatnonzero(split == which)
+    relation = model.relation[r]
+    ranks = {}
+    heads, tails = src[edges], dst[edges]
+    with torch.no_grad():
+        if "tail" in sides:
+            query = emb[src_type][torch.from_numpy(heads)] * relation
+            known = known_pairs(store.rowptr.numpy(), dst, heads)
+            ranks["tail"] = filtered_ranks(query, tails, emb[dst_type], known, budget)
+        if "head" in sides:
+            query = emb[dst_type][torch.from_numpy(tails)] * relation
+            known = known_pairs(store.colptr.numpy(), src[store.csc_perm.numpy()], tails)
+            ranks["head"] = filtered_ranks(query, heads, emb[src_type], known, budget)
+    return ranks
+
+
+def evaluate(args) -> dict:
+    data = load_graph(args.graph)
+    model, config, targets = load_model(args.model, data)
+    if args.relations:
+        targets_eval = [et for et in targets if et[1] in args.relations]
+    else:
+        targets_eval = targets
+    which = TEST if args.split == "test" else VAL
+    splits = edge_splits(data, targets)  # derselbe Split wie im Training
+    sampler = NeighborSampler(data, parse_fanouts(args.fanout or config["fanout"], config["fanout_rel"]),
+                              splits)
+
+    started = time.perf_counter()
+    ntypes = {et[0] for et in targets_eval} | {et[2] for et in targets_eval}
+    emb = embed_nodes(model, data, sampler, ntypes, args.embed_batch, args.seed)
+    print(f"[INFO] Embedded {sum(len(e) for e in emb.values()):,} nodes in {time.perf_counter() - started:.1f} s")
+
+    # Relationen parallel; das Speicherbudget wird auf die Threads aufgeteilt
+    workers = max(min(args.workers, len(targets_eval)), 1)
+    budget = int(args.memory_mb * 1024 * 1024 / workers)
+
+    def run(edge_type):
+        return evaluate_relation(model, data, emb, targets.index(edge_type), edge_type, splits[edge_type],
+                                 which, args.sides, budget)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(targets_eval, pool.map(run, targets_eval)))
+    elapsed = time.perf_counter() - started
+
+    per_relation, all_ranks = {}, []
+    for edge_type, ranks in results.items():
+        per_relation[edge_type[1]] = {side: rank_metrics(r) for side, r in ranks.items()}
+        both = np.concatenate(list(ranks.values()))
+        per_relation[edge_type[1]]["both"] = rank_metrics(both)
+        all_ranks.append(both)
+    overall = rank_metrics(np.concatenate(all_ranks) if all_ranks else np.empty(0))
+    queries = overall["count"]
+    print(f"[INFO] Ranked {queries:,} queries in {elapsed:.1f} s ({queries / max(elapsed, 1e-9):,.0f} queries/s)")
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": args.model,
+        "split": args.split,
+        "sides": args.sides,
+        "filtered": True,
+        "relations": per_relation,
+        "overall": overall,
+    }
+
+
+def print_report(report: dict) -> None:
+    header = f"{'relation':<24} {'count':>8} {'MRR':>7}" + "".join(f" {'H@' + str(k):>7}" for k in HITS_AT)
+    print(header)
+    print("-" * len(header))
+    rows = [(rel, m["both"]) for rel, m in report["relations"].items()] + [("overall", report["overall"])]
+    for name, m in rows:
+        print(f"{name:<24} {m['count']:>8,} {m['mrr']:>7.4f}" + "".join(f" {m[f'hits@{k}']:>7.4f}" for k in HITS_AT))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Filtered ranking evaluation (MRR, Hits@k) of a trained R-GCN")
+    parser.add_argument("--graph", default=GRAPH_DIR, help=f"graph directory (default: {GRAPH_DIR})")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"checkpoint (default: {MODEL_PATH})")
+    parser.add_argument("--split", choices=["test", "val"], default="test")
+    parser.add_argument("--relations", nargs="+", help="evaluate only these target relations")
+    parser.add_argument("--sides", nargs="+", choices=["tail", "head"], default=["tail", "head"],
+                        help="corrupt the tail, the head or both (default: both)")
+    parser.add_argument("--memory-mb", type=float, default=MEMORY_BUDGET_MB,
+                        help=f"memory for score blocks, shared by the workers (default: {MEMORY_BUDGET_MB})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="relations evaluated in parallel (default: CPU count)")
+    parser.add_argument("--fanout", nargs="+", type=int, help="fan-out for the embeddings (default: as trained)")
+    parser.add_argument("--embed-batch", type=int, default=EMBED_BATCH, help="seed nodes per embedding batch")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=REPORT_PATH, help=f"JSON report (default: {REPORT_PATH})")
+    args = parser.parse_args(argv)
+
+    report = evaluate(args)
+    print_report(report)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Wrote report to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
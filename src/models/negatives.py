@@ -0,0 +1,141 @@
+import numpy as np
+from torch_geometric.data import HeteroData
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+# Füllgrad der Hash-Tabelle (lineares Sondieren: ~2.5 Proben je Fehlanfrage)
+MAX_LOAD = 0.5
+# Gewicht eines Knotens beim Korrumpieren: Grad ** DEGREE_POWER
+# (0 = gleichverteilt, 1 = gradproportional)
+DEGREE_POWER = 0.75
+# Anteil der Negative mit korrumpiertem Kopf statt Ziel
+HEAD_FRACTION = 0.5
+# Wie oft echte Kanten unter den Negativen neu gezogen werden
+MAX_RETRIES = 10
+
+EMPTY = -1
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def pack(src: np.ndarray, dst: np.ndarray, num_dst: int) -> np.ndarray:
+    """
+    (src, dst) -> ein int64-Schlüssel src * num_dst + dst.
+    """
+    return np.asarray(src, dtype=np.int64) * num_dst + np.asarray(dst, dtype=np.int64)
+
+
+class EdgeHash:
+    """
+    Menge von int64-Schlüsseln (gepackte Kanten) als offene Hash-Tabelle mit
+    linearem Sondieren, komplett in NumPy: Einfügen und Nachschlagen laufen
+    für alle Schlüssel zugleich, eine Runde pro Sondierschritt.
+    """
+
+    def __init__(self, keys: np.ndarray, max_load: float = MAX_LOAD):
+        self.bits = max(int(np.ceil(np.log2(max(len(keys), 1) / max_load))), 4)
+        self.mask = (1 << self.bits) - 1
+        self.table = np.full(1 << self.bits, EMPTY, dtype=np.int64)
+        pending = np.asarray(keys, dtype=np.int64)
+        slot = self.slot(pending)
+        while len(pending):
+            free = self.table[slot] == EMPTY
+            # bei mehreren Bewerbern um einen freien Platz gewinnt einer,
+            # die anderen sondieren weiter
+            self.table[slot[free]] = pending[free]
+            todo = self.table[slot] != pending
+            pending, slot = pending[todo], (slot[todo] + 1) & self.mask
+        self.size = int((self.table != EMPTY).sum())
+
+    def slot(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Fibonacci-Hashing: die oberen Bits von key * 2^64/phi.
+        """
+        return ((keys.astype(np.uint64) * GOLDEN) >> np.uint64(64 - self.bits)).astype(np.int64)
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        keys = np.asarray(keys, dtype=np.int64)
+        found = np.zeros(len(keys), dtype=bool)
+        idx = np.arange(len(keys))
+        slot = self.slot(keys)
+        while len(idx):
+            current = self.table[slot]
+            hit = current == keys[idx]
+            found[idx[hit]] = True
+            todo = ~hit & (current != EMPTY)
+            idx, slot = idx[todo], (slot[todo] + 1) & self.mask
+        return found
+
+
+def degree_cdf(ptr: np.ndarray, power: float) -> np.ndarray | None:
+    """
+    Kumulierte Gewichte Grad ** power aus CSR/CSC-Zeigern; None = gleichverteilt.
+    """
+    if power == 0:
+        return None
+    weight = np.diff(np.asarray(ptr)).astype(np.float64) ** power
+    cdf = np.cumsum(weight)
+    return cdf if cdf[-1] > 0 else None
+
+
+class NegativeSampler:
+    """
+    Negative Kanten je Zielrelation: Kopf oder Ziel einer positiven Kante
+    wird durch einen Knoten des passenden Typs ersetzt, gezogen mit Gewicht
+    Grad ** power (Grad in dieser Relation, aus rowptr/colptr). Treffer auf
+    echte Kanten (alle Splits, EdgeHash) werden bis zu `max_retries` Mal
+    neu gezogen; `false_negatives` zählt, was danach noch übrig bleibt.
+    """
+
+    def __init__(
+        self,
+        data: HeteroData,
+        targets: list[tuple[str, str, str]],
+        power: float = DEGREE_POWER,
+        head_fraction: float = HEAD_FRACTION,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.targets = targets
+        self.head_fraction = head_fraction
+        self.max_retries = max_retries
+        self.false_negatives = 0
+        self.num_src, self.num_dst, self.hashes, self.cdfs = [], [], [], []
+        for edge_type in targets:
+            src_type, _, dst_type = edge_type
+            store = data[edge_type]
+            src, dst = store.edge_index.numpy()
+            num_dst = data[dst_type].num_nodes
+            self.num_src.append(data[src_type].num_nodes)
+            self.num_dst.append(num_dst)
+            self.hashes.append(EdgeHash(pack(src, dst, num_dst)))
+            self.cdfs.append((degree_cdf(store.rowptr.numpy(), power), degree_cdf(store.colptr.numpy(), power)))
+
+    def nodes(self, cdf: np.ndarray | None, num_nodes: int, n: int, rng: np.random.Generator) -> np.ndarray:
+        if cdf is None:
+            return rng.integers(0, num_nodes, n)
+        return np.searchsorted(cdf, rng.random(n) * cdf[-1], side="right")
+
+    def is_true(self, r: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        return self.hashes[r].contains(pack(src, dst, self.num_dst[r]))
+
+    def sample(
+        self, r: int, src: np.ndarray, dst: np.ndarray, k: int, rng: np.random.Generator
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        `k` Negative je positiver Kante (src, dst) der Relation `r`, als
+        (neg_src, neg_dst) der Länge k * len(src), geordnet wie
+        np.tile(src, k): erst das erste Negativ jeder Kante, dann das zweite.
+        """
+        neg_src, neg_dst = np.tile(src, k), np.tile(dst, k)
+        head = rng.random(len(neg_src)) < self.head_fraction
+        todo = np.arange(len(neg_src))
+        for _ in range(self.max_retries + 1):
+            h = head[todo]
+            heads, tails = todo[h], todo[~h]
+            neg_src[heads] = self.nodes(self.cdfs[r][0], self.num_src[r], len(heads), rng)
+            neg_dst[tails] = self.nodes(self.cdfs[r][1], self.num_dst[r], len(tails), rng)
+            todo = todo[self.is_true(r, neg_src[todo], neg_dst[todo])]
+            if len(todo) == 0:
+                break
+        self.false_negatives += len(todo)
+        return neg_src, neg_dst
@@ -0,0 +1,248 @@
+import warnings
+
+import torch
+from torch import nn
+from torch_geometric.data import HeteroData
+
+try:
+    from pyg_lib.ops import segment_matmul as pyg_segment_matmul
+except ImportError:  # optional, sonst Schleife über die Segmente
+    pyg_segment_matmul = None
+
+warnings.filterwarnings("ignore", message="Sparse CSR tensor support is in beta state")
+
+
+# -----------------------------------------
+# Layer
+# -----------------------------------------
+class RGCNLayer(nn.Module):
+    """
+    R-GCN-Layer (Schlichtkrull et al.) für heterogene Graphen:
+    h_i' = W_0 h_i + sum_r 1/c_{i,r} sum_{j in N_r(i)} W_r h_j,
+    mit c_{i,r} = Anzahl Nachbarn von i über Relation r. Eine volle
+    Gewichtsmatrix und eine Aggregation pro Relation.
+    """
+
+    def __init__(self, in_dim: int, out_dim: int, relations: list[dict]):
+        super().__init__()
+        self.relations = relations
+        self.root = nn.Linear(in_dim, out_dim)
+        self.weight = nn.ParameterDict({
+            rel["name"]: nn.Parameter(torch.empty(in_dim, out_dim)) for rel in relations
+        })
+        for w in self.weight.values():
+            nn.init.xavier_uniform_(w)
+
+    def forward(self, h: dict[str, torch.Tensor], edge_index: dict[str, torch.Tensor]) -> dict[str, torch.Tensor]:
+        out = {ntype: self.root(x) for ntype, x in h.items()}
+        for rel in self.relations:
+            if rel["name"] not in edge_index:
+                continue
+            src, dst = edge_index[rel["name"]]
+            if len(src) == 0:
+                continue
+            num_dst = h[rel["dst"]].shape[0]
+            messages = h[rel["src"]][src] @ self.weight[rel["name"]]
+            deg = torch.bincount(dst, minlength=num_dst).clamp(min=1).to(messages.dtype)
+            agg = torch.zeros(num_dst, messages.shape[1], dtype=messages.dtype)
+            agg.index_add_(0, dst, messages)
+            out[rel["dst"]] = out[rel["dst"]] + agg / deg[:, None]
+        return out
+
+    @staticmethod
+    def prepare(num_nodes: dict[str, int], edge_index: dict[str, torch.Tensor], relations: list[dict]):
+        return edge_index
+
+
+class Adjacency:
+    """
+    Alle Relationen eines (Teil-)Graphen als eine dünne CSR-Matrix über die
+    aneinandergehängten Knoten aller Typen. Zeile = Segment (Relation r,
+    Zielknoten i), Spalte = Quellknoten, Wert = 1/c_{i,r}. Die Segmente
+    sind nach Relation sortiert (`rel_ptr`), `seg_dst` ist der Zielknoten
+    jedes Segments. Wird einmal pro Batch gebaut und von allen Layern genutzt.
+    """
+
+    def __init__(self, num_nodes: dict[str, int], edge_index: dict[str, torch.Tensor], relations: list[dict]):
+        self.types = list(num_nodes)
+        sizes = torch.tensor([num_nodes[t] for t in self.types])
+        self.sizes = sizes.tolist()
+        offset = dict(zip(self.types, (torch.cumsum(sizes, 0) - sizes).tolist()))
+        total = int(sizes.sum())
+
+        cols, vals, counts, seg_dst, rel_ptr = [], [], [], [], [0]
+        num_segments = 0
+        for rel in relations:
+            ei = edge_index.get(rel["name"])
+            if ei is not None and ei.shape[1] > 0:
+                # nach Ziel sortiert: jede Zeile der CSR-Matrix ist ein Zielknoten
+                dst, perm = torch.sort(ei[1])
+                targets, count = torch.unique_consecutive(dst, return_counts=True)
+                cols.append(ei[0][perm] + offset[rel["src"]])
+                vals.append(torch.repeat_interleave(1.0 / count.float(), count))
+                counts.append(count)
+                seg_dst.append(targets + offset[rel["dst"]])
+                num_segments += len(targets)
+            rel_ptr.append(num_segments)
+
+        crow = torch.zeros(num_segments + 1, dtype=torch.long)
+        if cols:
+            crow[1:] = torch.cumsum(torch.cat(counts), 0)
+        cols = torch.cat(cols) if cols else torch.empty(0, dtype=torch.long)
+        vals = torch.cat(vals) if vals else torch.empty(0)
+        self.matrix = torch.sparse_csr_tensor(crow, cols, vals, size=(num_segments, total), check_invariants=False)
+        self.seg_dst = torch.cat(seg_dst) if seg_dst else torch.empty(0, dtype=torch.long)
+        self.rel_ptr = rel_ptr
+        self.num_edges = len(vals)
+
+
+def segment_matmul(x: torch.Tensor, ptr: list[int], weight: torch.Tensor) -> torch.Tensor:
+    """
+    Zeilen ptr[r]:ptr[r + 1] von x mal weight[r], für alle Relationen in
+    einem Aufruf (pyg_lib, falls installiert, sonst eine Schleife über die
+    Segmente; split/cat statt Slices, deren Rückwärtsschritt je Segment
+    einen Gradienten in voller Größe anlegt).
+    """
+    if pyg_segment_matmul is not None:
+        return pyg_segment_matmul(x, torch.tensor(ptr), weight)
+    sizes = [ptr[r + 1] - ptr[r] for r in range(len(ptr) - 1)]
+    return torch.cat([seg @ weight[r] for r, seg in enumerate(torch.split(x, sizes))])
+
+
+class FusedRGCNLayer(nn.Module):
+    """
+    Dieselbe R-GCN-Gleichung wie RGCNLayer, aber erst aggregiert, dann
+    transformiert: eine dünne Matrixmultiplikation über alle Relationen
+    (Adjacency) ergibt die gemittelten Eingaben je (Relation, Zielknoten),
+    danach eine Segment-Matrixmultiplikation mit den Relationsgewichten.
+    Es entsteht kein Nachrichten-Tensor pro Kante.
+
+    Gewichte: voll (R x in x out), Basis-Zerlegung (`num_bases`:
+    W_r = sum_b a_rb V_b) oder blockdiagonal (`num_blocks`: W_r besteht aus
+    num_blocks Blöcken der Größe in/num_blocks x out/num_blocks).
+    """
+
+    def __init__(self, in_dim: int, out_dim: int, relations: list[dict],
+                 num_bases: int | None = None, num_blocks: int | None = None):
+        super().__init__()
+        if num_bases and num_blocks:
+            raise ValueError("use either num_bases or num_blocks")
+        self.relations = relations
+        self.root = nn.Linear(in_dim, out_dim)
+        self.num_bases, self.num_blocks = num_bases, num_blocks
+        num_rel = len(relations)
+        if num_bases:
+            self.basis = nn.Parameter(torch.empty(num_bases, in_dim, out_dim))
+            self.comp = nn.Parameter(torch.empty(num_rel, num_bases))
+            nn.init.xavier_uniform_(self.basis)
+            nn.init.xavier_uniform_(self.comp)
+        elif num_blocks:
+            if in_dim % num_blocks or out_dim % num_blocks:
+                raise ValueError(f"in_dim and out_dim must be divisible by num_blocks={num_blocks}")
+            self.blocks = nn.Parameter(
+                torch.empty(num_rel, num_blocks, in_dim // num_blocks, out_dim // num_blocks)
+            )
+            nn.init.xavier_uniform_(self.blocks.view(-1, *self.blocks.shape[2:]))
+        else:
+            self.weight = nn.Parameter(torch.empty(num_rel, in_dim, out_dim))
+            nn.init.xavier_uniform_(self.weight)
+
+    @staticmethod
+    def prepare(num_nodes: dict[str, int], edge_index: dict[str, torch.Tensor], relations: list[dict]):
+        return Adjacency(num_nodes, edge_index, relations)
+
+    def transform(self, x: torch.Tensor, ptr: list[int]) -> torch.Tensor:
+        if self.num_blocks:
+            sizes = [ptr[r + 1] - ptr[r] for r in range(len(ptr) - 1)]
+            return torch.cat([
+                torch.einsum("nki,kio->nko", seg.view(-1, *self.blocks.shape[1:3]), self.blocks[r]).flatten(1)
+                for r, seg in enumerate(torch.split(x, sizes))
+            ])
+        if self.num_bases:
+            weight = torch.einsum("rb,bio->rio", self.comp, self.basis)
+        else:
+            weight = self.weight
+        return segment_matmul(x, ptr, weight)
+
+    def forward(self, h: dict[str, torch.Tensor], adj: Adjacency) -> dict[str, torch.Tensor]:
+        x = torch.cat([h[t] for t in adj.types])
+        out = self.root(x)
+        agg = torch.sparse.mm(adj.matrix, x)  # gemittelte Eingaben je (Relation, Ziel)
+        out = out.index_add(0, adj.seg_dst, self.transform(agg, adj.rel_ptr))
+        return dict(zip(adj.types, torch.split(out, adj.sizes)))
+
+
+# -----------------------------------------
+# Modell: Encoder + DistMult-Decoder
+# -----------------------------------------
+class RGCN(nn.Module):
+    """
+    Link Prediction auf dem HeteroData aus build_graph.py.
+
+    Eingabe je Knoten: eine lernbare Einbettung (sparse Gradienten, nur die
+    Zeilen des Mini-Batches werden angefasst) plus eine Projektion der
+    numerischen Features, wo features.py welche gesetzt hat. Darauf
+    `num_layers` R-GCN-Layer, bewertet wird mit DistMult
+    (score = <h_head, r, h_tail>).
+    """
+
+    def __init__(
+        self,
+        data: HeteroData,
+        relations: list[dict],
+        targets: list[tuple[str, str, str]],
+        dim: int = 64,
+        num_layers: int = 2,
+        dropout: float = 0.2,
+        layer_cls=RGCNLayer,
+        **layer_kwargs,
+    ):
+        super().__init__()
+        self.embedding = nn.ModuleDict({
+            ntype: nn.Embedding(data[ntype].num_nodes, dim, sparse=True) for ntype in data.node_types
+        })
+        for emb in self.embedding.values():
+            nn.init.normal_(emb.weight, std=dim ** -0.5)
+        # Node-Typen mit echten Features (x_mean gibt es nur dort, sonst x = 1)
+        self.feature = nn.ModuleDict({
+            ntype: nn.Linear(data[ntype].x.shape[1], dim)
+            for ntype in data.node_types if "x_mean" in data[ntype]
+        })
+        self.relations = relations
+        self.layers = nn.ModuleList([layer_cls(dim, dim, relations, **layer_kwargs) for _ in range(num_layers)])
+        self.relation = nn.Parameter(torch.ones(len(targets), dim))
+        self.dropout = nn.Dropout(dropout)
+
+    def sparse_parameters(self) -> list[nn.Parameter]:
+        return [emb.weight for emb in self.embedding.values()]
+
+    def dense_parameters(self) -> list[nn.Parameter]:
+        sparse = {id(p) for p in self.sparse_parameters()}
+        return [p for p in self.parameters() if id(p) not in sparse]
+
+    def encode(self, n_id: dict[str, torch.Tensor], edge_index: dict[str, torch.Tensor],
+               x: dict[str, torch.Tensor] | None = None) -> dict[str, torch.Tensor]:
+        # Adjazenz einmal pro Batch, für alle Layer
+        graph = self.layers[0].prepare({t: len(ids) for t, ids in n_id.items()}, edge_index, self.relations)
+        h = {}
+        for ntype, ids in n_id.items():
+            h[ntype] = self.embedding[ntype](ids)
+            if x is not None and ntype in self.feature:
+                h[ntype] = h[ntype] + self.feature[ntype](x[ntype])
+        for i, layer in enumerate(self.layers):
+            h = layer(h, graph)
+            if i < len(self.layers) - 1:
+                h = {ntype: self.dropout(torch.relu(v)) for ntype, v in h.items()}
+        return h
+
+    def score(self, h: dict[str, torch.Tensor], target: dict) -> torch.Tensor:
+        head = h[target["head_type"]][target["head"]]
+        tail = h[target["tail_type"]][target["tail"]]
+        return (head * self.relation[target["rel"]] * tail).sum(-1)
+
+
+def node_features(data: HeteroData, n_id: dict[str, torch.Tensor], model: RGCN) -> dict[str, torch.Tensor]:
+    """
+    Die (memory-mapped) Features der Knoten eines Mini-Batches, als float32.
+    """
+    return {ntype: data[ntype].x[ids].float() for ntype, ids in n_id.items() if ntype in model.feature}
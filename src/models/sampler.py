@@ -0,0 +1,358 @@
+import math
+import os
+import sys
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+from torch_geometric.data import HeteroData
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph"))
+from build_graph import REVERSE_PREFIX  # noqa: E402
+from negatives import NegativeSampler, pack  # noqa: E402
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+# Anteil Validierungs-/Testkanten je Zielrelation und Seed des Splits
+# (evaluate.py erzeugt denselben Split)
+VAL_FRACTION = 0.1
+TEST_FRACTION = 0.1
+SPLIT_SEED = 0
+
+TRAIN, VAL, TEST = 0, 1, 2
+
+
+# -----------------------------------------
+# Relationen und Split
+# -----------------------------------------
+def target_relations(data: HeteroData, names: list[str] | None = None) -> list[tuple[str, str, str]]:
+    """
+    Relationen, deren Kanten vorhergesagt werden (Standard: alle außer den
+    Rückwärts-Relationen), auch per Name wie "assoc_gene".
+    """
+    edge_types = [et for et in data.edge_types if not et[1].startswith(REVERSE_PREFIX)]
+    if names is None:
+        return edge_types
+    selected = [et for et in edge_types if et[1] in names or "__".join(et) in names]
+    missing = set(names) - {et[1] for et in selected} - {"__".join(et) for et in selected}
+    if missing:
+        raise KeyError(f"Unknown relations: {sorted(missing)}")
+    return selected
+
+
+def message_relations(data: HeteroData) -> list[dict]:
+    """
+    Relationen, entlang derer Nachrichten fließen (src -> dst): jede Relation
+    über ihre CSC-Struktur und, falls der Graph ohne --reverse gebaut wurde,
+    zusätzlich rückwärts über die CSR-Struktur ("rev_<rel>").
+    """
+    has_reverse = any(et[1].startswith(REVERSE_PREFIX) for et in data.edge_types)
+    relations = []
+    for edge_type in data.edge_types:
+        src_type, rel, dst_type = edge_type
+        relations.append({"name": rel, "src": src_type, "dst": dst_type, "edge_type": edge_type, "csc": True})
+        if not has_reverse:
+            relations.append({
+                "name": REVERSE_PREFIX + rel, "src": dst_type, "dst": src_type, "edge_type": edge_type, "csc": False,
+            })
+    return relations
+
+
+def split_edges(num_edges: int, val: float = VAL_FRACTION, test: float = TEST_FRACTION,
+                seed=SPLIT_SEED) -> np.ndarray:
+    """
+    Zufälliger, reproduzierbarer Split je Kante: TRAIN / VAL / TEST (uint8).
+    """
+    perm = np.random.default_rng(seed).permutation(num_edges)
+    split = np.full(num_edges, TRAIN, dtype=np.uint8)
+    n_val, n_test = int(num_edges * val), int(num_edges * test)
+    split[perm[:n_val]] = VAL
+    split[perm[n_val:n_val + n_test]] = TEST
+    return split
+
+
+def edge_splits(
+    data: HeteroData,
+    targets: list[tuple[str, str, str]],
+    val: float = VAL_FRACTION,
+    test: float = TEST_FRACTION,
+    seed: int = SPLIT_SEED,
+) -> dict:
+    """
+    Split jeder Zielrelation (Seed je Relation aus seed und Relationsname);
+    die Rückwärts-Relation (falls gebaut) bekommt denselben Split in ihrer
+    Reihenfolge (= CSC-Permutation der Relation).
+    """
+    splits = {}
+    for edge_type in targets:
+        rel_seed = [seed, *"__".join(edge_type).encode("utf-8")]
+        splits[edge_type] = split_edges(data[edge_type].num_edges, val, test, rel_seed)
+        src_type, rel, dst_type = edge_type
+        rev = (dst_type, REVERSE_PREFIX + rel, src_type)
+        if rev in data.edge_types:
+            splits[rev] = splits[edge_type][data[edge_type].csc_perm.numpy()]
+    return splits
+
+
+# -----------------------------------------
+# Nachbar-Sampling
+# -----------------------------------------
+def sample_neighbors(
+    ptr: np.ndarray, nodes: np.ndarray, fanout: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vektorisiert für alle `nodes` zugleich: Knoten mit höchstens `fanout`
+    Kanten behalten alle, sonst werden `fanout` Positionen gezogen (mit
+    Zurücklegen, Doppelte entfernt). Gibt (Zeile in nodes, Position in der
+    komprimierten Adjazenz) je gezogener Kante zurück. fanout < 0 = alle.
+    """
+    start = ptr[nodes]
+    deg = ptr[nodes + 1] - start
+    take = deg if fanout < 0 else np.minimum(deg, fanout)
+    owner = np.repeat(np.arange(len(nodes)), take)
+    offset = np.arange(len(owner)) - np.repeat(np.cumsum(take) - take, take)
+    full = np.repeat(take == deg, take)
+    drawn = (rng.random(len(owner)) * deg[owner]).astype(np.int64)
+    pos = np.where(full, offset, drawn)
+    if not full.all():
+        key = np.unique(owner * (deg.max() + 1) + pos)
+        owner, pos = key // (deg.max() + 1), key % (deg.max() + 1)
+    return owner, start[owner] + pos
+
+
+class NodeSet:
+    """
+    Knoten eines Typs in einem Mini-Batch: globale IDs in Einfüge-Reihenfolge
+    (die Seeds zuerst), lokale ID = Position. `index` bildet global -> lokal
+    ab (-1 = nicht im Batch); es wird einmal angelegt (8 Byte pro Knoten)
+    und nach jedem Batch nur an den benutzten Stellen zurückgesetzt.
+    """
+
+    def __init__(self, num_nodes: int):
+        self.index = np.full(num_nodes, -1, dtype=np.int64)
+        self.ids = np.empty(0, dtype=np.int64)
+
+    def add(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Fügt neue Knoten an; gibt die lokalen IDs von `nodes` und die neu
+        hinzugekommenen globalen IDs zurück.
+        """
+        new = np.unique(nodes[self.index[nodes] < 0])
+        self.index[new] = np.arange(len(self.ids), len(self.ids) + len(new))
+        self.ids = np.concatenate([self.ids, new])
+        return self.index[nodes], new
+
+    def clear(self) -> None:
+        self.index[self.ids] = -1
+        self.ids = np.empty(0, dtype=np.int64)
+
+
+class NeighborSampler:
+    """
+    Heterogenes k-Hop-Sampling mit Fan-out pro Relation und Hop, direkt auf
+    den CSR/CSC-Zeigern aus build_graph.py (memory-mapped, in den
+    Worker-Prozessen geteilt). Nachrichten laufen nur über Trainingskanten
+    und nie über die Zielkanten des eigenen Batches (`exclude`).
+    """
+
+    def __init__(self, data: HeteroData, fanouts: dict[str, list[int]], splits: dict | None = None):
+        self.relations = message_relations(data)
+        self.nodes = {ntype: NodeSet(data[ntype].num_nodes) for ntype in data.node_types}
+        self.num_nodes = {ntype: data[ntype].num_nodes for ntype in data.node_types}
+        self.fanouts = fanouts
+        self.num_hops = max(len(f) for f in fanouts.values())
+        self.arrays = []
+        for rel in self.relations:
+            store = data[rel["edge_type"]]
+            src, dst = store.edge_index.numpy()
+            if rel["csc"]:
+                ptr, perm, nbr = store.colptr.numpy(), store.csc_perm.numpy(), src
+            else:
+                ptr, perm, nbr = store.rowptr.numpy(), None, dst
+            split = (splits or {}).get(rel["edge_type"])
+            self.arrays.append((ptr, perm, nbr, split))
+            # zugehörige Vorwärts-Relation; flipped = Nachricht läuft dst -> src
+            src_type, name, dst_type = rel["edge_type"]
+            if name.startswith(REVERSE_PREFIX):
+                rel["forward"], rel["flipped"] = (dst_type, name[len(REVERSE_PREFIX):], src_type), rel["csc"]
+            else:
+                rel["forward"], rel["flipped"] = rel["edge_type"], not rel["csc"]
+
+    def fanout(self, rel: str, hop: int) -> int:
+        values = self.fanouts.get(rel, self.fanouts["default"])
+        return values[hop] if hop < len(values) else 0
+
+    def sample(
+        self,
+        seeds: dict[str, np.ndarray],
+        rng: np.random.Generator,
+        exclude: dict[tuple[str, str, str], tuple[np.ndarray, np.ndarray]] | None = None,
+    ) -> dict:
+        """
+        Seeds je Node-Typ -> Teilgraph: globale IDs je Typ (`n_id`, Seeds
+        zuerst, ihre lokalen IDs in `seed_local`) und lokale edge_index je
+        Nachrichten-Relation. Die Größe hängt nur von Seeds und Fan-out ab.
+        `exclude` je Zielrelation (src, dst) der Kanten, die weder vorwärts
+        noch rückwärts als Nachricht gezogen werden (die positiven Kanten
+        des Batches, sonst stünde die Antwort im Teilgraphen).
+        """
+        banned = {
+            et: pack(src, dst, self.num_nodes[et[2]]) for et, (src, dst) in (exclude or {}).items()
+        }
+        nodes = self.nodes
+        for node_set in nodes.values():
+            node_set.clear()
+        seed_local = {ntype: nodes[ntype].add(ids)[0] for ntype, ids in seeds.items()}
+        frontier = {ntype: nodes[ntype].ids.copy() for ntype in seeds}
+        edges = {rel["name"]: [] for rel in self.relations}
+
+        for hop in range(self.num_hops):
+            found = {}
+            for rel, (ptr, perm, nbr, split) in zip(self.relations, self.arrays):
+                targets = frontier.get(rel["dst"])
+                fanout = self.fanout(rel["name"], hop)
+                if targets is None or len(targets) == 0 or fanout == 0:
+                    continue
+                owner, pos = sample_neighbors(ptr, targets, fanout, rng)
+                edge = perm[pos] if perm is not None else pos
+                if split is not None:
+                    keep = split[edge] == TRAIN
+                    owner, edge = owner[keep], edge[keep]
+                if rel["forward"] in banned:
+                    head, tail = nbr[edge], targets[owner]
+                    if rel["flipped"]:
+                        head, tail = tail, head
+                    forward = rel["forward"]
+                    keep = ~np.isin(pack(head, tail, self.num_nodes[forward[2]]), banned[forward])
+                    owner, edge = owner[keep], edge[keep]
+                found.setdefault(rel["src"], []).append(nbr[edge])
+                edges[rel["name"]].append((nbr[edge], targets[owner]))
+
+            frontier = {}
+            for ntype, parts in found.items():
+                frontier[ntype] = nodes[ntype].add(np.concatenate(parts))[1]
+
+        edge_index = {}
+        for rel in self.relations:
+            parts = edges[rel["name"]]
+            if not parts:
+                continue
+            src = nodes[rel["src"]].add(np.concatenate([p[0] for p in parts]))[0]
+            dst = nodes[rel["dst"]].add(np.concatenate([p[1] for p in parts]))[0]
+            edge_index[rel["name"]] = torch.from_numpy(np.stack([src, dst]))
+        return {
+            "n_id": {ntype: torch.from_numpy(s.ids) for ntype, s in nodes.items() if len(s.ids)},
+            "seed_local": {ntype: torch.from_numpy(local) for ntype, local in seed_local.items()},
+            "edge_index": edge_index,
+        }
+
+
+# -----------------------------------------
+# Mini-Batches für Link Prediction
+# -----------------------------------------
+class LinkBatches(Dataset):
+    """
+    Ein Element = ein fertiger Mini-Batch: `batch_size` Kanten der
+    Zielrelationen (Split `split`), je `negatives` Negative aus dem
+    NegativeSampler (Kopf oder Ziel ersetzt, echte Kanten ausgefiltert),
+    und der gesampelte Teilgraph um alle beteiligten Knoten. Mit einem
+    DataLoader(batch_size=None, num_workers=n) entstehen die Batches
+    parallel in Worker-Prozessen.
+
+    Mit `world_size` > 1 (train_ddp.py) sieht jeder Rang einen disjunkten,
+    gleich großen Teil der Kanten jeder Epoche (Rest fällt weg), damit alle
+    Ränge gleich viele Schritte machen.
+    """
+
+    def __init__(
+        self,
+        data: HeteroData,
+        sampler: NeighborSampler,
+        targets: list[tuple[str, str, str]],
+        splits: dict,
+        split: int = TRAIN,
+        batch_size: int = 1024,
+        negatives: int = 1,
+        seed: int = 0,
+        shuffle: bool = True,
+        negative_sampler: NegativeSampler | None = None,
+        rank: int = 0,
+        world_size: int = 1,
+    ):
+        self.sampler = sampler
+        self.negative_sampler = negative_sampler or NegativeSampler(data, targets)
+        self.targets = targets
+        self.batch_size = batch_size
+        self.negatives = negatives
+        self.seed = seed
+        self.shuffle = shuffle
+        self.rank = rank
+        self.world_size = world_size
+        self.epoch = 0
+        self.edges = [data[et].edge_index.numpy() for et in targets]
+        # (Relation, Kante) aller Kanten im Split
+        ids = [np.flatnonzero(splits[et] == split) for et in targets]
+        self.rel = np.concatenate([np.full(len(i), r, dtype=np.int64) for r, i in enumerate(ids)])
+        self.edge = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+        self._order = (None, None)  # (Epoche, Permutation), je Worker einmal berechnet
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.edge) // self.world_size / self.batch_size)
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def order(self) -> np.ndarray:
+        if self._order[0] != self.epoch:
+            order = (
+                np.random.default_rng([self.seed, self.epoch]).permutation(len(self.edge))
+                if self.shuffle else np.arange(len(self.edge))
+            )
+            per_rank = len(order) // self.world_size
+            self._order = (self.epoch, order[self.rank::self.world_size][:per_rank])
+        return self._order[1]
+
+    def __getitem__(self, index: int) -> dict:
+        rng = np.random.default_rng([self.seed, self.epoch, self.rank, index])
+        chosen = self.order()[index * self.batch_size:(index + 1) * self.batch_size]
+        rel, edge = self.rel[chosen], self.edge[chosen]
+
+        # Seeds je Node-Typ; groups merkt sich, wo Köpfe und Ziele einer
+        # Relation in den Seeds ihres Typs liegen
+        seeds: dict[str, list[np.ndarray]] = {}
+        counts: dict[str, int] = {}
+        groups = []
+        exclude = {}
+        for r, (src_type, _, dst_type) in enumerate(self.targets):
+            mask = rel == r
+            if not mask.any():
+                continue
+            src, dst = self.edges[r][:, edge[mask]]
+            exclude[self.targets[r]] = (src, dst)
+            neg_src, neg_dst = self.negative_sampler.sample(r, src, dst, self.negatives, rng)
+            # Paare = [positiv, negativ_1, ..., negativ_k]
+            heads, tails = np.concatenate([src, neg_src]), np.concatenate([dst, neg_dst])
+            head_start = counts.get(src_type, 0)
+            seeds.setdefault(src_type, []).append(heads)
+            counts[src_type] = head_start + len(heads)
+            tail_start = counts.get(dst_type, 0)
+            seeds.setdefault(dst_type, []).append(tails)
+            counts[dst_type] = tail_start + len(tails)
+            groups.append((r, src_type, head_start, dst_type, tail_start, len(src), len(heads)))
+
+        batch = self.sampler.sample({t: np.concatenate(s) for t, s in seeds.items()}, rng, exclude)
+        local = batch.pop("seed_local")
+        batch["target"] = [
+            {
+                "rel": r,
+                "head_type": src_type,
+                "tail_type": dst_type,
+                "head": local[src_type][h0:h0 + n],
+                "tail": local[dst_type][t0:t0 + n],
+                "label": torch.cat([torch.ones(pos), torch.zeros(n - pos)]),
+            }
+            for r, src_type, h0, dst_type, t0, pos, n in groups
+        ]
+        batch["num_edges"] = sum(e.shape[1] for e in batch["edge_index"].values())
+        return batch
@@ -0,0 +1,290 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+import psutil
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph"))
+from graph_store import load_graph  # noqa: E402
+from negatives import NegativeSampler  # noqa: E402
+from rgcn import RGCN  # noqa: E402
+from sampler import (  # noqa: E402
+    TRAIN, VAL, LinkBatches, NeighborSampler, edge_splits, message_relations, target_relations,
+)
+from train_rgcn import MB, batch_loss, build_parser, layer_options, make_loader, parse_fanouts, validate  # noqa: E402
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+SCALING_PATH = "data/manifests/ddp_scaling.json"
+MASTER_ADDR = "127.0.0.1"
+MASTER_PORT = 29500
+# Schritte, die nicht in den Durchsatz eingehen (DataLoader-Start, erste Allokationen)
+WARMUP_STEPS = 3
+# Schritte je Lauf im Skalierungs-Modus, wenn --max-steps nicht gesetzt ist
+SCALING_STEPS = 50
+
+
+# -----------------------------------------
+# Gemeinsame Daten (einmal im Elternprozess)
+# -----------------------------------------
+def shared_state(args) -> dict:
+    """
+    Graph, Split und Samplertabellen werden einmal geladen bzw. gebaut und
+    per fork an die Ränge vererbt: die Graph-Tensoren sind memory-mapped
+    (dieselben Seiten im Page Cache), die NumPy-Tabellen werden nur gelesen
+    und bleiben copy-on-write geteilt.
+    """
+    data = load_graph(args.graph)
+    targets = target_relations(data, args.relations)
+    splits = edge_splits(data, targets)
+    return {
+        "data": data,
+        "targets": targets,
+        "splits": splits,
+        "relations": message_relations(data),
+        "negatives": NegativeSampler(data, targets, power=args.neg_power, head_fraction=args.neg_head_fraction),
+    }
+
+
+# -----------------------------------------
+# Gradienten-Synchronisation
+# -----------------------------------------
+def all_reduce_dense(params: list[torch.nn.Parameter], world_size: int) -> None:
+    """
+    Ein all_reduce über alle dichten Gradienten (ein flacher Puffer), danach
+    gemittelt. Parameter ohne Gradient (Relation nicht im Batch) zählen als 0.
+    """
+    grads = [p.grad if p.grad is not None else torch.zeros_like(p) for p in params]
+    flat = torch.cat([g.reshape(-1) for g in grads])
+    dist.all_reduce(flat)
+    flat /= world_size
+    offset = 0
+    for p in params:
+        p.grad = flat[offset:offset + p.numel()].view_as(p)
+        offset += p.numel()
+
+
+def all_gather_sparse(params: list[torch.nn.Parameter], world_size: int) -> None:
+    """
+    Dünne Einbettungs-Gradienten: jeder Rang schickt nur seine Zeilen
+    (Index + Werte, auf die größte Zeilenzahl aufgefüllt, gloo braucht
+    gleich große Puffer); die Summe aller Ränge, gemittelt, ersetzt p.grad.
+    """
+    for p in params:
+        dim = p.shape[1]
+        if p.grad is None:
+            index, values = torch.empty(0, dtype=torch.long), torch.empty(0, dim)
+        else:
+            grad = p.grad.coalesce()
+            index, values = grad.indices()[0], grad.values()
+        sizes = [torch.zeros(1, dtype=torch.long) for _ in range(world_size)]
+        dist.all_gather(sizes, torch.tensor([len(index)]))
+        longest = int(max(sizes))
+        if longest == 0:
+            continue
+        padded_index = torch.zeros(longest, dtype=torch.long)
+        padded_values = torch.zeros(longest, dim)
+        padded_index[:len(index)], padded_values[:len(index)] = index, values
+        indices = [torch.empty_like(padded_index) for _ in range(world_size)]
+        rows = [torch.empty_like(padded_values) for _ in range(world_size)]
+        dist.all_gather(indices, padded_index)
+        dist.all_gather(rows, padded_values)
+        index = torch.cat([i[:int(n)] for i, n in zip(indices, sizes)])
+        values = torch.cat([v[:int(n)] for v, n in zip(rows, sizes)]) / world_size
+        p.grad = torch.sparse_coo_tensor(index[None], values, p.shape, check_invariants=False).coalesce()
+
+
+# -----------------------------------------
+# Ein Rang
+# -----------------------------------------
+def worker(rank: int, world_size: int, args, shared: dict, result_path: str | None) -> None:
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+    torch.set_num_threads(args.threads or max((os.cpu_count() or 1) // world_size, 1))
+    torch.manual_seed(args.seed)
+    data, targets, splits = shared["data"], shared["targets"], shared["splits"]
+
+    # Layer = Hops des Samplers (--fanout-rel kann mehr Hops haben als --fanout)
+    sampler = NeighborSampler(data, parse_fanouts(args.fanout, args.fanout_rel), splits)
+    model = RGCN(data, shared["relations"], targets, dim=args.dim, num_layers=sampler.num_hops,
+                 dropout=args.dropout, **layer_options(args))
+    for tensor in model.state_dict().values():
+        dist.broadcast(tensor, 0)
+    sparse_opt = torch.optim.SparseAdam(model.sparse_parameters(), lr=args.lr)
+    dense_opt = torch.optim.Adam(model.dense_parameters(), lr=args.lr)
+
+    train_set = LinkBatches(data, sampler, targets, splits, TRAIN, args.batch_size, args.negatives, args.seed,
+                            negative_sampler=shared["negatives"], rank=rank, world_size=world_size)
+    if rank == 0:
+        print(f"[INFO] {world_size} ranks, {len(train_set)} steps per epoch, "
+              f"{torch.get_num_threads()} threads per rank")
+
+    process = psutil.Process()
+    step, measured, started = 0, torch.zeros(3, dtype=torch.float64), None  # Kanten, gesampelte Kanten, Schritte
+    window = torch.zeros(3, dtype=torch.float64)
+    window_start = time.perf_counter()
+    for epoch in range(args.epochs):
+        train_set.set_epoch(epoch)
+        for batch in make_loader(train_set, args.workers):
+            loss, _, _ = batch_loss(model, data, batch)
+            sparse_opt.zero_grad()
+            dense_opt.zero_grad()
+            loss.backward()
+            all_reduce_dense(model.dense_parameters(), world_size)
+            all_gather_sparse(model.sparse_parameters(), world_size)
+            sparse_opt.step()
+            dense_opt.step()
+
+            step += 1
+            counts = torch.tensor([
+                sum(int(t["label"].sum()) for t in batch["target"]), batch["num_edges"], 1,
+            ], dtype=torch.float64)
+            window += counts
+            if step == WARMUP_STEPS:
+                dist.barrier()
+                started = time.perf_counter()
+            elif step > WARMUP_STEPS:
+                measured += counts
+            if step % args.log_every == 0:
+                dist.all_reduce(window)  # Summe über alle Ränge
+                if rank == 0:
+                    elapsed = time.perf_counter() - window_start
+                    print(
+                        f"[INFO] epoch {epoch + 1} step {step}: loss {loss.item():.4f}, "
+                        f"{window[0] / elapsed:,.0f} target edges/s, {window[1] / elapsed:,.0f} sampled edges/s, "
+                        f"RSS {process.memory_info().rss / MB:.0f} MB (rank 0)"
+                    )
+                window.zero_()
+                window_start = time.perf_counter()
+            if args.max_steps and step >= args.max_steps:
+                break
+
+        if args.val_batches and rank == 0:
+            val_set = LinkBatches(data, sampler, targets, splits, VAL, args.batch_size, args.negatives, args.seed,
+                                  shuffle=False, negative_sampler=shared["negatives"])
+            metrics = validate(model, data, make_loader(val_set, args.workers), args.val_batches)
+            print(f"[INFO] epoch {epoch + 1}: val loss {metrics['loss']:.4f}, "
+                  f"val accuracy {metrics['accuracy']:.3f}")
+        dist.barrier()
+        if args.max_steps and step >= args.max_steps:
+            break
+
+    dist.barrier()
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    dist.all_reduce(measured)
+    # PSS statt RSS: geteilte Seiten (Graph-mmap, geerbte Tabellen) zählen je Rang anteilig
+    pss = torch.tensor([process.memory_full_info().pss / MB], dtype=torch.float64)
+    dist.all_reduce(pss)
+    if rank == 0:
+        steps = int(measured[2]) // world_size
+        result = {
+            "world_size": world_size,
+            "threads_per_rank": torch.get_num_threads(),
+            "steps": steps,
+            "seconds": round(elapsed, 3),
+            "step_s": round(elapsed / max(steps, 1), 4),
+            "target_edges_per_s": round(float(measured[0]) / elapsed, 1) if elapsed else 0.0,
+            "sampled_edges_per_s": round(float(measured[1]) / elapsed, 1) if elapsed else 0.0,
+            "pss_mb_total": round(float(pss), 1),
+        }
+        if result_path:
+            with open(result_path, "w") as f:
+                json.dump(result, f)
+        if not args.scaling:
+            os.makedirs(os.path.dirname(args.out), exist_ok=True)
+            config = {**vars(args), "num_layers": sampler.num_hops}
+            torch.save({"model": model.state_dict(), "config": config, "targets": targets}, args.out)
+            print(f"[INFO] Saved model to {args.out}")
+    dist.destroy_process_group()
+
+
+def launch(args, shared: dict, world_size: int, port: int) -> dict:
+    """
+    Startet `world_size` Ränge per fork (erben `shared` ohne Kopie) und
+    gibt die Kennzahlen von Rang 0 zurück.
+    """
+    os.environ["MASTER_ADDR"] = args.master_addr
+    os.environ["MASTER_PORT"] = str(port)
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_path = f.name
+    try:
+        mp.start_processes(worker, args=(world_size, args, shared, result_path), nprocs=world_size,
+                           start_method="fork")
+        with open(result_path) as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+# -----------------------------------------
+# Skalierung
+# -----------------------------------------
+def scaling_report(results: list[dict]) -> list[dict]:
+    """
+    Schwache Skalierung (Batch je Rang fest): Speedup = Durchsatz(N) /
+    Durchsatz(kleinste N), Effizienz = Speedup / (N / kleinste N).
+    """
+    base = results[0]
+    for r in results:
+        speedup = r["target_edges_per_s"] / base["target_edges_per_s"] if base["target_edges_per_s"] else 0.0
+        r["speedup"] = round(speedup, 3)
+        r["efficiency"] = round(speedup / (r["world_size"] / base["world_size"]), 3)
+    return results
+
+
+def print_scaling(results: list[dict]) -> None:
+    print(f"{'ranks':>5} {'threads':>7} {'step s':>8} {'edges/s':>10} {'speedup':>8} {'efficiency':>10} {'PSS MB':>8}")
+    for r in results:
+        print(
+            f"{r['world_size']:>5} {r['threads_per_rank']:>7} {r['step_s']:>8.3f} {r['target_edges_per_s']:>10,.0f} "
+            f"{r['speedup']:>8.2f} {r['efficiency']:>10.2f} {r['pss_mb_total']:>8.0f}"
+        )
+
+
+def main(argv=None):
+    parser = build_parser()
+    parser.description = "Train the R-GCN with several processes (gloo all-reduce, sharded training edges)"
+    parser.add_argument("--world-size", type=int, default=os.cpu_count() or 1, help="training processes")
+    parser.add_argument("--threads", type=int, default=0, help="torch threads per rank (default: cores / ranks)")
+    parser.add_argument("--scaling", nargs="+", type=int, metavar="N",
+                        help=f"measure throughput for these rank counts instead of training, "
+                             f"report to --scaling-out (default: {SCALING_STEPS} steps each)")
+    parser.add_argument("--scaling-out", default=SCALING_PATH)
+    parser.add_argument("--master-addr", default=MASTER_ADDR)
+    parser.add_argument("--master-port", type=int, default=MASTER_PORT)
+    parser.set_defaults(workers=1)
+    args = parser.parse_args(argv)
+
+    shared = shared_state(args)
+    if not args.scaling:
+        result = launch(args, shared, args.world_size, args.master_port)
+        print(f"[INFO] {result['target_edges_per_s']:,.0f} target edges/s over {result['world_size']} ranks")
+        return
+
+    args.max_steps = args.max_steps or SCALING_STEPS
+    args.val_batches = 0
+    results = []
+    for i, world_size in enumerate(sorted(args.scaling)):
+        # eigener Port je Lauf, der vorige kann noch in TIME_WAIT sein
+        results.append(launch(args, shared, world_size, args.master_port + i))
+    results = scaling_report(results)
+    print_scaling(results)
+    os.makedirs(os.path.dirname(args.scaling_out) or ".", exist_ok=True)
+    with open(args.scaling_out, "w") as f:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "cpu_count": os.cpu_count(),
+            "batch_size_per_rank": args.batch_size,
+            "steps": args.max_steps,
+            "results": results,
+        }, f, indent=2)
+    print(f"[INFO] Wrote scaling report to {args.scaling_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import os
+import sys
+import time
+
+import psutil
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph"))
+from graph_store import GRAPH_DIR, load_graph  # noqa: E402
+from negatives import DEGREE_POWER, HEAD_FRACTION, NegativeSampler  # noqa: E402
+from rgcn import RGCN, FusedRGCNLayer, RGCNLayer, node_features  # noqa: E402
+from sampler import (  # noqa: E402
+    TRAIN, VAL, LinkBatches, NeighborSampler, edge_splits, message_relations, target_relations,
+)
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+MODEL_PATH = "data/processed/rgcn.pt"
+MB = 1024 * 1024
+LAYERS = {"loop": RGCNLayer, "fused": FusedRGCNLayer}
+
+
+def parse_fanouts(default: list[int], overrides: list[str]) -> dict[str, list[int]]:
+    """
+    "assoc_gene=5,2" -> {"assoc_gene": [5, 2]}; -1 = alle Nachbarn.
+    """
+    fanouts = {"default": default}
+    for item in overrides:
+        rel, _, values = item.partition("=")
+        fanouts[rel] = [int(v) for v in values.split(",")]
+    return fanouts
+
+
+def layer_options(args) -> dict:
+    """
+    Layer-Klasse und Gewichts-Zerlegung; Basis/Block gibt es nur im fused Layer.
+    """
+    if args.layer == "loop":
+        if args.num_bases or args.num_blocks:
+            raise ValueError("--num-bases/--num-blocks require --layer fused")
+        return {"layer_cls": RGCNLayer}
+    return {"layer_cls": FusedRGCNLayer, "num_bases": args.num_bases, "num_blocks": args.num_blocks}
+
+
+def batch_loss(model: RGCN, data, batch: dict) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    x = node_features(data, batch["n_id"], model)
+    h = model.encode(batch["n_id"], batch["edge_index"], x)
+    scores = torch.cat([model.score(h, t) for t in batch["target"]])
+    labels = torch.cat([t["label"] for t in batch["target"]])
+    return F.binary_cross_entropy_with_logits(scores, labels), scores, labels
+
+
+def make_loader(dataset: LinkBatches, workers: int) -> DataLoader:
+    """
+    Ein Element des Datasets ist schon ein ganzer Mini-Batch; die Worker
+    bereiten die nächsten Batches vor, während trainiert wird.
+    """
+    return DataLoader(
+        dataset,
+        batch_size=None,
+        num_workers=workers,
+        prefetch_factor=2 if workers else None,
+    )
+
+
+@torch.no_grad()
+def validate(model: RGCN, data, loader: DataLoader, max_batches: int) -> dict[str, float]:
+    model.eval()
+    losses, correct, total = [], 0, 0
+    for i, batch in enumerate(loader):
+        if i >= max_batches:
+            break
+        loss, scores, labels = batch_loss(model, data, batch)
+        losses.append(loss.item())
+        correct += int(((scores > 0).float() == labels).sum())
+        total += len(labels)
+    model.train()
+    return {"loss": sum(losses) / max(len(losses), 1), "accuracy": correct / max(total, 1)}
+
+
+def train(args) -> RGCN:
+    torch.manual_seed(args.seed)
+    data = load_graph(args.graph)  # memory-mapped, die Worker teilen sich die Seiten
+    targets = target_relations(data, args.relations)
+    splits = edge_splits(data, targets)
+    relations = message_relations(data)
+    sampler = NeighborSampler(data, parse_fanouts(args.fanout, args.fanout_rel), splits)
+    print(f"[INFO] {len(targets)} target relations, {len(relations)} message relations, "
+          f"{sampler.num_hops} hops")
+
+    negatives = NegativeSampler(data, targets, power=args.neg_power, head_fraction=args.neg_head_fraction)
+    train_set = LinkBatches(data, sampler, targets, splits, TRAIN, args.batch_size, args.negatives, args.seed,
+                            negative_sampler=negatives)
+    val_set = LinkBatches(data, sampler, targets, splits, VAL, args.batch_size, args.negatives, args.seed,
+                          shuffle=False, negative_sampler=negatives)
+    model = RGCN(data, relations, targets, dim=args.dim, num_layers=sampler.num_hops, dropout=args.dropout,
+                 **layer_options(args))
+    sparse_opt = torch.optim.SparseAdam(model.sparse_parameters(), lr=args.lr)
+    dense_opt = torch.optim.Adam(model.dense_parameters(), lr=args.lr)
+    process = psutil.Process()
+
+    step = 0
+    for epoch in range(args.epochs):
+        train_set.set_epoch(epoch)
+        window = {"targets": 0, "edges": 0, "loss": 0.0, "steps": 0, "start": time.perf_counter()}
+        for batch in make_loader(train_set, args.workers):
+            loss, _, _ = batch_loss(model, data, batch)
+            sparse_opt.zero_grad()
+            dense_opt.zero_grad()
+            loss.backward()
+            sparse_opt.step()
+            dense_opt.step()
+
+            step += 1
+            window["targets"] += sum(int(t["label"].sum()) for t in batch["target"])
+            window["edges"] += batch["num_edges"]
+            window["loss"] += loss.item()
+            window["steps"] += 1
+            if step % args.log_every == 0:
+                elapsed = time.perf_counter() - window["start"]
+                print(
+                    f"[INFO] epoch {epoch + 1} step {step}: loss {window['loss'] / window['steps']:.4f}, "
+                    f"{window['targets'] / elapsed:,.0f} target edges/s, "
+                    f"{window['edges'] / elapsed:,.0f} sampled edges/s, "
+                    f"RSS {process.memory_info().rss / MB:.0f} MB"
+                )
+                window = {"targets": 0, "edges": 0, "loss": 0.0, "steps": 0, "start": time.perf_counter()}
+            if args.max_steps and step >= args.max_steps:
+                break
+
+        metrics = validate(model, data, make_loader(val_set, args.workers), args.val_batches)
+        print(f"[INFO] epoch {epoch + 1}: val loss {metrics['loss']:.4f}, val accuracy {metrics['accuracy']:.3f}")
+        if args.max_steps and step >= args.max_steps:
+            break
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    torch.save({
+        "model": model.state_dict(),
+        "config": {**vars(args), "num_layers": sampler.num_hops},
+        "targets": targets,
+    }, args.out)
+    print(f"[INFO] Saved model to {args.out}")
+    return model
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Train an R-GCN for link prediction with neighbor sampling")
+    parser.add_argument("--graph", default=GRAPH_DIR, help=f"graph directory (default: {GRAPH_DIR})")
+    parser.add_argument("--relations", nargs="+", help="target relations (default: all except rev_*)")
+    parser.add_argument("--fanout", nargs="+", type=int, default=[10, 5],
+                        help="neighbors per relation and hop, one value per layer (default: 10 5)")
+    parser.add_argument("--fanout-rel", nargs="+", default=[], metavar="REL=K1,K2",
+                        help="fan-out of single relations, e.g. measured_in=3,1")
+    parser.add_argument("--batch-size", type=int, default=1024, help="positive edges per batch (default: 1024)")
+    parser.add_argument("--negatives", type=int, default=1, help="negatives per positive edge (default: 1)")
+    parser.add_argument("--neg-power", type=float, default=DEGREE_POWER,
+                        help=f"negatives are drawn with weight degree**power, 0 = uniform (default: {DEGREE_POWER})")
+    parser.add_argument("--neg-head-fraction", type=float, default=HEAD_FRACTION,
+                        help=f"share of negatives with a corrupted head instead of tail (default: {HEAD_FRACTION})")
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--layer", choices=sorted(LAYERS), default="fused",
+                        help="loop = one aggregation per relation, fused = one sparse matmul (default: fused)")
+    parser.add_argument("--num-bases", type=int, help="basis decomposition of the relation weights")
+    parser.add_argument("--num-blocks", type=int, help="block-diagonal relation weights (must divide --dim)")
+    parser.add_argument("--dropout", type=float, default=0.2)
+    parser.add_argument("--lr", type=float, default=0.01)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--max-steps", type=int, default=0, help="stop after this many steps (0 = no limit)")
+    parser.add_argument("--workers", type=int, default=2, help="batch preparation processes (default: 2)")
+    parser.add_argument("--log-every", type=int, default=20)
+    parser.add_argument("--val-batches", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=MODEL_PATH, help=f"checkpoint (default: {MODEL_PATH})")
+    return parser
+
+
+def main(argv=None):
+    train(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import csv
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+CHUNK_ROWS = 200_000
+
+# Columns that identify one association row per table; the remaining
+# columns are its payload (names, values, ...).
+DELTA_KEYS: dict[str, list[str]] = {
+    "disease_gene": ["DiseaseCui", "GeneId"],
+    "disease_gene_fusion": ["DiseaseCui", "GeneFusion"],
+    "disease_chromosomal_rearrangement": ["DiseaseCui", "ChromosomalRearrengementName"],
+    "disease_variant": ["DiseaseCui", "VariantId", "GeneId"],
+    "pathway_disease_association": ["PathwayDiseaseAssociation", "GeneProductId"],
+    "disease_gene_pathway": ["DiseaseCui", "GeneId", "PathwayId"],
+    "disease_biomarker": ["DiseaseCui", "BiomarkerId"],
+    "chemical_evidence": ["ChemicalId", "EvidenceId"],
+    "chemical_location": ["ChemicalId", "CityId"],
+    "disease_demographics": ["DiseaseCui", "DemographicGroup"],
+}
+
+DELTA_SETS = ("added", "removed", "changed")
+
+
+# -----------------------------------------
+# Helper
+# -----------------------------------------
+def delta_dir(out_path: str) -> str:
+    return os.path.splitext(out_path)[0] + ".delta"
+
+
+def snapshot_path(out_path: str) -> str:
+    return os.path.join(delta_dir(out_path), "snapshot.csv")
+
+
+def read_header(path: str) -> list[str]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def key_columns(out_path: str, keys: list[str] | None = None) -> list[str]:
+    """
+    Explicit keys, else the table's default keys, else the whole row.
+    """
+    header = read_header(out_path)
+    name = os.path.splitext(os.path.basename(out_path))[0]
+    keys = keys or DELTA_KEYS.get(name) or header
+    missing = [k for k in keys if k not in header]
+    if missing:
+        raise ValueError(f"Key columns {missing} not in {out_path}")
+    return keys
+
+
+def iter_chunks(path: str):
+    # everything as text, so the fingerprints don't depend on type inference
+    yield from pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=CHUNK_ROWS)
+
+
+def combine(hashes: list[np.ndarray], n: int) -> np.ndarray:
+    out = np.zeros(n, dtype=np.uint64)
+    for h in hashes:
+        out = (out * np.uint64(1_000_003)) ^ h  # wraps around, as intended
+    return out
+
+
+def hash_chunk(chunk: pd.DataFrame, keys: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    64-bit hashes of the key columns and of the whole row; every column is
+    hashed once.
+    """
+    cols = {c: pd.util.hash_array(chunk[c].to_numpy()) for c in chunk.columns}
+    key_hash = combine([cols[c] for c in keys], len(chunk))
+    row_hash = combine([key_hash] + [h for c, h in cols.items() if c not in keys], len(chunk))
+    return key_hash, row_hash
+
+
+# -----------------------------------------
+# Fingerprints
+# -----------------------------------------
+def fingerprints(path: str, keys: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (sorted unique key hashes, content digest per key). Several rows
+    with the same key (e.g. one variant in several data sources) are folded
+    into one order-independent digest. Needs 16 bytes per row.
+    """
+    key_parts, row_parts = [], []
+    for chunk in iter_chunks(path):
+        k, r = hash_chunk(chunk, keys)
+        key_parts.append(k)
+        row_parts.append(r)
+    if not key_parts:
+        return np.empty(0, np.uint64), np.empty(0, np.uint64)
+
+    key_hash, row_hash = np.concatenate(key_parts), np.concatenate(row_parts)
+    order = np.lexsort((row_hash, key_hash))
+    key_hash, row_hash = key_hash[order], row_hash[order]
+    # drop duplicate rows, then xor the remaining rows of each key
+    unique = np.r_[True, (key_hash[1:] != key_hash[:-1]) | (row_hash[1:] != row_hash[:-1])]
+    key_hash, row_hash = key_hash[unique], row_hash[unique]
+    starts = np.flatnonzero(np.r_[True, key_hash[1:] != key_hash[:-1]])
+    return key_hash[starts], np.bitwise_xor.reduceat(row_hash, starts)
+
+
+def diff(old: tuple[np.ndarray, np.ndarray],
+         new: tuple[np.ndarray, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Key hashes that were added, removed or whose rows changed.
+    """
+    old_keys, old_digest = old
+    new_keys, new_digest = new
+    in_old = np.isin(new_keys, old_keys, assume_unique=True)
+    in_new = np.isin(old_keys, new_keys, assume_unique=True)
+
+    common = new_keys[in_old]
+    old_pos = np.searchsorted(old_keys, common)
+    changed = common[old_digest[old_pos] != new_digest[in_old]]
+    return {
+        "added": new_keys[~in_old],
+        "removed": old_keys[~in_new],
+        "changed": changed,
+    }
+
+
+def write_rows(path: str, keys: list[str], selections: dict[str, np.ndarray]) -> dict[str, int]:
+    """
+    One pass over `path`: copies the rows whose key hash is in
+    selections[out_path] to out_path, for every output file.
+    """
+    counts = {out: 0 for out in selections}
+    files = {out: open(out, "w", newline="", encoding="utf-8") for out in selections}
+    try:
+        for f in files.values():
+            csv.writer(f, lineterminator="\n").writerow(read_header(path))
+        if not any(len(sel) for sel in selections.values()):
+            return counts
+        for chunk in iter_chunks(path):
+            key_hash = combine([pd.util.hash_array(chunk[c].to_numpy()) for c in keys], len(chunk))
+            for out, sel in selections.items():
+                rows = chunk[np.isin(key_hash, sel)]
+                rows.to_csv(files[out], index=False, header=False, lineterminator="\n")
+                counts[out] += len(rows)
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+# -----------------------------------------
+# Delta export
+# -----------------------------------------
+def compare_tables(old_path: str, new_path: str, keys: list[str], out_dir: str) -> dict:
+    """
+    Writes added.csv / removed.csv / changed.csv (new version of the rows)
+    for two snapshots of a table and returns their row counts.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    changes = diff(fingerprints(old_path, keys), fingerprints(new_path, keys))
+    out = {name: os.path.join(out_dir, f"{name}.csv") for name in DELTA_SETS}
+    counts = write_rows(old_path, keys, {out["removed"]: changes["removed"]})
+    counts.update(write_rows(new_path, keys, {out["added"]: changes["added"],
+                                              out["changed"]: changes["changed"]}))
+    return {name: counts[out[name]] for name in DELTA_SETS}
+
+
+def keep_previous(out_path: str) -> None:
+    """
+    Before the first delta export, the existing table becomes the snapshot.
+    """
+    snapshot = snapshot_path(out_path)
+    if not os.path.exists(snapshot) and os.path.exists(out_path):
+        os.makedirs(delta_dir(out_path), exist_ok=True)
+        shutil.copyfile(out_path, snapshot)
+
+
+def export_delta(out_path: str, keys: list[str] | None = None) -> dict:
+    """
+    Compares the freshly exported out_path with the snapshot of the last
+    delta export, writes the change sets to <table>.delta/ and makes
+    out_path the new snapshot. Without a snapshot there is nothing to
+    compare and only the snapshot is written.
+    """
+    keys = key_columns(out_path, keys)
+    out_dir = delta_dir(out_path)
+    snapshot = snapshot_path(out_path)
+    info = {"keys": keys, "dir": out_dir}
+
+    if os.path.exists(snapshot):
+        info.update(compare_tables(snapshot, out_path, keys, out_dir))
+        print(f"[INFO] delta: +{info['added']} -{info['removed']} ~{info['changed']} → {out_dir}")
+    else:
+        os.makedirs(out_dir, exist_ok=True)
+        info["baseline"] = True
+        print(f"[INFO] delta: no snapshot yet, {out_path} becomes the baseline")
+
+    tmp = snapshot + ".tmp"
+    shutil.copyfile(out_path, tmp)
+    os.replace(tmp, snapshot)
+    return info
+
+
+# -----------------------------------------
+# Main
+# -----------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two snapshots of an export table")
+    parser.add_argument("old", help="previous CSV")
+    parser.add_argument("new", help="current CSV")
+    parser.add_argument("--keys", nargs="+", default=None,
+                        help="key columns (default: the table's keys, e.g. ChemicalId CityId)")
+    parser.add_argument("--out", default=None, help="output directory (default: <new>.delta)")
+    args = parser.parse_args()
+
+    keys = key_columns(args.new, args.keys)
+    counts = compare_tables(args.old, args.new, keys, args.out or delta_dir(args.new))
+    print(f"keys {keys}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
@@ -0,0 +1,152 @@
+import argparse
+import glob
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import sparql_utils
+from telemetry import MANIFEST_DIR, load_manifest, manifest_path, now_iso
+from sparql_utils import add_export_args, finish_export_args
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+EXPORT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# -----------------------------------------
+# Helper
+# -----------------------------------------
+def discover_exporters(only: list[str] | None = None) -> list:
+    """
+    Imports every export_*.py next to this script that defines QUERY,
+    OUTPUT_FILE and run_query().
+    """
+    modules = []
+    for path in sorted(glob.glob(os.path.join(EXPORT_DIR, "export_*.py"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name == "export_all":
+            continue
+        if only and name not in only and name.removeprefix("export_") not in only:
+            continue
+        module = importlib.import_module(name)
+        if not all(hasattr(module, a) for a in ("QUERY", "OUTPUT_FILE", "run_query")):
+            print(f"[WARN] {name} does not look like an exporter, skipping.")
+            continue
+        modules.append(module)
+    return modules
+
+
+def current_manifest(module, since: float) -> dict | None:
+    """
+    The exporter's manifest, but only if it was written at or after `since`
+    (a manifest left over from an earlier run is not this run's result).
+    """
+    out_path = os.path.join(module.OUTPUT_DIR, module.OUTPUT_FILE)
+    path = manifest_path(out_path)
+    if not os.path.exists(path) or os.path.getmtime(path) < since:
+        return None
+    return load_manifest(out_path)
+
+
+def run_one(module, options: dict) -> dict:
+    start = time.perf_counter()
+    started = time.time()
+    try:
+        rows = module.run_query(**options)
+        status, error = "ok", ""
+    except Exception as e:
+        rows, status, error = None, "failed", f"{type(e).__name__}: {e}"
+        print(f"Error running {module.__name__}: {e}")
+    manifest = current_manifest(module, started)
+    if manifest is not None and manifest.get("status") == "regression":
+        status = "regress"
+    elif manifest is None or (status == "failed" and manifest.get("status") == "ok"):
+        # no manifest from this run (failed before export_query could write
+        # one) or the export itself succeeded and a later step failed
+        manifest = {"exporter": module.__name__, "output": module.OUTPUT_FILE, "status": status}
+        if error:
+            manifest["error"] = error
+    return {
+        "exporter": module.__name__,
+        "output": module.OUTPUT_FILE,
+        "status": status,
+        "rows": rows,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+        "manifest": manifest,
+    }
+
+
+def write_run_manifest(results: list[dict], started_at: str, wall: float) -> str:
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    path = os.path.join(MANIFEST_DIR, "export_all.json")
+    run = {
+        "started_at": started_at,
+        "wall_s": round(wall, 3),
+        "status": "ok" if all(r["status"] == "ok" for r in results) else "failed",
+        "exports": [r["manifest"] for r in sorted(results, key=lambda r: r["exporter"])],
+    }
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+    return path
+
+
+def print_summary(results: list[dict], wall: float) -> None:
+    print()
+    print(f"{'exporter':<32} {'status':<7} {'rows':>9} {'MB':>7} {'seconds':>9}")
+    print("-" * 68)
+    for r in sorted(results, key=lambda r: r["exporter"]):
+        rows = "-" if r["rows"] is None else r["rows"]
+        mb = r["manifest"].get("bytes", 0) / 1024**2
+        print(f"{r['exporter']:<32} {r['status']:<7} {rows:>9} {mb:>7.1f} {r['seconds']:>9.1f}")
+    print("-" * 68)
+    slowest = max((r["seconds"] for r in results), default=0.0)
+    serial = sum(r["seconds"] for r in results)
+    print(f"wall {wall:.1f}s | slowest query {slowest:.1f}s | serial sum {serial:.1f}s")
+
+
+# -----------------------------------------
+# Main
+# -----------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run all SPARQL exporters concurrently")
+    parser.add_argument("--only", nargs="*", help="exporter names, e.g. gene_fusion")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of exporters running at the same time (default: all)")
+    parser.add_argument("--max-per-endpoint", type=int, default=sparql_utils.MAX_PER_ENDPOINT,
+                        help="max. concurrent requests against one endpoint")
+    add_export_args(parser)
+    args = finish_export_args(parser.parse_args(argv))
+
+    options = vars(args).copy()
+    for key in ("only", "workers", "max_per_endpoint"):
+        options.pop(key)
+
+    sparql_utils.set_endpoint_limit(args.max_per_endpoint)
+    modules = discover_exporters(args.only)
+    if not modules:
+        print("[WARN] No exporters found.")
+        return 1
+
+    started_at = now_iso()
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=args.workers or len(modules)) as pool:
+        futures = [pool.submit(run_one, m, options) for m in modules]
+        for fut in as_completed(futures):
+            results.append(fut.result())
+
+    wall = time.perf_counter() - start
+    print_summary(results, wall)
+    print(f"Run manifest → {write_run_manifest(results, started_at, wall)}")
+    if args.use_cache:
+        print(sparql_utils.get_cache().summary())
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
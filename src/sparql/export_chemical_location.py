@@ -1,6 +1,7 @@
 import os
-import pandas as pd
-from SPARQLWrapper import SPARQLWrapper, JSON
+import sys
+
+from sparql_utils import export_query, parse_export_args
 
 # -----------------------------------------
 # Konfiguration
@@ -69,34 +70,20 @@ WHERE {
 # -----------------------------------------
 # Helper
 # -----------------------------------------
-def run_query():
+def run_query(**options):
     print(f"Running Chemical–Location Association query → {OUTPUT_FILE}")
 
-    sparql = SPARQLWrapper(ENDPOINT)
-    sparql.setQuery(QUERY)
-    sparql.setReturnFormat(JSON)
-
-    results = sparql.query().convert()
-
-    vars_ = results["head"]["vars"]
-    rows = []
-
-    for b in results["results"]["bindings"]:
-        row = {v: b[v]["value"] if v in b else None for v in vars_}
-        rows.append(row)
-
-    df = pd.DataFrame(rows)
     out_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
-    df.to_csv(out_path, index=False)
-
-    print(f"Saved {len(df)} rows to {out_path}")
+    return export_query(ENDPOINT, QUERY, out_path, **options)
 
 
 # -----------------------------------------
 # Main
 # -----------------------------------------
 if __name__ == "__main__":
+    args = parse_export_args()
     try:
-        run_query()
+        run_query(**vars(args))
     except Exception as e:
         print(f"Error running Chemical–Location Association export: {e}")
+        sys.exit(1)
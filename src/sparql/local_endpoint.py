@@ -0,0 +1,185 @@
+import argparse
+import glob
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import rdflib
+
+from sparql_utils import RESULT_FORMATS
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+FIXTURE = "data/fixtures/lung_cabo_sample.ttl"
+HOST = "127.0.0.1"
+PORT = 8890
+PATH = "/sparql"
+
+RDF_FORMATS = {".nt": "nt", ".ttl": "turtle", ".n3": "n3", ".nq": "nquads", ".rdf": "xml"}
+MIME_TO_FORMAT = {mime: fmt for fmt, mime in RESULT_FORMATS.items()}
+MIME_TO_FORMAT["application/sparql-results+xml"] = "xml"
+
+PREFIX_RE = re.compile(r"PREFIX\s+(\w*):\s*<([^>]*)>", re.IGNORECASE)
+
+
+# -----------------------------------------
+# Store
+# -----------------------------------------
+def load_graph(paths: list[str]) -> rdflib.Graph:
+    """
+    Loads N-Triples/Turtle dumps (files or directories) into one in-memory graph.
+    """
+    graph = rdflib.Graph()
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "*"))) if os.path.isdir(path) else [path]
+        for file in files:
+            fmt = RDF_FORMATS.get(os.path.splitext(file)[1].lower())
+            if fmt is None:
+                continue
+            graph.parse(file, format=fmt)
+            print(f"[INFO] loaded {file}")
+    return graph
+
+
+def normalize_prefixes(query: str) -> str:
+    """
+    rdflib rejects queries that bind two prefixes to the same IRI (the
+    variant query uses OBO: and geno: for the OBO namespace). Rewrites every
+    use of such an alias to the first prefix and drops its declaration.
+    """
+    first: dict[str, str] = {}
+    aliases: dict[str, str] = {}
+    for name, iri in PREFIX_RE.findall(query):
+        if iri in first and first[iri] != name:
+            aliases[name] = first[iri]
+        first.setdefault(iri, name)
+    for alias, name in aliases.items():
+        query = re.sub(rf"PREFIX\s+{alias}:\s*<[^>]*>\s*", "", query, flags=re.IGNORECASE)
+        query = re.sub(rf"(?<![\w?$:]){alias}:", f"{name}:", query)
+    return query
+
+
+def tsv_term(term) -> str:
+    if term is None:
+        return ""
+    if isinstance(term, rdflib.Literal):
+        value = (str(term).replace("\\", "\\\\").replace('"', '\\"')
+                 .replace("\n", "\\n").replace("\t", "\\t").replace("\r", "\\r"))
+        if term.language:
+            return f'"{value}"@{term.language}'
+        if term.datatype:
+            return f'"{value}"^^<{term.datatype}>'
+        return f'"{value}"'
+    if isinstance(term, rdflib.BNode):
+        return f"_:{term}"
+    return f"<{term}>"
+
+
+def serialize(result, fmt: str) -> bytes:
+    if fmt == "tsv":  # rdflib has no TSV result serializer
+        lines = ["\t".join(f"?{v}" for v in result.vars)]
+        lines += ["\t".join(tsv_term(t) for t in row) for row in result]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+    return result.serialize(format=fmt)
+
+
+# -----------------------------------------
+# Server
+# -----------------------------------------
+class SparqlHandler(BaseHTTPRequestHandler):
+    """
+    Minimal SPARQL 1.1 protocol: GET ?query=... or POST (form-encoded or
+    application/sparql-query), result format picked from the Accept header.
+    """
+
+    protocol_version = "HTTP/1.1"
+    graph: rdflib.Graph
+    lock = threading.Lock()  # rdflib's query engine is not thread-safe
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.answer(url.path, parse_qs(url.query).get("query", [None])[0])
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        if self.headers.get("Content-Type", "").startswith("application/sparql-query"):
+            query = body
+        else:
+            query = parse_qs(body).get("query", [None])[0]
+        self.answer(urlparse(self.path).path, query)
+
+    def answer(self, path: str, query: str | None):
+        if path != PATH:
+            return self.send_text(404, f"Unknown path {path}, use {PATH}")
+        if not query:
+            return self.send_text(400, "Missing 'query' parameter")
+
+        mime = self.pick_format()
+        try:
+            with self.lock:
+                result = self.graph.query(normalize_prefixes(query))
+                body = serialize(result, MIME_TO_FORMAT[mime])
+        except Exception as e:
+            return self.send_text(400, f"{type(e).__name__}: {e}")
+
+        self.send_response(200)
+        self.send_header("Content-Type", f"{mime}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def pick_format(self) -> str:
+        for part in self.headers.get("Accept", "").split(","):
+            mime = part.split(";")[0].strip()
+            if mime in MIME_TO_FORMAT:
+                return mime
+        return RESULT_FORMATS["json"]
+
+    def send_text(self, status: int, text: str):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def make_server(graph: rdflib.Graph, host: str = HOST, port: int = PORT) -> ThreadingHTTPServer:
+    handler = type("Handler", (SparqlHandler,), {"graph": graph})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve_in_background(paths: list[str], host: str = HOST, port: int = 0):
+    """
+    Starts the endpoint on a daemon thread (port 0 = any free port).
+    Returns (server, endpoint_url); stop it with server.shutdown().
+    """
+    server = make_server(load_graph(paths), host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{PATH}"
+
+
+# -----------------------------------------
+# Main
+# -----------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve an RDF dump as a local SPARQL endpoint")
+    parser.add_argument("--data", nargs="+", default=[FIXTURE],
+                        help="N-Triples/Turtle files or directories to load")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    graph = load_graph(args.data)
+    server = make_server(graph, args.host, args.port)
+    print(f"[INFO] {len(graph)} triples on http://{args.host}:{server.server_address[1]}{PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
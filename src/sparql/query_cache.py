@@ -0,0 +1,222 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import BinaryIO, Iterable, Iterator
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+CACHE_DIR = "data/cache/sparql"
+CACHE_TTL = 7 * 24 * 3600  # seconds
+CACHE_MAX_BYTES = 2 * 1024**3
+
+INDEX_FILE = "index.json"
+
+
+# -----------------------------------------
+# Helper
+# -----------------------------------------
+def normalize_query(query: str) -> str:
+    # whitespace only: comments can't be stripped safely because of IRIs (...#>)
+    return " ".join(query.split())
+
+
+def cache_key(endpoint: str, query: str, fmt: str) -> str:
+    text = "\n".join([endpoint, normalize_query(query), fmt])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """
+    Content-addressed cache for raw SPARQL responses.
+
+    Every response is stored as one file named after the hash of
+    (endpoint, normalized query, result format). index.json keeps size,
+    creation and last access time per entry plus the cumulative hit/miss
+    statistics. Entries older than `ttl` are treated as misses, and once the
+    cache grows beyond `max_bytes` the least recently used entries are evicted.
+    Access times and statistics are written back on close() (or at exit),
+    new entries right away.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        ttl: float = CACHE_TTL,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._read_index()
+        atexit.register(self.close)
+
+    # ---------- index ----------
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _read_index(self) -> dict:
+        path = self._index_path()
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {"entries": {}, "stats": {"hits": 0, "misses": 0, "evictions": 0}}
+
+    def _write_index(self) -> None:
+        tmp = self._index_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path())
+        self._dirty = False
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _count(self, stat: str) -> None:
+        setattr(self, stat, getattr(self, stat) + 1)
+        self._index["stats"][stat] += 1
+        self._dirty = True
+
+    def _drop(self, key: str) -> None:
+        self._index["entries"].pop(key, None)
+        self._dirty = True
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    # ---------- API ----------
+    def lookup(self, endpoint: str, query: str, fmt: str) -> BinaryIO | None:
+        """
+        Returns a fresh cached response opened for reading (and counts a
+        hit), or None (and counts a miss). The file is opened under the
+        lock, so another thread evicting the entry afterwards cannot pull it
+        away from the caller.
+        """
+        key = cache_key(endpoint, query, fmt)
+        with self._lock:
+            entry = self._index["entries"].get(key)
+            now = time.time()
+            if entry is not None and now - entry["created"] > self.ttl:
+                self._drop(key)
+                entry = None
+            try:
+                f = open(self._entry_path(key), "rb") if entry is not None else None
+            except FileNotFoundError:
+                f = None
+            if f is None:
+                self._count("misses")
+                return None
+            entry["accessed"] = now
+            self._count("hits")
+        return f
+
+    def peek(self, endpoint: str, query: str, fmt: str) -> bool:
+        """
+        True if a fresh entry exists; does not touch the statistics.
+        """
+        with self._lock:
+            entry = self._index["entries"].get(cache_key(endpoint, query, fmt))
+            return entry is not None and time.time() - entry["created"] <= self.ttl
+
+    def write_through(
+        self, endpoint: str, query: str, fmt: str, chunks: Iterable[bytes]
+    ) -> Iterator[bytes]:
+        """
+        Passes the chunks on unchanged while copying them into the cache.
+        The entry is only committed once the stream has been fully consumed,
+        so an aborted download never leaves a truncated result behind.
+        """
+        key = cache_key(endpoint, query, fmt)
+        path = self._entry_path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        size = 0
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+        except BaseException:
+            os.remove(tmp)
+            raise
+        with self._lock:
+            os.replace(tmp, path)
+            now = time.time()
+            self._index["entries"][key] = {
+                "endpoint": endpoint,
+                "format": fmt,
+                "size": size,
+                "created": now,
+                "accessed": now,
+            }
+            self._evict()
+            self._write_index()
+
+    def get(self, endpoint: str, query: str, fmt: str) -> bytes | None:
+        f = self.lookup(endpoint, query, fmt)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def put(self, endpoint: str, query: str, fmt: str, data: bytes) -> None:
+        for _ in self.write_through(endpoint, query, fmt, [data]):
+            pass
+
+    def _evict(self) -> None:
+        entries = self._index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]["size"]
+            self._drop(key)
+            self._count("evictions")
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._index["entries"]):
+                self._drop(key)
+            self._write_index()
+
+    def close(self) -> None:
+        """
+        Writes back access times and statistics collected by lookup().
+        """
+        with self._lock:
+            if self._dirty and os.path.isdir(self.cache_dir):
+                self._write_index()
+
+    def size(self) -> int:
+        return sum(e["size"] for e in self._index["entries"].values())
+
+    def summary(self) -> str:
+        return f"cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+
+
+# -----------------------------------------
+# Main
+# -----------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the local SPARQL result cache")
+    parser.add_argument("--clear", action="store_true", help="delete all cached results")
+    args = parser.parse_args()
+
+    cache = QueryCache()
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {cache.cache_dir}")
+    stats = cache._index["stats"]
+    print(f"{len(cache._index['entries'])} entries, {cache.size() / 1024**2:.1f} MB in {cache.cache_dir}")
+    print(f"total: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
@@ -0,0 +1,489 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from export_all import discover_exporters
+from sharding import IRI_RE, where_group
+from sparql_utils import iter_json_bindings, iter_response, projected_vars
+from telemetry import MANIFEST_DIR, now_iso
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+REPEAT = 3
+
+KEYWORDS = ("OPTIONAL", "FILTER", "MINUS", "BIND", "VALUES", "SERVICE", "GRAPH")
+KEYWORD_RE = re.compile(rf"({'|'.join(KEYWORDS)})\b", re.IGNORECASE)
+VAR_RE = re.compile(r"[?$](\w+)")
+TOKEN_RE = re.compile(
+    r"""
+      <[^<>"{}|^`\\\s]*>
+    | "(?:[^"\\]|\\.)*"(?:@[\w-]+|\^\^(?:<[^>]*>|[^\s;,]+))?
+    | '(?:[^'\\]|\\.)*'(?:@[\w-]+|\^\^(?:<[^>]*>|[^\s;,]+))?
+    | [;,]
+    | [^\s;,]+
+    """,
+    re.VERBOSE,
+)
+# filters that can hold for unbound variables must not be folded into an OPTIONAL
+NULL_SAFE_RE = re.compile(r"\b(BOUND|COALESCE|IF|EXISTS)\b|\|\||!", re.IGNORECASE)
+
+RDF_TYPE = ("a", "rdf:type", "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>")
+
+
+# -----------------------------------------
+# Group pattern model
+# -----------------------------------------
+@dataclass
+class Item:
+    """
+    One top-level element of the WHERE group: a run of triple patterns
+    (kind="triples") or an opaque block such as OPTIONAL {...} or FILTER(...).
+    """
+
+    kind: str
+    text: str = ""
+    triples: list[tuple[str, str, str]] = field(default_factory=list)
+
+    def vars(self) -> set[str]:
+        if self.kind == "triples":
+            return {v for t in self.triples for term in t for v in VAR_RE.findall(term)}
+        return set(VAR_RE.findall(self.text))
+
+    def render(self) -> str:
+        if self.kind == "triples":
+            return "\n".join(f"  {s} {p} {o} ." for s, p, o in self.triples)
+        return f"  {self.text}"
+
+
+def skip_literal(text: str, i: int) -> int:
+    """
+    Index after the string literal, IRI or comment starting at i (or i).
+    """
+    c = text[i]
+    if c == "#":
+        nl = text.find("\n", i)
+        return len(text) if nl < 0 else nl
+    if c in "\"'":
+        j = i + 1
+        while j < len(text) and text[j] != c:
+            j += 2 if text[j] == "\\" else 1
+        return j + 1
+    if c == "<" and (iri := IRI_RE.match(text, i)):
+        return iri.end()
+    return i
+
+
+def strip_comments(text: str) -> str:
+    out = []
+    i = 0
+    while i < len(text):
+        j = skip_literal(text, i)
+        if j > i:
+            if text[i] != "#":
+                out.append(text[i:j])
+            i = j
+            continue
+        out.append(text[i])
+        i += 1
+    return "".join(out)
+
+
+def parse_triples(statement: str) -> list[tuple[str, str, str]] | None:
+    """
+    Expands `s p o1, o2 ; p2 o3` into single triples. Returns None for
+    anything we don't model (blank node lists, collections, paths).
+    """
+    tokens = TOKEN_RE.findall(statement)
+    if not tokens or any(t[0] in "[]()" or t in (";", ",") and i == 0
+                         for i, t in enumerate(tokens)):
+        return None
+    subject, rest = tokens[0], tokens[1:]
+    triples = []
+    i = 0
+    while i < len(rest):
+        if rest[i] == ";":
+            i += 1
+            continue
+        if i + 1 >= len(rest) or rest[i + 1] in (";", ","):
+            return None
+        pred = rest[i]
+        if re.search(r"[/|^*+]", pred.strip("<>")) and not pred.startswith("<"):
+            return None  # property path
+        i += 1
+        while True:
+            triples.append((subject, pred, rest[i]))
+            i += 1
+            if i < len(rest) and rest[i] == ",":
+                i += 1
+                continue
+            break
+    return triples
+
+
+def split_group(body: str) -> list[Item]:
+    """
+    Splits the inside of a group pattern into top-level items.
+    """
+    body = strip_comments(body)
+    items: list[Item] = []
+    i = 0
+    n = len(body)
+
+    def flush(statement: str) -> None:
+        statement = statement.strip()
+        if not statement:
+            return
+        triples = parse_triples(statement)
+        if triples is None:
+            items.append(Item("other", statement + " ."))
+        elif items and items[-1].kind == "triples":
+            items[-1].triples.extend(triples)
+        else:
+            items.append(Item("triples", triples=triples))
+
+    def read_block(start: int) -> int:
+        """End of the bracketed block that starts at or after `start`."""
+        depth = 0
+        j = start
+        while j < n:
+            k = skip_literal(body, j)
+            if k > j:
+                j = k
+                continue
+            if body[j] in "({":
+                depth += 1
+            elif body[j] in ")}":
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+            j += 1
+        raise ValueError("Unbalanced brackets in the WHERE clause")
+
+    start = i
+    while i < n:
+        k = skip_literal(body, i)
+        if k > i:
+            i = k
+            continue
+        c = body[i]
+        at_item_start = not body[start:i].strip()
+        prev = body[i - 1] if i else " "
+        kw = KEYWORD_RE.match(body, i) if not (prev.isalnum() or prev in "?$:_") else None
+        if kw and (at_item_start or body[i - 1].isspace()):
+            flush(body[start:i])
+            keyword = kw.group(1).upper()
+            j = kw.end()
+            if keyword == "VALUES":
+                j = body.index("{", j)
+            end = read_block(j)
+            items.append(Item(keyword.lower(), " ".join(body[i:end].split())
+                              if keyword in ("FILTER", "BIND") else body[i:end].strip()))
+            i = start = end
+            continue
+        if c == "{" and at_item_start:
+            end = read_block(i)
+            while m := re.match(r"\s*UNION\s*\{", body[end:], re.IGNORECASE):
+                end = read_block(end + m.end() - 1)
+            items.append(Item("group", body[i:end].strip()))
+            i = start = end
+            continue
+        if c == "." and not (0 < i < n - 1 and body[i - 1].isalnum() and body[i + 1].isalnum()):
+            flush(body[start:i])
+            i = start = i + 1
+            continue
+        i += 1
+    flush(body[start:])
+    return [it for it in items if it.kind != "triples" or it.triples]
+
+
+def render_query(query: str, items: list[Item]) -> str:
+    open_, close = where_group(query)
+    body = "\n".join(it.render() for it in items)
+    return f"{query[:open_ + 1]}\n{body}\n{query[close:]}"
+
+
+# -----------------------------------------
+# Rewrites
+# -----------------------------------------
+def dedup_patterns(items: list[Item]) -> list[Item]:
+    """
+    Drops repeated triple patterns (a BGP is a set, so they only add joins).
+    """
+    seen: set[tuple[str, str, str]] = set()
+    out = []
+    for it in items:
+        if it.kind == "triples":
+            unique = [t for t in it.triples if not (t in seen or seen.add(t))]
+            if unique:
+                out.append(Item("triples", triples=unique))
+        else:
+            out.append(it)
+    return out
+
+
+def triple_weight(t: tuple[str, str, str], bound: set[str]) -> int:
+    """
+    Bound/constant subjects are most selective, then objects, then predicates.
+    """
+    def is_bound(term: str) -> bool:
+        m = VAR_RE.fullmatch(term)
+        return m is None or m.group(1) in bound
+
+    s, p, o = t
+    weight = 4 * is_bound(s) + 2 * is_bound(o) + is_bound(p)
+    if o[0] in "\"'" or o[0].isdigit():
+        weight += 2  # literal objects
+    if p in RDF_TYPE:
+        weight -= 1  # classes are large
+    return weight
+
+
+def order_triples(triples: list, bound: set[str]) -> list:
+    """
+    Greedy join order: most selective pattern first, preferring patterns
+    connected to what is already bound (no cartesian products).
+    """
+    bound = set(bound)
+    rest = list(triples)
+    ordered = []
+    while rest:
+        def key(idx_t):
+            idx, t = idx_t
+            tvars = {v for term in t for v in VAR_RE.findall(term)}
+            connected = not bound or bool(tvars & bound) or not tvars
+            return (connected, triple_weight(t, bound), -idx)
+
+        idx, best = max(enumerate(rest), key=key)
+        ordered.append(best)
+        bound |= {v for term in best for v in VAR_RE.findall(term)}
+        rest.pop(idx)
+    return ordered
+
+
+def reorder_patterns(items: list[Item]) -> list[Item]:
+    """
+    Reorders each run of triple patterns; blocks keep their position.
+    """
+    bound: set[str] = set()
+    out = []
+    for it in items:
+        if it.kind == "triples":
+            it = Item("triples", triples=order_triples(it.triples, bound))
+        out.append(it)
+        if it.kind in ("triples", "bind", "values", "group"):
+            bound |= it.vars()
+    return out
+
+
+def required_first(items: list[Item]) -> list[Item]:
+    """
+    Moves all required triple patterns in front of the OPTIONAL blocks.
+    Only equivalent for well-designed OPTIONALs, hence checked at run time.
+    """
+    if any(it.kind not in ("triples", "optional", "filter") for it in items):
+        return items
+    triples = [t for it in items if it.kind == "triples" for t in it.triples]
+    blocks = [it for it in items if it.kind != "triples"]
+    return [Item("triples", triples=order_triples(triples, set()))] + blocks
+
+
+def push_filters(items: list[Item]) -> list[Item]:
+    """
+    Moves each top-level FILTER next to the block that binds its variables.
+
+    A FILTER on variables bound only inside one OPTIONAL drops every row
+    where the OPTIONAL did not match, so `OPTIONAL { P } FILTER(f)` is the
+    same as the required group `{ P FILTER(f) }` - unless f can be true for
+    unbound variables (BOUND, COALESCE, ||, ...).
+    """
+    filters = [it for it in items if it.kind == "filter"]
+    rest = [it for it in items if it.kind != "filter"]
+    placed: dict[int, list[Item]] = {}
+    for f in filters:
+        fvars = f.vars()
+        others = set().union(*(it.vars() for it in rest if it.kind != "optional"))
+        target = None
+        holders = [idx for idx, it in enumerate(rest) if fvars & it.vars()]
+        if fvars and not fvars & others and len(holders) == 1 \
+                and rest[holders[0]].kind == "optional" and fvars <= rest[holders[0]].vars() \
+                and not NULL_SAFE_RE.search(f.text[len("FILTER"):]):
+            opt = rest[holders[0]]
+            inner = opt.text[opt.text.index("{") + 1 : opt.text.rindex("}")]
+            rest[holders[0]] = Item("group", f"{{{inner.rstrip()}\n    {f.text}\n  }}")
+            continue
+        bound: set[str] = set()
+        for idx, it in enumerate(rest):
+            if it.kind in ("triples", "bind", "values", "group"):
+                bound |= it.vars()
+            if fvars <= bound:
+                target = idx
+                break
+        placed.setdefault(len(rest) - 1 if target is None else target, []).append(f)
+
+    out = []
+    for idx, it in enumerate(rest):
+        out.append(it)
+        out.extend(placed.get(idx, []))
+    if not rest:
+        out.extend(filters)
+    return out
+
+
+def build_variants(query: str) -> dict[str, str]:
+    """
+    Semantically equivalent rewrites of `query`, by name. Rewrites that
+    don't change the query text are left out.
+    """
+    open_, close = where_group(query)
+    items = split_group(query[open_ + 1 : close])
+
+    rewrites = {
+        "dedup": [dedup_patterns],
+        "reordered": [reorder_patterns],
+        "required-first": [required_first],
+        "filter-pushdown": [push_filters],
+        "combined": [dedup_patterns, push_filters, required_first, reorder_patterns],
+    }
+    variants = {"original": query}
+    # the rewrites re-render the group, so compare against the re-rendered original
+    seen = {" ".join(render_query(query, items).split())}
+    for name, steps in rewrites.items():
+        result = items
+        for step in steps:
+            result = step(result)
+        text = render_query(query, result)
+        key = " ".join(text.split())
+        if key not in seen:
+            seen.add(key)
+            variants[name] = text
+    return variants
+
+
+# -----------------------------------------
+# Benchmark
+# -----------------------------------------
+def run_variant(endpoint: str, query: str) -> tuple[float, int, str]:
+    """
+    Runs the query once (uncached) and returns (seconds, rows, digest of the
+    result multiset). Rows are hashed one by one, so large results are fine.
+    """
+    start = time.perf_counter()
+    rows = iter_json_bindings(iter_response(endpoint, query, use_cache=False),
+                              projected_vars(query))
+    next(rows)
+    counts: Counter[bytes] = Counter()
+    for row in rows:
+        counts[hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=16).digest()] += 1
+    seconds = time.perf_counter() - start
+
+    summary = hashlib.blake2b(digest_size=16)
+    for digest, k in sorted(counts.items()):
+        summary.update(digest + k.to_bytes(8, "little"))
+    return seconds, sum(counts.values()), summary.hexdigest()
+
+
+def profile_query(endpoint: str, query: str, repeat: int = REPEAT, warmup: bool = True) -> dict:
+    """
+    Times every variant `repeat` times and checks that it returns the same
+    multiset of rows as the original query.
+    """
+    variants = build_variants(query)
+    results = []
+    for name, text in variants.items():
+        entry = {"variant": name}
+        try:
+            if warmup:
+                run_variant(endpoint, text)
+            runs = [run_variant(endpoint, text) for _ in range(repeat)]
+        except Exception as e:
+            entry.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+            results.append(entry)
+            print(f"[WARN] {name}: {entry['error']}")
+            continue
+        times = [r[0] for r in runs]
+        entry.update({
+            "status": "ok",
+            "median_s": round(statistics.median(times), 4),
+            "min_s": round(min(times), 4),
+            "rows": runs[0][1],
+            "result_digest": runs[0][2],
+            "stable": len({r[2] for r in runs}) == 1,
+        })
+        results.append(entry)
+
+    base = next(r for r in results if r["variant"] == "original")
+    for r in results:
+        if r["status"] == "ok" and base["status"] == "ok":
+            r["equivalent"] = r["result_digest"] == base["result_digest"]
+            r["speedup"] = round(base["median_s"] / r["median_s"], 2) if r["median_s"] else None
+
+    candidates = [r for r in results if r["status"] == "ok" and r.get("equivalent")]
+    best = min(candidates, key=lambda r: r["median_s"])["variant"] if candidates else None
+    return {"endpoint": endpoint, "repeat": repeat, "best": best,
+            "results": results, "queries": variants}
+
+
+def print_report(name: str, report: dict) -> None:
+    print(f"\n{name} @ {report['endpoint']} ({report['repeat']} runs per variant)")
+    print(f"{'variant':<18}{'status':<8}{'rows':>8}{'median s':>11}{'min s':>9}{'speedup':>9}  equivalent")
+    print("-" * 76)
+    for r in sorted(report["results"], key=lambda r: r.get("median_s", float("inf"))):
+        if r["status"] != "ok":
+            print(f"{r['variant']:<18}{'error':<8}  {r['error'][:48]}")
+            continue
+        equivalent = "yes" if r.get("equivalent") else "NO"
+        if not r["stable"]:
+            equivalent += " (unstable)"
+        print(f"{r['variant']:<18}{'ok':<8}{r['rows']:>8}{r['median_s']:>11.4f}"
+              f"{r['min_s']:>9.4f}{r.get('speedup') or 0:>8.2f}x  {equivalent}")
+    print("-" * 76)
+    print(f"fastest equivalent variant: {report['best'] or '-'}")
+
+
+# -----------------------------------------
+# Main
+# -----------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark equivalent rewrites of the exporter queries")
+    parser.add_argument("exporters", nargs="*", help="exporter names, e.g. gene_fusion (default: all)")
+    parser.add_argument("--endpoint", default=os.environ.get("SPARQL_ENDPOINT"),
+                        help="endpoint to profile against (default: the exporter's ENDPOINT)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per variant")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false",
+                        help="don't run each variant once before timing it")
+    parser.add_argument("--show", action="store_true", help="print the fastest variant's query")
+    args = parser.parse_args(argv)
+
+    modules = discover_exporters(args.exporters or None)
+    if not modules:
+        print("[WARN] No exporters found.")
+        return 1
+
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    for module in modules:
+        name = module.__name__.removeprefix("export_")
+        report = profile_query(args.endpoint or module.ENDPOINT, module.QUERY,
+                               args.repeat, args.warmup)
+        report.update({"exporter": module.__name__, "profiled_at": now_iso()})
+        print_report(module.__name__, report)
+        if args.show and report["best"]:
+            print(report["queries"][report["best"]])
+
+        path = os.path.join(MANIFEST_DIR, f"profile_{name}.json")
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report → {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import argparse
+import csv
+import glob
+import itertools
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+RAW_DIR = "data/raw"
+BLOCK_SIZE = 16 << 20  # bytes of CSV per record batch
+COMPRESSION = "zstd"
+# string columns with at most this share of distinct values are dictionary-encoded
+# (DiseaseName, Units, ...); near-unique IDs like GeneFusion stay plain strings
+DICT_MAX_RATIO = 0.5
+
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+# Numeric columns per table; every other column is a string.
+NUMERIC_COLUMNS: dict[str, dict[str, pa.DataType]] = {
+    "chemical_location": {
+        "Value": pa.float64(),
+        "Population": pa.int64(),
+    },
+    "disease_demographics": {
+        # the endpoint prints float32 values with 20 digits, float32 is lossless
+        "Incidence": pa.float32(),
+        "MortalityRate": pa.float32(),
+    },
+    "disease_variant": {
+        "ChromosomeStartPosition": pa.int64(),
+        "ChromosomeEndPosition": pa.int64(),
+        "DiseaseSpecificity": pa.float32(),
+        "DiseasePleiotropy": pa.float32(),
+    },
+}
+
+
+# -----------------------------------------
+# Helper
+# -----------------------------------------
+def table_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def parquet_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def column_types(table: str, header: list[str]) -> dict[str, pa.DataType]:
+    numeric = NUMERIC_COLUMNS.get(table, {})
+    return {col: numeric.get(col, pa.string()) for col in header}
+
+
+def storage_schema(batch: pa.RecordBatch) -> pa.Schema:
+    """
+    Dictionary-encodes the string columns that repeat a lot in `batch`.
+    """
+    fields = []
+    for name, col in zip(batch.schema.names, batch.columns):
+        if col.type == pa.string() and \
+                pc.count_distinct(col).as_py() <= DICT_MAX_RATIO * max(len(col), 1):
+            fields.append(pa.field(name, DICT_STRING))
+        else:
+            fields.append(pa.field(name, col.type))
+    return pa.schema(fields)
+
+
+def csv_to_parquet(csv_path: str, out_path: str | None = None) -> str:
+    """
+    Converts an export CSV into Parquet with explicit column types. The CSV
+    is streamed in record batches, so it never has to fit into memory; the
+    string encoding of each column is picked from the first batch.
+    Empty cells (unbound variables) become nulls.
+    """
+    out_path = out_path or parquet_path(csv_path)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    types = column_types(table_name(csv_path), header)
+
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=BLOCK_SIZE),
+        convert_options=pacsv.ConvertOptions(
+            column_types=types,
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=True,
+        ),
+    )
+    first = next(iter(reader), None)
+    if first is None:
+        first = pa.RecordBatch.from_pylist([], schema=reader.schema)
+    schema = storage_schema(first)
+
+    tmp = out_path + ".part"
+    try:
+        with pq.ParquetWriter(tmp, schema, compression=COMPRESSION) as writer:
+            for batch in itertools.chain([first], reader):
+                writer.write_batch(batch.cast(schema))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def store_table(csv_path: str, delete_csv: bool = False) -> dict:
+    """
+    Writes the Parquet version of an export CSV and returns the manifest
+    fields describing it. The CSV stays in place (other scripts still read
+    it) unless delete_csv=True.
+    """
+    csv_bytes = os.path.getsize(csv_path)
+    path = csv_to_parquet(csv_path)
+    if delete_csv:
+        os.remove(csv_path)
+    return {
+        "store": "parquet",
+        "store_path": path,
+        "store_bytes": os.path.getsize(path),
+        "csv_bytes": csv_bytes,
+    }
+
+
+# -----------------------------------------
+# Main
+# -----------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert raw export CSVs to Parquet")
+    parser.add_argument("files", nargs="*", help=f"CSV files (default: all in {RAW_DIR})")
+    parser.add_argument("--delete-csv", action="store_true", help="remove the CSV once the Parquet file is written")
+    args = parser.parse_args()
+
+    for path in args.files or sorted(glob.glob(os.path.join(RAW_DIR, "*.csv"))):
+        info = store_table(path, delete_csv=args.delete_csv)
+        print(f"{path}: {info['csv_bytes'] / 1024:.0f} KB → "
+              f"{info['store_path']}: {info['store_bytes'] / 1024:.0f} KB")
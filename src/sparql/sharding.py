@@ -0,0 +1,252 @@
+import csv
+import hashlib
+import heapq
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import sparql_utils
+from sparql_utils import projected_vars, split_prologue
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+CHROMOSOMES = [str(i) for i in range(1, 23)] + ["X", "Y", "MT"]
+
+IRI_RE = re.compile(r"<[^<>\"{}|^`\\\s]*>")
+NUMBER_RE = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+
+
+@dataclass
+class ShardSpec:
+    """
+    How to split one query into disjoint sub-queries on `var`.
+
+    by="values":     one shard per `size` values of `values`
+    by="prefix":     one shard per identifier prefix in `values`
+    by="chromosome": one shard per `size` chromosomes (1-22, X, Y, MT)
+
+    A final "rest" shard takes every row whose `var` is unbound or matches
+    none of the other shards, so the shards always cover the whole result.
+    """
+
+    var: str
+    by: str = "values"
+    values: list[str] = field(default_factory=list)
+    size: int = 1
+
+
+# -----------------------------------------
+# Query rewriting
+# -----------------------------------------
+def where_group(query: str) -> tuple[int, int]:
+    """
+    Returns the positions of the opening and closing brace of the outer
+    WHERE group, skipping strings, IRIs and comments.
+    """
+    prologue, body = split_prologue(query)
+    m = re.search(r"\bWHERE\s*\{", body, re.IGNORECASE)
+    if m is None:
+        raise ValueError("Could not find the WHERE clause of the query")
+    start = len(prologue) + m.end() - 1
+
+    depth = 0
+    i = start
+    while i < len(query):
+        c = query[i]
+        if c == "#":
+            nl = query.find("\n", i)
+            i = len(query) if nl < 0 else nl
+            continue
+        if c in "\"'":
+            i += 1
+            while i < len(query) and query[i] != c:
+                i += 2 if query[i] == "\\" else 1
+        elif c == "<" and (iri := IRI_RE.match(query, i)):
+            i = iri.end()
+            continue
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return start, i
+        i += 1
+    raise ValueError("Unbalanced braces in the WHERE clause")
+
+
+def inject_filter(query: str, condition: str) -> str:
+    _, close = where_group(query)
+    return f"{query[:close]}\n  FILTER({condition})\n{query[close:]}"
+
+
+def sparql_string(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def shard_conditions(spec: ShardSpec) -> list[str]:
+    v = f"?{spec.var}"
+    if spec.by == "prefix":
+        prefixes = sorted(spec.values)
+        for a, b in zip(prefixes, prefixes[1:]):
+            if b.startswith(a):
+                raise ValueError(f"Overlapping shard prefixes: {a!r} and {b!r}")
+        matches = [f"STRSTARTS(STR({v}), {sparql_string(p)})" for p in prefixes]
+    elif spec.by in ("values", "chromosome"):
+        values = CHROMOSOMES if spec.by == "chromosome" and not spec.values else spec.values
+        if not values:
+            raise ValueError("Sharding by values needs a list of values")
+        groups = [values[i : i + spec.size] for i in range(0, len(values), spec.size)]
+        matches = [
+            f"STR({v}) IN ({', '.join(sparql_string(x) for x in group)})"
+            for group in groups
+        ]
+    else:
+        raise ValueError(f"Unknown shard type: {spec.by}")
+
+    rest = f"!BOUND({v}) || !({' || '.join(f'({m})' for m in matches)})"
+    return matches + [rest]
+
+
+def shard_queries(query: str, spec: ShardSpec) -> list[str]:
+    if spec.var not in re.findall(r"\?(\w+)", query):
+        raise ValueError(f"?{spec.var} does not occur in the query")
+    return [inject_filter(query, cond) for cond in shard_conditions(spec)]
+
+
+def order_vars(query: str) -> list[str] | None:
+    """
+    Variables of a trailing `ORDER BY ?a ?b`, or None if the query is not
+    ordered (or ordered by expressions we can't merge on).
+    """
+    _, close = where_group(query)
+    m = re.match(r"\s*ORDER\s+BY\s+((?:\?\w+\s*)+)", query[close + 1:], re.IGNORECASE)
+    if m is None:
+        return None
+    return re.findall(r"\?(\w+)", m.group(1))
+
+
+# -----------------------------------------
+# Merge
+# -----------------------------------------
+def iter_part(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        yield from reader
+
+
+def term_key(value: str) -> tuple[int, float, str]:
+    """
+    Sort key of a CSV cell in SPARQL ORDER BY order, as far as CSV keeps
+    it: unbound first, then numbers by value, then everything else by string.
+    """
+    if not value:
+        return (0, 0.0, "")
+    if NUMBER_RE.fullmatch(value):
+        return (1, float(value), value)
+    return (2, 0.0, value)
+
+
+class UnorderedPart(ValueError):
+    pass
+
+
+def check_order(rows, key, path: str):
+    prev = None
+    for row in rows:
+        k = key(row)
+        if prev is not None and k < prev:
+            raise UnorderedPart(f"{path} is not sorted like the merge key")
+        prev = k
+        yield row
+
+
+def sort_part(path: str, key) -> None:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = sorted(reader, key=key)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def write_rows(rows, out_path: str, header: list[str]) -> int:
+    seen: set[bytes] = set()
+    n = 0
+    tmp = out_path + ".part"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        for row in rows:
+            digest = hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=16).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            writer.writerow(row)
+            n += 1
+    os.replace(tmp, out_path)
+    return n
+
+
+def merge_parts(parts: list[str], out_path: str, header: list[str],
+                order: list[str] | None = None) -> int:
+    """
+    Merges the shard CSVs into out_path and drops duplicate rows. Only a
+    16-byte digest per row is kept in memory. If the query was ordered, the
+    parts are merged on term_key so the output keeps that order; a part the
+    endpoint sorted differently (e.g. by datatype) is re-sorted first.
+    """
+    if not order:
+        return write_rows((row for p in parts for row in iter_part(p)), out_path, header)
+
+    cols = [header.index(v) for v in order]
+
+    def key(row: list[str]) -> list[tuple]:
+        return [term_key(row[c]) for c in cols]
+
+    try:
+        streams = [check_order(iter_part(p), key, p) for p in parts]
+        return write_rows(heapq.merge(*streams, key=key), out_path, header)
+    except UnorderedPart as e:
+        print(f"[WARN] {e}, sorting the shards before merging")
+    for p in parts:
+        sort_part(p, key)
+    return write_rows(heapq.merge(*(iter_part(p) for p in parts), key=key), out_path, header)
+
+
+# -----------------------------------------
+# Export
+# -----------------------------------------
+def export_sharded(
+    endpoint: str,
+    query: str,
+    out_path: str,
+    spec: ShardSpec,
+    workers: int | None = None,
+    **export_opts,
+) -> int:
+    """
+    Runs the shards of `query` in parallel (bounded by the per-endpoint
+    limit of sparql_utils) and merges them into the CSV the unsharded query
+    would have produced.
+    """
+    queries = shard_queries(query, spec)
+    parts = [f"{out_path}.shard-{i:04d}" for i in range(len(queries))]
+    print(f"[INFO] {len(queries)} shards on ?{spec.var} ({spec.by})")
+
+    def run(i: int) -> int:
+        return sparql_utils.export_rows(endpoint, queries[i], parts[i], **export_opts)
+
+    with ThreadPoolExecutor(max_workers=workers or sparql_utils.MAX_PER_ENDPOINT) as pool:
+        counts = list(pool.map(run, range(len(queries))))
+    print(f"[INFO] shard rows: {counts}")
+
+    n = merge_parts(parts, out_path, projected_vars(query), order_vars(query))
+    for p in parts:
+        os.remove(p)
+    return n
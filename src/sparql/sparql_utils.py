@@ -0,0 +1,766 @@
+import argparse
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from delta import export_delta, keep_previous
+from telemetry import (
+    ExportStats,
+    check_regressions,
+    load_manifest,
+    now_iso,
+    null_rates,
+    write_manifest,
+)
+from query_cache import QueryCache
+
+# -----------------------------------------
+# HTTP session
+# -----------------------------------------
+JSON_RESULTS = "application/sparql-results+json"
+RESULT_FORMATS = {
+    "json": JSON_RESULTS,
+    "csv": "text/csv",
+    "tsv": "text/tab-separated-values",
+}
+CHUNK_SIZE = 1 << 20
+
+POOL_SIZE = 16
+MAX_PER_ENDPOINT = 4
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_endpoint_slots: dict[str, threading.BoundedSemaphore] = {}
+_cache: QueryCache | None = None
+
+
+def get_session() -> requests.Session:
+    """
+    One keep-alive session for the whole process, shared by all exporters
+    (and all threads of export_all.py).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def set_endpoint_limit(limit: int) -> None:
+    global MAX_PER_ENDPOINT
+    with _session_lock:
+        MAX_PER_ENDPOINT = limit
+        _endpoint_slots.clear()
+
+
+def get_cache() -> QueryCache:
+    global _cache
+    with _session_lock:
+        if _cache is None:
+            _cache = QueryCache()
+        return _cache
+
+
+@contextmanager
+def endpoint_slot(endpoint: str):
+    """
+    Caps the number of requests that run against one endpoint at a time.
+    """
+    with _session_lock:
+        slot = _endpoint_slots.get(endpoint)
+        if slot is None:
+            slot = threading.BoundedSemaphore(MAX_PER_ENDPOINT)
+            _endpoint_slots[endpoint] = slot
+    with slot:
+        yield
+
+
+# -----------------------------------------
+# Query helpers
+# -----------------------------------------
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def split_prologue(query: str) -> tuple[str, str]:
+    """
+    Splits a query into its PREFIX/BASE prologue and the SELECT part.
+    """
+    m = re.search(r"\bSELECT\b", query, re.IGNORECASE)
+    if m is None:
+        raise ValueError("Only SELECT queries are supported")
+    return query[: m.start()], query[m.start():]
+
+
+def projected_vars(query: str) -> list[str]:
+    """
+    Returns the projected variable names of a SELECT query in order,
+    including aliases of (expr AS ?var) projections.
+    """
+    _, body = split_prologue(query)
+    m = re.match(r"SELECT\s+(?:DISTINCT\s+|REDUCED\s+)?(.*?)\bWHERE\b",
+                 body, re.IGNORECASE | re.DOTALL)
+    if m is None:
+        raise ValueError("Could not find the projection of the query")
+    clause = m.group(1)
+    # (expr AS ?alias) -> ?alias
+    clause = re.sub(r"\((.*?)\bAS\s+\?(\w+)\s*\)", r" ?\2 ",
+                    clause, flags=re.IGNORECASE | re.DOTALL)
+    vars_ = re.findall(r"\?(\w+)", clause)
+    if not vars_:
+        raise ValueError("SELECT * cannot be paged, list the variables explicitly")
+    return vars_
+
+
+def paged_query(query: str, limit: int, offset: int) -> str:
+    """
+    Sorts the original query in a sub-select and pages outside of it, so
+    every page sees the same total order. This is Virtuoso's workaround for
+    the "Sorted TOP clause" error at large OFFSETs: with ORDER BY next to
+    LIMIT/OFFSET it has to sort OFFSET + LIMIT rows for every page.
+    """
+    prologue, body = split_prologue(query)
+    vars_ = " ".join(f"?{v}" for v in projected_vars(query))
+    return (
+        f"{prologue}"
+        f"SELECT {vars_} WHERE {{\n{{\n"
+        f"SELECT {vars_} WHERE {{\n{{\n{body}\n}}\n}}\n"
+        f"ORDER BY {vars_}\n"
+        f"}}\n}}\n"
+        f"LIMIT {limit}\n"
+        f"OFFSET {offset}\n"
+    )
+
+
+def iter_response(
+    endpoint: str,
+    query: str,
+    accept: str = JSON_RESULTS,
+    refresh: bool = False,
+    use_cache: bool = True,
+    stats: ExportStats | None = None,
+) -> Iterator[bytes]:
+    """
+    Yields the raw response body in chunks, from the local cache if possible.
+    refresh=True skips the lookup but still stores the new response.
+    """
+    if stats is not None:
+        chunks = iter_response(endpoint, query, accept, refresh, use_cache)
+        cached = use_cache and not refresh and get_cache().peek(endpoint, query, accept)
+        yield from stats.track(chunks, cached=cached)
+        return
+
+    cache = get_cache() if use_cache else None
+    if cache is not None and not refresh:
+        f = cache.lookup(endpoint, query, accept)
+        if f is not None:
+            with f:
+                while chunk := f.read(CHUNK_SIZE):
+                    yield chunk
+            return
+
+    with endpoint_slot(endpoint):
+        with get_session().post(
+            endpoint,
+            data={"query": query},
+            headers={"Accept": accept},
+            stream=True,
+        ) as resp:
+            resp.raise_for_status()
+            chunks = resp.iter_content(CHUNK_SIZE)
+            if cache is not None:
+                chunks = cache.write_through(endpoint, query, accept, chunks)
+            yield from chunks
+
+
+def fetch(endpoint: str, query: str, accept: str = JSON_RESULTS, **fetch_opts) -> bytes:
+    return b"".join(iter_response(endpoint, query, accept, **fetch_opts))
+
+
+def fetch_json(endpoint: str, query: str, **fetch_opts) -> dict:
+    return json.loads(fetch(endpoint, query, JSON_RESULTS, **fetch_opts))
+
+
+# -----------------------------------------
+# Streaming result parsers
+# -----------------------------------------
+class ChunkReader(io.RawIOBase):
+    """
+    File-like view on an iterator of byte chunks.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buf = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buf:
+            self._buf = next(self._chunks, None)
+            if self._buf is None:
+                self._buf = b""
+                return 0
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def text_stream(chunks: Iterable[bytes]) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BufferedReader(ChunkReader(chunks), CHUNK_SIZE),
+                            encoding="utf-8", newline="")
+
+
+def iter_json_bindings(chunks: Iterable[bytes], vars_: list[str] | None = None):
+    """
+    Incremental parser for application/sparql-results+json. Only the current
+    binding object is decoded, the response is never materialized as a whole.
+    Yields the head vars first (or vars_ if the head comes after the results),
+    then one list of values per binding.
+    """
+    stream = text_stream(chunks)
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> None:
+        nonlocal buf, pos, eof
+        data = stream.read(CHUNK_SIZE)
+        if not data:
+            eof = True
+        buf = buf[pos:] + data
+        pos = 0
+
+    def find(token: str) -> int:
+        nonlocal pos
+        while True:
+            i = buf.find(token, pos)
+            if i >= 0:
+                pos = i + len(token)
+                return i
+            if eof:
+                raise ValueError(f"Malformed SPARQL JSON result: missing {token}")
+            pos = max(pos, len(buf) - len(token))
+            fill()
+
+    def skip(chars: str) -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                obj, pos = decoder.raw_decode(buf, pos)
+                return obj
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    fill()
+    head_at = buf.find('"head"')
+    bind_at = buf.find('"bindings"')
+    if head_at >= 0 and (bind_at < 0 or head_at < bind_at):
+        find('"head"')
+        skip(" \t\r\n:")
+        head = decode()
+        vars_ = head.get("vars", vars_)
+    if vars_ is None:
+        raise ValueError("SPARQL JSON result without a leading head")
+    yield vars_
+
+    find('"bindings"')
+    skip(" \t\r\n:")
+    find("[")
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buf):
+            raise ValueError("Malformed SPARQL JSON result: unterminated bindings")
+        if buf[pos] == "]":
+            return
+        b = decode()
+        yield [b[v]["value"] if v in b else "" for v in vars_]
+
+
+_TSV_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f",
+                '"': '"', "'": "'", "\\": "\\"}
+
+
+def tsv_term_value(term: str) -> str:
+    """
+    Turns a term in SPARQL TSV (N-Triples) syntax into its plain value,
+    the same string the JSON format reports as "value".
+    """
+    if not term:
+        return ""
+    if term[0] == "<" and term[-1] == ">":
+        return term[1:-1]
+    if term.startswith("_:"):
+        return term[2:]
+    if term[0] == '"':
+        end = term.rfind('"')
+        raw = term[1:end]
+        if "\\" not in raw:
+            return raw
+        out = []
+        i = 0
+        while i < len(raw):
+            c = raw[i]
+            if c == "\\" and i + 1 < len(raw):
+                nxt = raw[i + 1]
+                if nxt in "uU":
+                    width = 4 if nxt == "u" else 8
+                    out.append(chr(int(raw[i + 2 : i + 2 + width], 16)))
+                    i += 2 + width
+                    continue
+                out.append(_TSV_ESCAPES.get(nxt, nxt))
+                i += 2
+                continue
+            out.append(c)
+            i += 1
+        return "".join(out)
+    return term  # abbreviated numbers / booleans
+
+
+def iter_tsv_rows(chunks: Iterable[bytes]):
+    stream = text_stream(chunks)
+    header = stream.readline().rstrip("\r\n")
+    yield [v.lstrip("?$") for v in header.split("\t")] if header else []
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if line:
+            yield [tsv_term_value(t) for t in line.split("\t")]
+
+
+# -----------------------------------------
+# Checkpoints
+# -----------------------------------------
+def checkpoint_path(out_path: str) -> str:
+    return out_path + ".checkpoint.json"
+
+
+def load_checkpoint(out_path: str, qhash: str, page_size: int) -> dict | None:
+    path = checkpoint_path(out_path)
+    if not os.path.exists(path) or not os.path.exists(out_path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("query_hash") != qhash or state.get("page_size") != page_size:
+        print(f"[WARN] Checkpoint {path} belongs to another query, starting over.")
+        return None
+    return state
+
+
+def save_checkpoint(out_path: str, state: dict) -> None:
+    path = checkpoint_path(out_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+# -----------------------------------------
+# Export
+# -----------------------------------------
+def copy_csv(out, chunks: Iterable[bytes], header: bool = True) -> int:
+    """
+    Copies a text/csv response with the record terminators normalized to LF
+    (SPARQL CSV uses CRLF per RFC 4180, the header written by
+    export_paginated and the other formats use LF); line breaks inside
+    quoted values are copied unchanged. Rows are counted by the line breaks
+    outside of quoted values (quotes inside values are doubled, so the
+    quote parity tells whether a line break ends a record).
+    """
+    quoted = False
+    in_header = True
+    carry = b""  # trailing \r outside quotes; the next chunk decides if it is a CRLF
+    rows = 0
+    last = b""
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:  # end of the response
+            data, carry = carry, b""
+        else:
+            # parts alternate between outside and inside quotes, starting
+            # with the state at the end of the previous chunk
+            parts = (carry + chunk).split(b'"')
+            carry = b""
+            outside = range(int(quoted), len(parts), 2)
+            for j in outside:
+                parts[j] = parts[j].replace(b"\r\n", b"\n")
+                rows += parts[j].count(b"\n")
+            if len(parts) - 1 in outside and parts[-1].endswith(b"\r"):
+                parts[-1], carry = parts[-1][:-1], b"\r"
+            quoted ^= len(parts) % 2 == 0
+            data = b'"'.join(parts)
+        if in_header:
+            # the header never contains quoted line breaks
+            i = data.find(b"\n")
+            if header:
+                out.write(data if i < 0 else data[: i + 1])
+            if i < 0:
+                continue
+            data, in_header = data[i + 1:], False
+            rows -= 1
+        out.write(data)
+        last = data[-1:] or last
+    return rows + (1 if last not in (b"", b"\n") else 0)
+
+
+def write_result(out, chunks: Iterable[bytes], fmt: str,
+                 vars_: list[str] | None, header: bool = True) -> int:
+    """
+    Streams one response as CSV into the binary file `out` and returns the
+    number of rows. text/csv is passed through unchanged, TSV and JSON are
+    decoded row by row.
+    """
+    if fmt == "csv":
+        return copy_csv(out, chunks, header)
+
+    rows = iter_json_bindings(chunks, vars_) if fmt == "json" else iter_tsv_rows(chunks)
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    try:
+        writer = csv.writer(text, lineterminator="\n")
+        cols = next(rows)
+        if header:
+            writer.writerow(cols)
+        n = 0
+        for row in rows:
+            writer.writerow(row)
+            n += 1
+    finally:
+        text.detach()
+    return n
+
+
+def export_full(endpoint: str, query: str, out_path: str,
+                fmt: str = "json", **fetch_opts) -> int:
+    try:
+        vars_ = projected_vars(query)
+    except ValueError:
+        vars_ = None
+
+    chunks = iter_response(endpoint, query, RESULT_FORMATS[fmt], **fetch_opts)
+    tmp = out_path + ".part"
+    try:
+        with open(tmp, "wb") as out:
+            n = write_result(out, chunks, fmt, vars_)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, out_path)
+    return n
+
+
+def export_paginated(
+    endpoint: str,
+    query: str,
+    out_path: str,
+    page_size: int,
+    resume: bool = True,
+    fmt: str = "json",
+    **fetch_opts,
+) -> int:
+    """
+    Pages through the result set with ORDER BY + LIMIT/OFFSET and streams
+    every page onto the end of out_path.
+    After each page a checkpoint (offset + file size) is written next to the
+    output, so an interrupted export continues with the next page.
+    """
+    qhash = query_hash(f"{fmt}\n{query}")
+    vars_ = projected_vars(query)
+
+    state = load_checkpoint(out_path, qhash, page_size) if resume else None
+    if state is not None:
+        # drop a partially written page from the crashed run
+        with open(out_path, "r+b") as f:
+            f.truncate(state["bytes"])
+        print(f"[INFO] Resuming at offset {state['offset']} ({state['rows']} rows)")
+    else:
+        state = {"query_hash": qhash, "page_size": page_size,
+                 "offset": 0, "rows": 0, "bytes": 0}
+        with open(out_path, "w", newline="") as f:
+            csv.writer(f, lineterminator="\n").writerow(vars_)
+            state["bytes"] = f.tell()
+        save_checkpoint(out_path, state)
+
+    while True:
+        page = paged_query(query, page_size, state["offset"])
+        chunks = iter_response(endpoint, page, RESULT_FORMATS[fmt], **fetch_opts)
+        with open(out_path, "ab") as out:
+            n = write_result(out, chunks, fmt, vars_, header=False)
+            state["bytes"] = out.tell()
+
+        state["offset"] += page_size
+        state["rows"] += n
+        save_checkpoint(out_path, state)
+        print(f"[INFO] page at offset {state['offset'] - page_size}: {n} rows")
+
+        if n < page_size:
+            break
+
+    os.remove(checkpoint_path(out_path))
+    return state["rows"]
+
+
+def export_rows(
+    endpoint: str,
+    query: str,
+    out_path: str,
+    page_size: int | None = None,
+    resume: bool = True,
+    fmt: str = "json",
+    **fetch_opts,
+) -> int:
+    if page_size:
+        return export_paginated(endpoint, query, out_path, page_size,
+                                resume=resume, fmt=fmt, **fetch_opts)
+    return export_full(endpoint, query, out_path, fmt=fmt, **fetch_opts)
+
+
+def export_query(
+    endpoint: str,
+    query: str,
+    out_path: str,
+    page_size: int | None = None,
+    resume: bool = True,
+    refresh: bool = False,
+    use_cache: bool = True,
+    fmt: str = "json",
+    shard=None,
+    max_slowdown: float | None = None,
+    max_row_drop: float | None = None,
+    endpoint_override: str | None = None,
+    store: str = "csv",
+    delta: bool = False,
+    delta_keys: list[str] | None = None,
+) -> int:
+    """
+    Runs one export and records its manifest (timings, bytes, rows, null
+    rates, status) in data/manifests/. Raises if the export fails or, with
+    max_slowdown / max_row_drop, if it regressed against the last run.
+    endpoint_override replaces the exporter's ENDPOINT, e.g. to run against
+    the offline stand-in of local_endpoint.py. store="parquet" also writes the
+    finished CSV as a typed Parquet file (see raw_store.py). delta=True
+    also writes the rows added/removed/changed since the last delta export
+    to <table>.delta/ (see delta.py).
+    """
+    endpoint = endpoint_override or endpoint
+    stats = ExportStats()
+    opts = {"page_size": page_size, "resume": resume, "fmt": fmt,
+            "refresh": refresh, "use_cache": use_cache, "stats": stats}
+    manifest = {
+        "output": out_path,
+        "endpoint": endpoint,
+        "query_hash": query_hash(query),
+        "format": fmt,
+        "mode": "sharded" if shard is not None else "paged" if page_size else "full",
+        "started_at": now_iso(),
+    }
+    previous = load_manifest(out_path)
+    if delta and not os.path.exists(checkpoint_path(out_path)):
+        keep_previous(out_path)
+
+    start = time.perf_counter()
+    try:
+        if shard is not None:
+            from sharding import export_sharded  # sharding imports this module
+
+            n = export_sharded(endpoint, query, out_path, shard, **opts)
+        else:
+            n = export_rows(endpoint, query, out_path, **opts)
+    except BaseException as e:
+        manifest.update(transfer_stats(stats, time.perf_counter() - start))
+        manifest.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+        write_manifest(manifest)
+        raise
+    wall = time.perf_counter() - start
+
+    manifest.update(transfer_stats(stats, wall))
+    manifest.update({
+        "rows": n,
+        "rows_per_s": round(n / wall, 1) if wall > 0 else None,
+        "null_rate": null_rates(out_path),
+        "status": "ok",
+    })
+    if delta:
+        manifest["delta"] = export_delta(out_path, delta_keys)
+    if store == "parquet":
+        from raw_store import store_table  # pyarrow is only needed for Parquet
+
+        manifest.update(store_table(out_path))
+    problems = check_regressions(manifest, previous, max_slowdown, max_row_drop)
+    if problems:
+        manifest.update({"status": "regression", "error": "; ".join(problems)})
+    path = write_manifest(manifest)
+
+    print(f"Saved {n} rows to {manifest.get('store_path', out_path)}")
+    print(f"[INFO] {wall:.1f}s (network {stats.network_s:.1f}s), "
+          f"{stats.bytes / 1024**2:.1f} MB, manifest → {path}")
+    if use_cache:
+        print(f"[INFO] {get_cache().summary()}")
+    if problems:
+        raise RuntimeError("Export regressed: " + "; ".join(problems))
+    return n
+
+
+def transfer_stats(stats: ExportStats, wall: float) -> dict:
+    return {
+        "wall_s": round(wall, 3),
+        "network_s": round(stats.network_s, 3),
+        "parse_s": round(max(wall - stats.network_s, 0.0), 3),
+        "bytes": stats.bytes,
+        "requests": stats.requests,
+        "cached_requests": stats.cached,
+    }
+
+
+# -----------------------------------------
+# CLI
+# -----------------------------------------
+def add_export_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--endpoint",
+        dest="endpoint_override",
+        default=os.environ.get("SPARQL_ENDPOINT"),
+        help="query this SPARQL endpoint instead of the exporter's default "
+             "(env: SPARQL_ENDPOINT)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=None,
+        help="page through the results with LIMIT/OFFSET windows of this size",
+    )
+    parser.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help="ignore an existing checkpoint and start the export over",
+    )
+    parser.add_argument(
+        "--format",
+        dest="fmt",
+        choices=sorted(RESULT_FORMATS),
+        default="json",
+        help="result format requested from the endpoint; csv/tsv are streamed "
+             "to disk without building rows in Python",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="bypass cached results and query the endpoint again",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="neither read nor write the local result cache",
+    )
+    parser.add_argument(
+        "--store",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="also write a typed, dictionary-encoded Parquet file next to the CSV",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="also write the rows added/removed/changed since the last delta "
+             "export to data/raw/<table>.delta/",
+    )
+    parser.add_argument(
+        "--delta-keys",
+        nargs="+",
+        default=None,
+        help="key columns identifying a row (default per table, e.g. ChemicalId CityId)",
+    )
+    parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=None,
+        help="fail if network time exceeds this factor of the last run",
+    )
+    parser.add_argument(
+        "--max-row-drop",
+        type=float,
+        default=None,
+        help="fail if the row count drops by more than this fraction (e.g. 0.2)",
+    )
+    parser.add_argument(
+        "--shard-var",
+        default=None,
+        help="split the query into disjoint sub-queries on this variable, "
+             "e.g. DiseaseCui or Chromosome",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=["values", "prefix", "chromosome"],
+        default="values",
+        help="how to split: value lists, identifier prefixes or chromosomes",
+    )
+    parser.add_argument(
+        "--shard-values",
+        nargs="*",
+        default=[],
+        help="values or prefixes for the shards (@file reads one per line)",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=1,
+        help="number of values per shard",
+    )
+
+
+def read_shard_values(values: list[str]) -> list[str]:
+    out = []
+    for v in values:
+        if v.startswith("@"):
+            with open(v[1:]) as f:
+                out.extend(line.strip() for line in f if line.strip())
+        else:
+            out.append(v)
+    return out
+
+
+def finish_export_args(args: argparse.Namespace) -> argparse.Namespace:
+    """
+    Folds the --shard-* flags into a single `shard` option for export_query.
+    """
+    from sharding import ShardSpec
+
+    var, by = args.shard_var, args.shard_by
+    values, size = read_shard_values(args.shard_values), args.shard_size
+    for key in ("shard_var", "shard_by", "shard_values", "shard_size"):
+        delattr(args, key)
+    args.shard = ShardSpec(var, by, values, size) if var else None
+    return args
+
+
+def parse_export_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    add_export_args(parser)
+    return finish_export_args(parser.parse_args(argv))
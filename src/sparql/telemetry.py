@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+# -----------------------------------------
+# Konfiguration
+# -----------------------------------------
+MANIFEST_DIR = "data/manifests"
+
+
+class ExportStats:
+    """
+    Collects transfer statistics of one export. Shards and pages may run in
+    several threads, so the counters are guarded by a lock; network_s is
+    summed over all requests and can exceed the wall time of a sharded run.
+    """
+
+    def __init__(self):
+        self.network_s = 0.0
+        self.bytes = 0
+        self.requests = 0
+        self.cached = 0
+        self._lock = threading.Lock()
+
+    def track(self, chunks: Iterable[bytes], cached: bool = False) -> Iterator[bytes]:
+        """
+        Passes the chunks through and books the time spent waiting for them
+        (request + transfer, or the cache read) as network time.
+        """
+        with self._lock:
+            self.requests += 1
+            self.cached += int(cached)
+        it = iter(chunks)
+        while True:
+            t0 = time.perf_counter()
+            chunk = next(it, None)
+            dt = time.perf_counter() - t0
+            with self._lock:
+                self.network_s += dt
+                self.bytes += len(chunk) if chunk else 0
+            if chunk is None:
+                return
+            yield chunk
+
+
+# -----------------------------------------
+# Helper
+# -----------------------------------------
+def manifest_path(out_path: str) -> str:
+    name = os.path.splitext(os.path.basename(out_path))[0]
+    return os.path.join(MANIFEST_DIR, f"{name}.json")
+
+
+def load_manifest(out_path: str) -> dict | None:
+    path = manifest_path(out_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def null_rates(csv_path: str, chunksize: int = 200_000) -> dict[str, float]:
+    """
+    Share of empty cells per column, read in chunks so large exports don't
+    have to fit into memory.
+    """
+    nulls: pd.Series | None = None
+    rows = 0
+    for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False,
+                             chunksize=chunksize):
+        counts = (chunk == "").sum()
+        nulls = counts if nulls is None else nulls + counts
+        rows += len(chunk)
+    if nulls is None:
+        header = pd.read_csv(csv_path, nrows=0).columns
+        return {c: 0.0 for c in header}
+    return {c: round(float(n) / rows, 6) if rows else 0.0 for c, n in nulls.items()}
+
+
+def check_regressions(
+    manifest: dict,
+    previous: dict | None,
+    max_slowdown: float | None = None,
+    max_row_drop: float | None = None,
+) -> list[str]:
+    """
+    Compares a finished export with the last successful one for the same file.
+    """
+    if previous is None or previous.get("status") != "ok":
+        return []
+    problems = []
+    if max_slowdown and previous["network_s"] > 0:
+        ratio = manifest["network_s"] / previous["network_s"]
+        if ratio > max_slowdown:
+            problems.append(
+                f"network time {manifest['network_s']:.1f}s is {ratio:.1f}x "
+                f"the previous {previous['network_s']:.1f}s"
+            )
+    if max_row_drop is not None and previous["rows"]:
+        drop = 1 - manifest["rows"] / previous["rows"]
+        if drop > max_row_drop:
+            problems.append(
+                f"row count fell from {previous['rows']} to {manifest['rows']} "
+                f"({drop:.0%})"
+            )
+    return problems
+
+
+def write_manifest(manifest: dict) -> str:
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    path = manifest_path(manifest["output"])
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
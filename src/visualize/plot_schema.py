@@ -1,24 +1,26 @@
 # src/visualize/plot_schema.py
 
-import torch
+import json
 import networkx as nx
 import matplotlib.pyplot as plt
 import os
 import math
 
 
-def visualize_schema(graph_path="data/processed/hetero_graph.pt", save=True):
-    obj = torch.load(graph_path, weights_only=False)
-    data = obj["data"]
+def visualize_schema(graph_path="data/processed/hetero_graph", save=True):
+    # nur das Schema aus meta.json, die Tensoren werden nicht gelesen
+    with open(os.path.join(graph_path, "meta.json")) as f:
+        meta = json.load(f)
 
     G = nx.DiGraph()
 
     # alle Node-Typen als Knoten
-    for node_type in data.node_types:
+    for node_type in meta["node_types"]:
         G.add_node(node_type)
 
     # Relationstypen als gerichtete Kanten (mit Attribut "label")
-    for (src, rel, dst) in data.edge_types:
+    for entry in meta["edge_types"]:
+        src, rel, dst = entry["type"]
         G.add_edge(src, dst, label=rel)
 
     # ---------- Layout: disease in die Mitte, Rest auf Kreis ----------
@@ -0,0 +1,120 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import torch
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "graph"))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "benchmarks"))
+from generate_raw import TABLES, generate, make_pools  # noqa: E402
+import graph_store  # noqa: E402
+from graph_store import load_graph, load_meta, load_node_maps, update_graph  # noqa: E402
+
+BUILD_SCRIPT = os.path.join(HERE, "..", "src", "graph", "build_graph.py")
+GRAPH = os.path.join("data", "processed", "hetero_graph")
+SCALE = 0.2
+APPENDED = "disease_variant.csv"
+
+
+def build(root: str, *args: str) -> str:
+    proc = subprocess.run([sys.executable, BUILD_SCRIPT, *args], cwd=root, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return proc.stdout
+
+
+def append_rows(root: str, rows: int) -> None:
+    """
+    Neue Zeilen wie ein späterer Export: neue und bekannte Knoten gemischt.
+    """
+    _, make = TABLES[APPENDED]
+    df = make(make_pools(SCALE, 0), np.random.default_rng(1), rows, 2.5)
+    df.to_csv(os.path.join(root, "data", "raw", APPENDED), mode="a", header=False, index=False)
+
+
+def canonical(root: str) -> dict:
+    """
+    Graph in externen IDs: Knoten und Kanten nach ID sortiert, damit zwei
+    Builds mit unterschiedlicher Nummerierung vergleichbar werden.
+    """
+    data = load_graph(os.path.join(root, GRAPH))
+    node_maps = load_node_maps(os.path.join(root, GRAPH))
+    out = {}
+    for ntype in data.node_types:
+        ids = node_maps[ntype].ids_of(np.arange(data[ntype].num_nodes))
+        order = np.argsort(ids, kind="stable")
+        out[ntype] = {"ids": ids[order]}
+        for key, value in data[ntype].items():
+            if isinstance(value, torch.Tensor):
+                out[ntype][key] = value.numpy()[order] if key == "x" else value.numpy()
+    for edge_type in data.edge_types:
+        store = data[edge_type]
+        src, dst = store.edge_index.numpy()
+        check_pointers(store, src, dst, data[edge_type[0]].num_nodes, data[edge_type[2]].num_nodes)
+        pairs = np.stack([
+            node_maps[edge_type[0]].ids_of(src), node_maps[edge_type[2]].ids_of(dst),
+        ])
+        order = np.lexsort(pairs[::-1])
+        out[edge_type] = {"pairs": pairs[:, order]}
+        for key, value in store.items():
+            if key.startswith("edge_attr"):
+                out[edge_type][key] = value.numpy()[order] if key == "edge_attr" else value.numpy()
+    return out
+
+
+def check_pointers(store, src, dst, num_src, num_dst) -> None:
+    assert np.all(np.diff(src * num_dst + dst) > 0)  # sortiert nach (src, dst), ohne Duplikate
+    for ptr, index, n in ((store.rowptr, src, num_src), (store.colptr, dst, num_dst)):
+        np.testing.assert_array_equal(ptr.numpy(), np.concatenate([[0], np.cumsum(np.bincount(index, minlength=n))]))
+    np.testing.assert_array_equal(dst[store.csc_perm.numpy()], np.sort(dst))
+
+
+@pytest.fixture(scope="module")
+def builds(tmp_path_factory) -> tuple[str, str]:
+    incremental = str(tmp_path_factory.mktemp("incremental"))
+    generate(SCALE, incremental, 0)
+    build(incremental)
+    full = str(tmp_path_factory.mktemp("full"))
+    shutil.copytree(os.path.join(incremental, "data", "raw"), os.path.join(full, "data", "raw"))
+
+    for root in (incremental, full):
+        append_rows(root, 200)
+    assert "patched hetero graph" in build(incremental, "--incremental")
+    build(full)
+    return incremental, full
+
+
+def test_incremental_build_equals_full_build(builds):
+    incremental, full = (canonical(root) for root in builds)
+    assert incremental.keys() == full.keys()
+    for key, parts in full.items():
+        assert incremental[key].keys() == parts.keys(), key
+        for name, value in parts.items():
+            if value.dtype.kind in "fc":
+                np.testing.assert_allclose(incremental[key][name], value, rtol=1e-5, atol=1e-6,
+                                           err_msg=f"{key} {name}")
+            else:
+                np.testing.assert_array_equal(incremental[key][name], value, err_msg=f"{key} {name}")
+
+
+def test_interrupted_patch_keeps_the_old_graph(builds, tmp_path, monkeypatch):
+    root = str(tmp_path / "hetero_graph")
+    shutil.copytree(os.path.join(builds[0], GRAPH), root)
+    before = load_meta(root)
+    data, node_maps = load_graph(root), load_node_maps(root)
+    original = data["variant"].x.clone()
+    data["variant"].x = torch.cat([original + 1, original])  # neue Werte und neue Shape
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(graph_store, "write_edge_type", crash)
+    with pytest.raises(OSError):
+        update_graph(root, data, node_maps, ["variant"], [("disease", "assoc_variant", "variant")])
+    assert load_meta(root) == before
+    x = load_graph(root)["variant"].x
+    assert list(x.shape) == before["node_types"]["variant"]["attrs"]["x"]["shape"]
+    np.testing.assert_array_equal(x.numpy(), original.numpy())
@@ -0,0 +1,55 @@
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "sparql"))
+from delta import compare_tables, diff, fingerprints  # noqa: E402
+
+HEADER = ["ChemicalId", "CityId", "Count"]
+KEYS = ["ChemicalId", "CityId"]
+
+OLD = [
+    ["C1", "Berlin", "3"],
+    ["C1", "Paris", "1"],
+    ["C2", "Rome", "5"],
+    ["C2", "Rome", "6"],  # two rows for one key
+    ["C3", "Oslo", "2"],
+]
+NEW = [
+    ["C2", "Rome", "6"],  # same rows of C2/Rome, other order, one duplicate
+    ["C2", "Rome", "5"],
+    ["C2", "Rome", "5"],
+    ["C1", "Paris", "4"],  # changed
+    ["C1", "Berlin", "3"],
+    ["C4", "Lima", "7"],  # added; C3/Oslo removed
+]
+
+
+def write_csv(path, rows: list[list[str]]) -> str:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, lineterminator="\n").writerows([HEADER, *rows])
+    return str(path)
+
+
+def read_csv(path) -> list[list[str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_diff_finds_added_removed_and_changed_keys(tmp_path):
+    old = fingerprints(write_csv(tmp_path / "old.csv", OLD), KEYS)
+    new = fingerprints(write_csv(tmp_path / "new.csv", NEW), KEYS)
+    assert len(old[0]) == 4 and len(new[0]) == 4
+    changes = diff(old, new)
+    assert [len(changes[name]) for name in ("added", "removed", "changed")] == [1, 1, 1]
+    assert diff(new, new)["changed"].size == 0
+
+
+def test_compare_tables_writes_the_rows(tmp_path):
+    old = write_csv(tmp_path / "old.csv", OLD)
+    new = write_csv(tmp_path / "new.csv", NEW)
+    out = tmp_path / "delta"
+    assert compare_tables(old, new, KEYS, str(out)) == {"added": 1, "removed": 1, "changed": 1}
+    assert read_csv(out / "added.csv") == [["C4", "Lima", "7"]]
+    assert read_csv(out / "removed.csv") == [["C3", "Oslo", "2"]]
+    assert read_csv(out / "changed.csv") == [["C1", "Paris", "4"]]
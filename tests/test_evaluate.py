@@ -0,0 +1,61 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "models"))
+from evaluate import filtered_ranks  # noqa: E402
+
+
+def brute_force_ranks(query, answer, candidates, known) -> np.ndarray:
+    """
+    Referenz: volle Score-Matrix in float64, bekannte Partner und die
+    Antwort maskiert, mittlerer Rang bei Gleichständen.
+    """
+    scores = (query.double() @ candidates.double().T).numpy()
+    masked = np.zeros(scores.shape, dtype=bool)
+    masked[known[0], known[1]] = True
+    masked[np.arange(len(answer)), answer] = True
+    ranks = []
+    for i, a in enumerate(answer):
+        other = scores[i][~masked[i]]
+        ranks.append(1 + (other > scores[i, a]).sum() + (other == scores[i, a]).sum() / 2)
+    return np.array(ranks)
+
+
+def random_case(num_queries: int, num_candidates: int, dim: int, integer: bool, seed: int = 0):
+    gen = torch.Generator().manual_seed(seed)
+    if integer:
+        # kleine ganze Zahlen: exakte Gleichstände in jedem Kernel
+        query = torch.randint(-2, 3, (num_queries, dim), generator=gen).float()
+        candidates = torch.randint(-2, 3, (num_candidates, dim), generator=gen).float()
+    else:
+        query = torch.randn(num_queries, dim, generator=gen)
+        candidates = torch.randn(num_candidates, dim, generator=gen)
+    rng = np.random.default_rng(seed)
+    answer = rng.integers(0, num_candidates, num_queries)
+    # bekannte Partner wie known_pairs: nach Anfrage sortiert, inklusive der Antwort
+    owner = np.repeat(np.arange(num_queries), 5)
+    partner = rng.integers(0, num_candidates, len(owner))
+    owner, partner = np.concatenate([owner, np.arange(num_queries)]), np.concatenate([partner, answer])
+    pairs = np.unique(np.stack([owner, partner]), axis=1)
+    return query, answer, candidates, (pairs[0], pairs[1])
+
+
+# ein Block, mehrere Zeilenblöcke, mehrere Spaltenblöcke
+@pytest.mark.parametrize("budget", [1 << 30, 8 * 1000 * 7, 8 * 300])
+@pytest.mark.parametrize("integer", [False, True])
+def test_filtered_ranks_match_brute_force(budget, integer):
+    query, answer, candidates, known = random_case(64, 1000, 96, integer)
+    ranks = filtered_ranks(query, answer, candidates, known, budget)
+    assert ranks.min() >= 1
+    np.testing.assert_array_equal(ranks, brute_force_ranks(query, answer, candidates, known))
+
+
+def test_answer_counted_once_without_known_pairs():
+    query, answer, candidates, _ = random_case(32, 500, 64, integer=False)
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    ranks = filtered_ranks(query, answer, candidates, empty, 8 * 128)
+    np.testing.assert_array_equal(ranks, brute_force_ranks(query, answer, candidates, empty))
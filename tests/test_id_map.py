@@ -0,0 +1,39 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "graph"))
+from id_map import IdMap  # noqa: E402
+
+
+def random_ids(rng: np.random.Generator, n: int) -> list[str]:
+    # gemeinsamer Anfang wie bei CUIs, gleiche 8-Byte-Präfixe und Nicht-ASCII
+    stems = ["C00", "C0012345", "C00123456789", "Cä"]
+    return [f"{stems[i % len(stems)]}{v}" for i, v in enumerate(rng.integers(0, 10**6, n))]
+
+
+def test_lookup_after_append():
+    rng = np.random.default_rng(0)
+    first = sorted(set(random_ids(rng, 2000)))
+    id_map = IdMap.from_ids(first)
+    expected = {k: i for i, k in enumerate(first)}
+
+    for _ in range(3):  # mehrmals anhängen, wie aufeinanderfolgende inkrementelle Builds
+        batch = random_ids(rng, 500) + first[:50] + ["", "A", "D"]
+        new = sorted({k for k in batch if k and k not in expected})
+        assert id_map.append(batch) == len(new)
+        expected.update({k: len(expected) + i for i, k in enumerate(new)})
+
+    keys = list(expected)
+    np.testing.assert_array_equal(id_map.lookup(keys), list(expected.values()))
+    assert list(id_map.ids_of(np.arange(len(id_map)))) == keys
+    assert id_map.lookup(["C", "C00", "Z", "Cä"]).tolist() == [-1, -1, -1, -1]
+    assert id_map.get("A") == expected["A"] and id_map.id_of(expected["D"]) == "D"
+
+
+def test_order_sorts_the_ids_after_append():
+    id_map = IdMap.from_ids(["b", "d"])
+    id_map.append(["c", "a", "e"])
+    ids = id_map.ids_of(id_map.order)
+    assert list(ids) == ["a", "b", "c", "d", "e"]
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "sparql"))
+import query_cache  # noqa: E402
+from query_cache import QueryCache  # noqa: E402
+
+ENDPOINT = "http://example.org/sparql"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_hit_ignores_whitespace(tmp_path, clock):
+    cache = QueryCache(str(tmp_path))
+    cache.put(ENDPOINT, "SELECT ?s\nWHERE { ?s ?p ?o }", "csv", b"s\n1\n")
+    assert cache.get(ENDPOINT, "SELECT ?s WHERE {  ?s ?p ?o }", "csv") == b"s\n1\n"
+    assert cache.get(ENDPOINT, "SELECT ?s WHERE { ?s ?p ?o }", "json") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entry_is_a_miss(tmp_path, clock):
+    cache = QueryCache(str(tmp_path), ttl=60)
+    cache.put(ENDPOINT, "SELECT ?s WHERE {}", "csv", b"data")
+    clock[0] += 60
+    assert cache.get(ENDPOINT, "SELECT ?s WHERE {}", "csv") == b"data"
+    clock[0] += 1
+    assert cache.get(ENDPOINT, "SELECT ?s WHERE {}", "csv") is None
+    assert cache.size() == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = QueryCache(str(tmp_path), max_bytes=10)
+    for name in ("a", "b"):
+        cache.put(ENDPOINT, name, "csv", b"1234")
+        clock[0] += 1
+    assert cache.get(ENDPOINT, "a", "csv") == b"1234"  # a is now newer than b
+    clock[0] += 1
+    cache.put(ENDPOINT, "c", "csv", b"1234")
+    assert cache.get(ENDPOINT, "b", "csv") is None
+    assert cache.get(ENDPOINT, "a", "csv") == b"1234"
+    assert cache.get(ENDPOINT, "c", "csv") == b"1234"
+    assert cache.evictions == 1
+    assert cache.size() <= 10
+
+
+def test_lookup_survives_eviction_by_another_writer(tmp_path, clock):
+    cache = QueryCache(str(tmp_path), max_bytes=4)
+    cache.put(ENDPOINT, "a", "csv", b"1234")
+    f = cache.lookup(ENDPOINT, "a", "csv")
+    clock[0] += 1
+    cache.put(ENDPOINT, "b", "csv", b"5678")  # evicts a while it is being read
+    with f:
+        assert f.read() == b"1234"
+    assert cache.lookup(ENDPOINT, "a", "csv") is None
+
+
+def test_missing_file_is_a_miss(tmp_path, clock):
+    cache = QueryCache(str(tmp_path))
+    cache.put(ENDPOINT, "a", "csv", b"1234")
+    os.remove(os.path.join(str(tmp_path), query_cache.cache_key(ENDPOINT, "a", "csv")))
+    assert cache.get(ENDPOINT, "a", "csv") is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_statistics_are_written_on_close(tmp_path, clock):
+    cache = QueryCache(str(tmp_path))
+    cache.put(ENDPOINT, "a", "csv", b"1234")
+    index = os.path.join(str(tmp_path), query_cache.INDEX_FILE)
+    os.utime(index, (0, 0))
+    assert cache.get(ENDPOINT, "a", "csv") == b"1234"
+    assert cache.get(ENDPOINT, "b", "csv") is None
+    assert os.path.getmtime(index) == 0  # lookups leave index.json alone
+    cache.close()
+    assert QueryCache(str(tmp_path))._index["stats"] == {"hits": 1, "misses": 1, "evictions": 0}
@@ -0,0 +1,83 @@
+import csv
+import os
+import sys
+
+import rdflib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "sparql"))
+from sharding import ShardSpec, merge_parts, shard_queries  # noqa: E402
+
+DATA = """
+@prefix ex: <http://example.org/> .
+ex:v1 ex:gene "BRCA1" ; ex:chrom "17" .
+ex:v2 ex:gene "TP53" ; ex:chrom "17" .
+ex:v3 ex:gene "EGFR" ; ex:chrom "7" .
+ex:v4 ex:gene "KRAS" ; ex:chrom "12" .
+ex:v5 ex:gene "ALK" ; ex:chrom "2p" .
+ex:v6 ex:gene "MET" .
+"""
+
+QUERY = """PREFIX ex: <http://example.org/>
+SELECT ?v ?gene ?chrom WHERE {
+  ?v ex:gene ?gene .
+  OPTIONAL { ?v ex:chrom ?chrom }
+}"""
+
+
+def rows(graph: rdflib.Graph, query: str) -> list[tuple]:
+    return [tuple(str(x) if x is not None else "" for x in row) for row in graph.query(query)]
+
+
+def write_part(path, header: list[str], part: list[list[str]]) -> str:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, lineterminator="\n").writerows([header, *part])
+    return str(path)
+
+
+def read_csv(path) -> list[list[str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_shards_are_disjoint_and_cover_the_result():
+    graph = rdflib.Graph().parse(data=DATA, format="turtle")
+    expected = rows(graph, QUERY)
+    spec = ShardSpec(var="chrom", by="chromosome", size=10)
+    seen = []
+    for query in shard_queries(QUERY, spec):
+        seen.extend(rows(graph, query))
+    # "2p", the unbound ?chrom and the chromosomes of every group exactly once
+    assert sorted(seen) == sorted(expected)
+
+
+def test_merge_keeps_numeric_order(tmp_path):
+    header = ["chrom", "gene"]
+    parts = [
+        write_part(tmp_path / "a", header, [["2", "ALK"], ["10", "PTEN"]]),
+        write_part(tmp_path / "b", header, [["", "MET"], ["9", "ABL1"], ["17", "TP53"]]),
+    ]
+    out = tmp_path / "out.csv"
+    assert merge_parts(parts, str(out), header, ["chrom"]) == 5
+    assert [r[0] for r in read_csv(out)] == ["chrom", "", "2", "9", "10", "17"]
+
+
+def test_merge_sorts_parts_in_another_order(tmp_path):
+    header = ["chrom"]
+    parts = [
+        write_part(tmp_path / "a", header, [["10"], ["9"]]),  # string order
+        write_part(tmp_path / "b", header, [["2"], ["X"]]),
+    ]
+    out = tmp_path / "out.csv"
+    assert merge_parts(parts, str(out), header, ["chrom"]) == 4
+    assert read_csv(out) == [["chrom"], ["2"], ["9"], ["10"], ["X"]]
+
+
+def test_merge_drops_duplicates(tmp_path):
+    header = ["v", "gene"]
+    parts = [
+        write_part(tmp_path / "a", header, [["1", "BRCA1"], ["2", "TP53"]]),
+        write_part(tmp_path / "b", header, [["2", "TP53"], ["3", "EGFR"]]),
+    ]
+    out = tmp_path / "out.csv"
+    assert merge_parts(parts, str(out), header) == 3
+    assert read_csv(out)[1:] == [["1", "BRCA1"], ["2", "TP53"], ["3", "EGFR"]]
@@ -0,0 +1,63 @@
+import csv
+import io
+import os
+import sys
+
+import pytest
+import rdflib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "sparql"))
+from sparql_utils import copy_csv, paged_query  # noqa: E402
+
+ROWS = [
+    ["id", "label"],
+    ["1", "line\r\nbreak"],
+    ["2", 'quoted "word"'],
+    ["3", "plain"],
+    ["4", "lf\nonly"],
+]
+
+
+def as_csv(rows: list[list[str]], terminator: str) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator=terminator).writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def split_every(data: bytes, size: int) -> list[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1 << 20])
+@pytest.mark.parametrize("header", [True, False])
+def test_copy_csv_counts_records_and_normalizes_terminators(size, header):
+    out = io.BytesIO()
+    rows = copy_csv(out, split_every(as_csv(ROWS, "\r\n"), size), header)
+    assert rows == len(ROWS) - 1
+    # record terminators become LF, line breaks inside quoted values stay
+    expected = as_csv(ROWS if header else ROWS[1:], "\n")
+    assert out.getvalue() == expected
+
+
+def test_copy_csv_counts_last_row_without_terminator():
+    out = io.BytesIO()
+    assert copy_csv(out, [b"id\r\n1\r\n", b"2"]) == 2
+    assert out.getvalue() == b"id\n1\n2"
+
+
+def test_copy_csv_header_only():
+    out = io.BytesIO()
+    assert copy_csv(out, [b"id,label\r\n"]) == 0
+    assert out.getvalue() == b"id,label\n"
+
+
+def test_pages_cover_the_result_once():
+    graph = rdflib.Graph()
+    ex = rdflib.Namespace("http://example.org/")
+    for i in range(23):
+        graph.add((ex[f"v{i}"], ex.score, rdflib.Literal(i % 5)))
+    query = "PREFIX ex: <http://example.org/>\nSELECT ?v ?score WHERE { ?v ex:score ?score }"
+    pages = [list(graph.query(paged_query(query, 5, offset))) for offset in range(0, 30, 5)]
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 3, 0]
+    rows = [tuple(row) for page in pages for row in page]
+    assert rows == sorted(rows) and sorted(rows) == sorted(tuple(r) for r in graph.query(query))